@@ -5,14 +5,7 @@
 import json
 from pathlib import Path
 from typing import List, Dict
-import pandas as pd
-from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.utils import get_column_letter
-
-# 配置
-PROJECTS_DIR = Path("data/projects")
-OUTPUT_DIR = Path("data/output")
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+from analyzer_core import PROJECTS_DIR, OUTPUT_DIR, PDFExtractor, ExcelExporter
 
 # 如果PDF在原始位置
 SOURCE_DIR = Path(r"E:\备份资料\IEOR 4524 Spring 2026-20251227T052940Z-3-001\IEOR 4524 Spring 2026")
@@ -37,30 +30,7 @@ def get_pdf_files() -> List[Path]:
 
 def extract_pdf_text(pdf_path: Path) -> str:
     """提取PDF文本"""
-    try:
-        import PyPDF2
-        with open(pdf_path, 'rb') as f:
-            pdf_reader = PyPDF2.PdfReader(f)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text
-    except ImportError:
-        try:
-            import pdfplumber
-            text = ""
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            return text
-        except ImportError:
-            print("错误: 需要安装 PyPDF2 或 pdfplumber")
-            return ""
-    except Exception as e:
-        print(f"✗ PDF解析错误: {pdf_path.name} - {str(e)}")
-        return ""
+    return PDFExtractor.extract_text(pdf_path)
 
 
 def save_texts_for_ai_analysis(pdf_files: List[Path]):
@@ -131,54 +101,7 @@ def save_texts_for_ai_analysis(pdf_files: List[Path]):
 
 def export_to_excel(projects: List[Dict], output_path: Path):
     """导出到Excel"""
-    df = pd.DataFrame(projects)
-    
-    column_order = [
-        "项目编号", "项目名称", "公司名称", "所处行业", 
-        "应用场景", "公司用心程度", "预期成果", 
-        "技能要求", "项目描述摘要", "源文件"
-    ]
-    
-    existing_columns = [col for col in column_order if col in df.columns]
-    other_columns = [col for col in df.columns if col not in column_order]
-    df = df[existing_columns + other_columns]
-    
-    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='项目分析')
-        
-        worksheet = writer.sheets['项目分析']
-        
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=11)
-        
-        for cell in worksheet[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-        
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        worksheet.row_dimensions[1].height = 25
-        for row in range(2, len(df) + 2):
-            worksheet.row_dimensions[row].height = 20
-        
-        for row in worksheet.iter_rows(min_row=2, max_row=len(df) + 1):
-            for cell in row:
-                cell.alignment = Alignment(vertical="top", wrap_text=True)
-    
-    print(f"✓ Excel已导出: {output_path}")
+    ExcelExporter.export_to_excel(projects, output_path)
 
 
 def main():
@@ -6,7 +6,6 @@
 import json
 from pathlib import Path
 from typing import List, Dict
-import pandas as pd
 from project_analyzer_local import ExcelExporter, OUTPUT_DIR
 
 TEXTS_DIR = Path("data/project_texts")
@@ -0,0 +1,33 @@
+"""
+项目分析系统公共模块
+
+下载、PDF文本提取、Excel导出只在这里实现一份，供各入口脚本共用。
+pandas / openpyxl / pyarrow / requests / PyPDF2 等重量级依赖都在用到时才导入，
+所以 `python project_analyzer_local.py 3` 这类只读本地文件的操作不必为它们付出启动时间。
+"""
+
+import importlib
+
+# 名称 -> 所在子模块，首次访问时才导入（PEP 562）
+_EXPORTS = {
+    "PROJECTS_DIR": "paths",
+    "OUTPUT_DIR": "paths",
+    "TEXTS_DIR": "paths",
+    "COLUMNAR_DIR": "paths",
+    "GoogleDriveDownloader": "drive",
+    "PDFExtractor": "pdf",
+    "ExcelExporter": "excel",
+    "ColumnarExporter": "columnar",
+    "ResultsStore": "store",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        module = importlib.import_module(f"{__name__}.{_EXPORTS[name]}")
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,7 @@
+"""python -m analyzer_core <子命令> - 见 analyzer_core/cli.py"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+AI提取流程（与具体模型后端无关）
+
+1. 本地规则预提取能可靠取到的字段（heuristics.py）
+2. 其余字段用 prompts.py 的提示词交给后端；一批文档一起发出
+3. 解析并校验回复（jsonparse.py），仍缺的字段再批量补问一次
+
+超过 MAX_TEXT_LENGTH 的长文档不再截断，而是按章节切块（chunking.py）：
+每块单独提取（map），再按字段规则合并（reduce）。块结果按内容缓存，
+多个项目里重复的模板段落只发给模型一次。配置 "long_document_mode": "truncate"
+可恢复原来的截断行为。
+
+传入 usage.UsageMeter 时每次请求前检查预算，超出上限抛出 BudgetExceeded，请求后按文件记账。
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from .backends import LLMBackend
+from .chunking import DEFAULT_CHUNK_CHARS, ChunkCache, chunk_key, chunk_text, merge_chunk_results
+from .heuristics import HeuristicExtractor
+from .jsonparse import parse_json_reply, validate_project
+from .prompts import (MAX_TEXT_LENGTH, PROJECT_FIELDS, build_chunk_prompt, build_followup_prompt, build_prompt,
+                      followup_max_tokens, max_tokens_for)
+from .usage import BudgetExceeded, UsageMeter
+
+LONG_DOCUMENT_MODES = ("map_reduce", "truncate")
+
+
+def failure_row(filename: str, reason: str) -> Dict:
+    """提取失败时的占位行（项目名称为 解析失败 / 提取失败）"""
+    if reason == "parse":
+        name, score = "解析失败", "0 - JSON解析失败"
+    else:
+        name, score = "提取失败", "0 - 提取失败"
+    return {
+        "项目名称": name,
+        "所处行业": "未知",
+        "应用场景": "无法提取",
+        "公司用心程度": score,
+        "预期成果": "无法提取",
+        "源文件": filename
+    }
+
+
+class ProjectInfoExtractor:
+    """用给定后端提取项目信息，支持批量"""
+
+    def __init__(self, backend: LLMBackend, heuristics: Optional[HeuristicExtractor] = None,
+                 cache: Optional[ChunkCache] = None, long_document_mode: str = "map_reduce",
+                 chunk_chars: int = DEFAULT_CHUNK_CHARS, meter: Optional[UsageMeter] = None):
+        if long_document_mode not in LONG_DOCUMENT_MODES:
+            raise ValueError(f"未知的长文档模式: {long_document_mode}（可选: {', '.join(LONG_DOCUMENT_MODES)}）")
+        self.backend = backend
+        self.heuristics = heuristics or HeuristicExtractor()
+        self.cache = cache if cache is not None else ChunkCache()
+        self.long_document_mode = long_document_mode
+        self.chunk_chars = chunk_chars
+        self.meter = meter
+
+    def _is_long(self, text: str) -> bool:
+        return self.long_document_mode == "map_reduce" and len(text) > MAX_TEXT_LENGTH
+
+    def _complete(self, prompts: List[str], max_tokens: List[int], filenames: List[str]) -> List:
+        """经过预算检查和记账的批量调用"""
+        if self.meter is None:
+            return self.backend.complete_batch(prompts, max_tokens)
+        reserved = self.meter.reserve(prompts, max_tokens)
+        try:
+            replies = self.backend.complete_batch(prompts, max_tokens)
+        finally:
+            self.meter.release(reserved, len(prompts))
+        for filename, prompt, reply in zip(filenames, prompts, replies):
+            self.meter.record(filename, prompt, reply)
+        return replies
+
+    def plan_requests(self, text: str, filename: str) -> List[Tuple[str, int, List[str]]]:
+        """这篇文档首轮会发出的请求 (提示词, max_tokens, 字段)，不调用模型，供预估用量"""
+        known = self.heuristics.confident(text, filename)
+        if self._is_long(text):
+            fields = list(PROJECT_FIELDS)
+            chunks = chunk_text(text, self.chunk_chars)
+            unique = {}
+            for n, chunk in enumerate(chunks, 1):
+                key = chunk_key(chunk.text, fields)
+                if key not in unique and self.cache.get(key) is None:
+                    unique[key] = (build_chunk_prompt(chunk.text, n, len(chunks), chunk.title, fields),
+                                   max_tokens_for(fields), fields)
+            return list(unique.values())
+        fields = [field for field in PROJECT_FIELDS if field not in known]
+        return [(build_prompt(text, fields), max_tokens_for(fields), fields)]
+
+    def extract(self, text: str, filename: str) -> Dict:
+        return self.extract_batch([(text, filename)])[0]
+
+    def extract_batch(self, documents: List[Tuple[str, str]]) -> List[Dict]:
+        """documents 为 (文本, 文件名) 列表，返回与之一一对应的项目信息"""
+        plans = []
+        for text, filename in documents:
+            known = self.heuristics.confident(text, filename)
+            if known:
+                print(f"  本地预提取 {filename}: {', '.join(known)}")
+            plans.append(known)
+
+        long_docs = [i for i, (text, _) in enumerate(documents) if self._is_long(text)]
+        short_docs = sorted(set(range(len(documents))) - set(long_docs))
+
+        results: List[Optional[Dict]] = [None] * len(documents)
+        for indices, extract in ((short_docs, self._extract_whole), (long_docs, self._extract_chunked)):
+            if indices:
+                try:
+                    batch = extract([documents[i] for i in indices], [plans[i] for i in indices])
+                except BudgetExceeded as e:
+                    # 短文档可能已经完成并计费，交给调用方保留，只重试没有运行的
+                    e.results = results
+                    raise
+                for i, info in zip(indices, batch):
+                    results[i] = info
+        return results
+
+    def _extract_whole(self, documents: List[Tuple[str, str]], knowns: List[Dict]) -> List[Dict]:
+        """整篇（超长时截断）发给模型，缺的字段批量补问一次"""
+        plans = [(known, [field for field in PROJECT_FIELDS if field not in known]) for known in knowns]
+        replies = self._complete(
+            [build_prompt(text, fields) for (text, _), (_, fields) in zip(documents, plans)],
+            [max_tokens_for(fields) for _, fields in plans],
+            [filename for _, filename in documents],
+        )
+
+        results: List[Optional[Dict]] = [None] * len(documents)
+        state = []
+        for i, ((text, filename), (known, fields), reply) in enumerate(zip(documents, plans, replies)):
+            if isinstance(reply, Exception):
+                print(f"✗ AI提取错误: {filename} - {str(reply)}")
+                results[i] = failure_row(filename, "error")
+                continue
+            info, missing = validate_project(parse_json_reply(reply), fields)
+            info.update(known)
+            state.append((i, info, missing, fields, reply))
+
+        # 只补问缺失的字段（更短的提示词和 max_tokens），一批一起发
+        followups = [(i, missing) for i, _, missing, _, _ in state if missing]
+        if followups:
+            for i, missing in followups:
+                print(f"  补问缺失字段 {documents[i][1]}: {', '.join(missing)}")
+            try:
+                answers = self._complete(
+                    [build_followup_prompt(documents[i][0], missing) for i, missing in followups],
+                    [followup_max_tokens(missing) for _, missing in followups],
+                    [documents[i][1] for i, _ in followups],
+                )
+            except BudgetExceeded as e:
+                # 首轮结果已经拿到，预算不够补问时保留现有字段
+                print(f"  跳过补问: {str(e)}")
+                answers = []
+            answered = {i: answer for (i, _), answer in zip(followups, answers)}
+        else:
+            answered = {}
+
+        for i, info, missing, fields, reply in state:
+            filename = documents[i][1]
+            answer = answered.get(i)
+            if missing and isinstance(answer, str):
+                extra, _ = validate_project(parse_json_reply(answer), missing)
+                for field in missing:
+                    if field in extra:
+                        info[field] = extra[field]
+                missing = [field for field in missing if field not in info]
+            if len(missing) == len(fields):
+                print(f"✗ JSON解析错误: {filename}")
+                print(f"AI返回内容: {reply[:200]}")
+                results[i] = failure_row(filename, "parse")
+                continue
+            info["源文件"] = filename
+            results[i] = info
+        return results
+
+    def _extract_chunked(self, documents: List[Tuple[str, str]], knowns: List[Dict]) -> List[Dict]:
+        """
+        长文档按章节切块，每块单独提取后合并
+        块的提示词总是询问全部字段，这样缓存键只取决于块内容，不同项目的相同段落可以复用；
+        同一批里重复的块也只发一次
+        """
+        fields = list(PROJECT_FIELDS)
+        doc_chunks = []
+        parsed: Dict[str, Dict] = {}
+        prompts: Dict[str, str] = {}
+        owners: Dict[str, str] = {}
+        for text, filename in documents:
+            chunks = chunk_text(text, self.chunk_chars)
+            keys = [chunk_key(chunk.text, fields) for chunk in chunks]
+            for n, (chunk, key) in enumerate(zip(chunks, keys), 1):
+                if key in parsed or key in prompts:
+                    continue
+                cached = self.cache.get(key)
+                if cached is not None:
+                    parsed[key] = cached
+                else:
+                    prompts[key] = build_chunk_prompt(chunk.text, n, len(chunks), chunk.title, fields)
+                    owners[key] = filename
+            doc_chunks.append(keys)
+            print(f"  长文档分块 {filename}: {len(text)} 字符 -> {len(chunks)} 块")
+
+        errors: Dict[str, Exception] = {}
+        if prompts:
+            replies = self._complete(list(prompts.values()), [max_tokens_for(fields)] * len(prompts),
+                                     list(owners.values()))
+            for key, reply in zip(prompts, replies):
+                if isinstance(reply, Exception):
+                    errors[key] = reply
+                    continue
+                reply_info = parse_json_reply(reply)
+                info, _ = validate_project(reply_info, fields)
+                parsed[key] = {field: info[field] for field in fields if field in info}
+                # 解析不出来的回复不缓存，下次重新提取
+                if reply_info is not None:
+                    self.cache.put(key, parsed[key])
+
+        results = []
+        for (text, filename), known, keys in zip(documents, knowns, doc_chunks):
+            partials = [parsed[key] for key in keys if key in parsed]
+            if not partials:
+                print(f"✗ AI提取错误: {filename} - {str(errors[keys[0]]) if keys else '文档为空'}")
+                results.append(failure_row(filename, "error"))
+                continue
+            info = merge_chunk_results(partials)
+            info.update(known)
+            if not any(field in info for field in fields):
+                print(f"✗ JSON解析错误: {filename}")
+                results.append(failure_row(filename, "parse"))
+                continue
+            failed = sum(key in errors for key in keys)
+            if failed:
+                print(f"  警告: {filename} 有 {failed}/{len(keys)} 块提取失败，结果可能不完整")
+            info["源文件"] = filename
+            results.append(info)
+        return results
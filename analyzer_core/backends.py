@@ -0,0 +1,246 @@
+"""
+AI提取的模型后端
+
+所有后端使用同一套提示词（analyzer_core/prompts.py），接口只有两个方法：
+
+    complete(prompt, max_tokens) -> str
+    complete_batch(prompts, max_tokens) -> [str 或 Exception]
+
+回复是 Completion（str 的子类），带有服务端返回的 token 用量，供 usage.UsageMeter 记账。
+
+- openai        OpenAI API（默认）
+- local_server  OpenAI 兼容的本地服务（llama.cpp server、Ollama、vLLM 等），无需外网，
+                每个线程保持一条 keep-alive 连接，批量请求并发发出，由服务端合批
+- llama_cpp     进程内的本地 CPU 模型（llama-cpp-python + GGUF 文件），模型只加载一次，
+                同一进程内的后续文档直接复用
+
+在 project_analyzer_config.json 中选择：
+
+    "llm_backend": "local_server",
+    "local_server_url": "http://127.0.0.1:8080/v1",
+    "local_model": "qwen2.5-3b-instruct",
+    "local_model_path": "models/qwen2.5-3b-instruct-q4_k_m.gguf",
+    "llm_workers": 4
+"""
+
+import json
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from .prompts import SYSTEM_PROMPT
+
+TEMPERATURE = 0.3
+
+
+class Completion(str):
+    """模型回复文本，usage 为服务端返回的 token 用量（prompt_tokens / completion_tokens），没有时为 None"""
+
+    usage: Optional[Dict] = None
+
+    def __new__(cls, text: str, usage: Optional[Dict] = None):
+        obj = super().__new__(cls, text)
+        obj.usage = dict(usage) if usage else None
+        return obj
+
+
+def _messages(prompt: str) -> List[Dict]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
+
+class LLMBackend:
+    """后端基类：子类实现 complete，complete_batch 默认逐个调用"""
+
+    name = "base"
+
+    def complete(self, prompt: str, max_tokens: int) -> str:
+        raise NotImplementedError
+
+    def complete_batch(self, prompts: List[str], max_tokens: List[int]) -> List[Union[str, Exception]]:
+        """批量调用，单个失败时对应位置返回异常对象，不影响其他文档"""
+        results = []
+        for prompt, tokens in zip(prompts, max_tokens):
+            try:
+                results.append(self.complete(prompt, tokens))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def close(self):
+        pass
+
+
+class _ConcurrentBackend(LLMBackend):
+    """
+    远程调用以等待为主，批量时用线程并发发出
+    线程池在多次批量调用之间保留，线程上的连接（keep-alive）也就一直复用
+    """
+
+    def __init__(self, workers: int = 4):
+        self.workers = max(1, workers)
+        self._executor = None
+
+    def complete_batch(self, prompts: List[str], max_tokens: List[int]) -> List[Union[str, Exception]]:
+        if self.workers == 1 or len(prompts) <= 1:
+            return super().complete_batch(prompts, max_tokens)
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        def call(args):
+            try:
+                return self.complete(*args)
+            except Exception as e:
+                return e
+
+        return list(self._executor.map(call, zip(prompts, max_tokens)))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+class OpenAIBackend(_ConcurrentBackend):
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str = "gpt-4o-mini", workers: int = 4):
+        super().__init__(workers)
+        if not api_key:
+            raise ValueError("需要设置OPENAI_API_KEY")
+        import openai
+        openai.api_key = api_key
+        self.openai = openai
+        self.model = model
+
+    def complete(self, prompt: str, max_tokens: int) -> str:
+        response = self.openai.ChatCompletion.create(
+            model=self.model,
+            messages=_messages(prompt),
+            temperature=TEMPERATURE,
+            max_tokens=max_tokens
+        )
+        usage = getattr(response, "usage", None)
+        return Completion(response.choices[0].message.content.strip(), {
+            "prompt_tokens": usage["prompt_tokens"], "completion_tokens": usage["completion_tokens"],
+        } if usage else None)
+
+
+class LocalServerBackend(_ConcurrentBackend):
+    """OpenAI 兼容的本地 HTTP 服务（/v1/chat/completions）"""
+
+    name = "local_server"
+
+    def __init__(self, base_url: str = "http://127.0.0.1:8080/v1", model: str = "local",
+                 workers: int = 4, timeout: float = 300.0):
+        super().__init__(workers)
+        url = urlparse(base_url)
+        self.host = url.hostname or "127.0.0.1"
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.https = url.scheme == "https"
+        self.path = url.path.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.timeout = timeout
+        # 每个线程一条连接，批量调用之间复用（省去重复建连）
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        import http.client
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = cls(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def complete(self, prompt: str, max_tokens: int) -> str:
+        import http.client
+        body = json.dumps({
+            "model": self.model,
+            "messages": _messages(prompt),
+            "temperature": TEMPERATURE,
+            "max_tokens": max_tokens,
+        }).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request("POST", self.path, body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # 服务端关闭了空闲连接，重连一次
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+        if response.status != 200:
+            raise RuntimeError(f"本地模型服务返回 {response.status}: {payload[:200]!r}")
+        data = json.loads(payload)
+        return Completion(data["choices"][0]["message"]["content"].strip(), data.get("usage"))
+
+    def close(self):
+        super().close()
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+# 进程内已加载的模型，按 (路径, 上下文长度) 复用：(模型, 推理锁)
+# 锁和模型放在一起，同一个模型被多个后端实例（如 watch 和 serve 的会话）共用时也不会并发推理
+_LLAMA_MODELS: Dict[tuple, Tuple[object, threading.Lock]] = {}
+_LLAMA_LOCK = threading.Lock()
+
+
+class LlamaCppBackend(LLMBackend):
+    """进程内 CPU 推理（需要 pip install llama-cpp-python 和一个 GGUF 模型文件）"""
+
+    name = "llama_cpp"
+
+    def __init__(self, model_path: str, n_ctx: int = 8192, n_threads: int = None):
+        key = (str(model_path), n_ctx)
+        with _LLAMA_LOCK:
+            if key not in _LLAMA_MODELS:
+                from llama_cpp import Llama
+                model = Llama(model_path=str(model_path), n_ctx=n_ctx, n_threads=n_threads, verbose=False)
+                _LLAMA_MODELS[key] = (model, threading.Lock())
+        # 同一个模型实例不能并发推理
+        self.model, self._lock = _LLAMA_MODELS[key]
+
+    def complete(self, prompt: str, max_tokens: int) -> str:
+        with self._lock:
+            response = self.model.create_chat_completion(
+                messages=_messages(prompt),
+                temperature=TEMPERATURE,
+                max_tokens=max_tokens,
+            )
+        return Completion(response["choices"][0]["message"]["content"].strip(), response.get("usage"))
+
+
+BACKENDS = ("openai", "local_server", "llama_cpp")
+
+
+def create_backend(config: Dict = None, api_key: str = None) -> LLMBackend:
+    """按配置创建后端，默认 OpenAI"""
+    config = config or {}
+    kind = config.get("llm_backend", "openai")
+    workers = int(config.get("llm_workers", 4))
+    if kind == "openai":
+        return OpenAIBackend(api_key, config.get("openai_model", "gpt-4o-mini"), workers)
+    if kind == "local_server":
+        return LocalServerBackend(config.get("local_server_url", "http://127.0.0.1:8080/v1"),
+                                  config.get("local_model", "local"), workers)
+    if kind == "llama_cpp":
+        if not config.get("local_model_path"):
+            raise ValueError("llama_cpp 后端需要在配置中设置 local_model_path")
+        return LlamaCppBackend(config["local_model_path"], int(config.get("local_n_ctx", 8192)))
+    raise ValueError(f"未知的模型后端: {kind}（可选: {', '.join(BACKENDS)}）")
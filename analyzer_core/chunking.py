@@ -0,0 +1,235 @@
+"""
+按章节切分长文档
+
+长文档原来在 8000 字符处截断，后面的 Deliverables、Required Skills 等章节直接丢失。
+这里先识别标题行把文本分成章节，再把相邻章节装进不超过 max_chars 的块里
+（单个章节过长时按段落、再按行切开），供 map-reduce 提取使用；merge_chunk_results 按字段规则合并各块的结果。
+
+ChunkCache 按块内容的哈希缓存提取结果：不同项目里重复出现的块（如课程说明等模板文字）
+只会发给模型一次。
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from .paths import OUTPUT_DIR
+
+DEFAULT_CHUNK_CHARS = 4000
+CHUNK_CACHE = OUTPUT_DIR / "chunk_cache.json"
+
+HEADING_WORDS = {
+    "overview", "introduction", "background", "company background", "about the company", "about us",
+    "project description", "project overview", "problem statement", "business problem",
+    "objective", "objectives", "goals", "scope", "methodology", "approach", "data", "data sources",
+    "deliverables", "expected deliverables", "expected outcomes", "outcomes",
+    "skills", "required skills", "preferred skills", "requirements", "qualifications",
+    "timeline", "schedule", "contact", "contact information", "logistics",
+    "项目背景", "项目描述", "项目简介", "项目目标", "数据", "数据来源", "预期成果", "交付成果",
+    "技能要求", "时间安排", "联系方式", "公司简介",
+}
+
+_SMALL_WORDS = {"a", "an", "and", "for", "in", "of", "on", "the", "to", "&"}
+_NUMBERED = re.compile(r"^(?:\d+(?:\.\d+)*[.)、]?|[一二三四五六七八九十]+[、.]|[IVX]+\.)\s*(\S.*)$")
+
+
+class Chunk(NamedTuple):
+    title: str
+    text: str
+
+
+def is_heading(line: str) -> bool:
+    """标题行：已知章节名、编号标题、全大写或每词首字母大写的短行、以冒号结尾的短行"""
+    s = line.strip()
+    if not s or len(s) > 80:
+        return False
+    name = s.rstrip(":：").strip().lower()
+    if name in HEADING_WORDS:
+        return True
+    if s.endswith((":", "：")) and len(s) <= 40:
+        return True
+    numbered = _NUMBERED.match(s)
+    if numbered and len(s) <= 60 and not s.endswith((".", "。", ",", "，")):
+        # 排除 "2024 revenue grew 5%" 这类以数字开头的正文
+        words = numbered.group(1).split()
+        return len(words) <= 8 and (words[0][:1].isupper() or not words[0].isascii())
+    letters = [c for c in s if c.isalpha()]
+    if not letters or s[-1] in ".。,，;；!?":
+        return False
+    words = s.split()
+    if s.isupper():
+        return len(words) <= 8
+    # "Project Title: X" 这类标签行不算标题
+    return (2 <= len(words) <= 5 and s.isascii() and ":" not in s
+            and all(w[0].isupper() or w in _SMALL_WORDS for w in words))
+
+
+def split_sections(text: str) -> List[Chunk]:
+    """按标题行切成章节，标题前的内容为标题为空的第一节"""
+    sections: List[Chunk] = []
+    title, lines = "", []
+    for line in text.splitlines():
+        if is_heading(line):
+            if lines and any(l.strip() for l in lines):
+                sections.append(Chunk(title, "\n".join(lines).strip("\n")))
+            title, lines = line.strip().rstrip(":：").strip(), [line]
+        else:
+            lines.append(line)
+    if lines and any(l.strip() for l in lines):
+        sections.append(Chunk(title, "\n".join(lines).strip("\n")))
+    return sections
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    """超长章节：按段落，再按行，最后硬切"""
+    pieces: List[str] = []
+    for separator in ("\n\n", "\n"):
+        parts = text.split(separator)
+        if all(len(p) <= max_chars for p in parts):
+            break
+    else:
+        parts = [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+        separator = ""
+    current = ""
+    for part in parts:
+        if len(part) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.extend(part[i:i + max_chars] for i in range(0, len(part), max_chars))
+            continue
+        candidate = current + separator + part if current else part
+        if len(candidate) > max_chars:
+            pieces.append(current)
+            current = part
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_text(text: str, max_chars: int = DEFAULT_CHUNK_CHARS) -> List[Chunk]:
+    """
+    把相邻的短章节装进不超过 max_chars 的块，块标题用块内第一个章节的标题
+    超长章节单独切成若干块、不与其他章节拼接，这样同一段模板文字在不同项目里切出的块相同，能命中缓存
+    """
+    chunks: List[Chunk] = []
+    title, parts, size = "", [], 0
+
+    def flush():
+        nonlocal title, parts, size
+        if parts:
+            chunks.append(Chunk(title, "\n\n".join(parts)))
+        title, parts, size = "", [], 0
+
+    for section in split_sections(text):
+        if len(section.text) > max_chars:
+            flush()
+            chunks.extend(Chunk(section.title, piece) for piece in _split_long(section.text, max_chars))
+            continue
+        if parts and size + 2 + len(section.text) > max_chars:
+            flush()
+        if not parts:
+            title = section.title
+        parts.append(section.text)
+        size += len(section.text) + (2 if len(parts) > 1 else 0)
+    flush()
+    return chunks
+
+
+def chunk_key(text: str, fields: List[str]) -> str:
+    """缓存键：空白归一化后的块内容 + 提取的字段"""
+    normalized = re.sub(r"\s+", " ", text).strip()
+    digest = hashlib.sha256(normalized.encode("utf-8"))
+    digest.update("\x00".join(fields).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ChunkCache:
+    """块级提取结果缓存；给出 path 时持久化为 JSON，跨运行复用"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self._data: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        if self.path and self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"警告: 块缓存读取失败，将重新生成 - {str(e)}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self.hits += 1
+            return value
+
+    def put(self, key: str, value: Dict):
+        with self._lock:
+            self._data[key] = value
+
+    def __len__(self):
+        return len(self._data)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # 每个任务、每批文件后都会保存，先写临时文件再改名，写到一半崩溃不会损坏缓存
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+
+
+# 合并各块结果的规则（map-reduce 的 reduce 步骤）
+VOTE_FIELDS = ("项目名称", "所处行业", "项目编号", "公司名称")
+JOIN_FIELDS = ("应用场景", "预期成果", "技能要求")
+_SCORE = re.compile(r"^\s*(\d+(?:\.\d+)?)")
+
+
+def _vote(values: List[str]) -> str:
+    """出现次数最多的值，次数相同时取最先出现的"""
+    counts: Dict[str, int] = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return max(counts, key=lambda v: (counts[v], -values.index(v)))
+
+
+def _merge_score(values: List[str]) -> str:
+    """公司用心程度：各块分数取平均，理由用第一个"""
+    scores = [float(m.group(1)) for m in map(_SCORE.match, values) if m]
+    if not scores:
+        return values[0]
+    first = next(v for v in values if _SCORE.match(v))
+    return _SCORE.sub(str(round(sum(scores) / len(scores))), first, count=1)
+
+
+def merge_chunk_results(partials: List[Dict]) -> Dict:
+    """按块顺序合并各块提取的字段，块里没提到的字段不参与合并"""
+    merged: Dict = {}
+    fields = []
+    for partial in partials:
+        fields.extend(f for f in partial if f not in fields)
+    for field in fields:
+        values = [p[field] for p in partials if p.get(field)]
+        if not values:
+            continue
+        if field in VOTE_FIELDS:
+            merged[field] = _vote(values)
+        elif field in JOIN_FIELDS:
+            merged[field] = "；".join(dict.fromkeys(values))
+        elif field == "公司用心程度":
+            merged[field] = _merge_score(values)
+        else:
+            merged[field] = values[0]
+    return merged
@@ -0,0 +1,210 @@
+"""
+提取文本的清理：去掉页眉页脚、页码和模板文字
+
+项目PDF每页都重复页眉、页脚、页码、保密声明，课程模板文字又出现在几乎每个项目里，
+这些都会占用发给模型的 8000 字符。清理分两步：
+
+1. 单个文档（clean_pages，按页）
+   - 页码行（"3"、"Page 3 of 10"、"- 3 -"、"第 3 页"）：只看页面首尾 EDGE_LINES 行（短页面只看
+     首尾各一行）和与页眉页脚同形的行；正文中单独成行的数字（人数、预算、年份）保留
+   - 在一半以上的页面重复出现的行：页面首尾 EDGE_LINES 行内的重复行（页眉页脚，短页面不计），
+     正文中不短于 MIN_REPEAT_CHARS 的重复行（保密声明等）
+   - 行尾连字符断词接回（"analy-\\nsis" -> "analysis"），多余空白合并
+2. 整个语料（clean_corpus，提取完一批文本后）
+   - 按行统计出现在多少个文档里，出现在 CORPUS_RATIO 以上文档（且至少 CORPUS_MIN_DOCS 个）的
+     长行视为模板文字删除。统计保存在 data/output/boilerplate.json，以后新提取的文档也按它清理
+   - 章节标题（Deliverables 等）和标签行（Required Skills: ...）不删，分块和本地预提取要用
+
+比较行时忽略大小写、多余空白和首尾标点；页眉页脚还忽略数字（"Page 3" 和 "Page 4" 算同一行），
+正文行不忽略，只差数字的表格行不会被当成重复行。
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from .chunking import is_heading
+from .heuristics import is_label_line
+from .paths import OUTPUT_DIR
+
+EDGE_LINES = 3
+PAGE_REPEAT_RATIO = 0.5
+MIN_REPEAT_CHARS = 25
+
+CORPUS_RATIO = 0.3
+CORPUS_MIN_DOCS = 5
+BOILERPLATE_FILE = OUTPUT_DIR / "boilerplate.json"
+
+_PAGE_NUMBER = re.compile(
+    r"^(?:(?:page|p\.)\s*)?\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?$|^[-–—]\s*\d{1,4}\s*[-–—]$"
+    r"|^第\s*\d{1,4}\s*页(?:\s*[,，/]?\s*共\s*\d{1,4}\s*页)?$",
+    re.IGNORECASE,
+)
+_HYPHEN_BREAK = re.compile(r"([A-Za-z])-\n([a-z])")
+_SPACES = re.compile(r"[ \t 　]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def line_key(line: str, digits: bool = False) -> str:
+    """比较用的行：小写、空白合并、去掉首尾标点；digits=True 时数字归一"""
+    key = line.lower()
+    if digits:
+        key = re.sub(r"\d+", "#", key)
+    key = _SPACES.sub(" ", key)
+    return key.strip(" .,:;|-–—_·•*")
+
+
+def is_page_number(line: str) -> bool:
+    return bool(_PAGE_NUMBER.match(line.strip()))
+
+
+def dehyphenate(text: str) -> str:
+    return _HYPHEN_BREAK.sub(r"\1\2", text)
+
+
+def collapse_whitespace(text: str) -> str:
+    lines = [_SPACES.sub(" ", line).strip() for line in text.splitlines()]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def _page_lines(page: str) -> List[str]:
+    return [line for line in page.splitlines() if line.strip()]
+
+
+def repeated_page_lines(pages: List[str]) -> Tuple[Set[str], Set[str]]:
+    """
+    在一半以上页面重复的行，返回 (页眉页脚, 正文重复行)
+    页眉页脚不限长度、按数字归一的 key 比较；正文行要足够长、按原样比较
+    """
+    pages = [_page_lines(page) for page in pages if page.strip()]
+    if len(pages) < 2:
+        return set(), set()
+    edge_counts: Dict[str, int] = {}
+    body_counts: Dict[str, int] = {}
+    for lines in pages:
+        # 很短的页面整页都在首尾范围内，不按页眉页脚统计
+        if len(lines) > 2 * EDGE_LINES:
+            edges = {line_key(line, digits=True) for line in lines[:EDGE_LINES] + lines[-EDGE_LINES:]}
+            for key in edges:
+                edge_counts[key] = edge_counts.get(key, 0) + 1
+        for key in {line_key(line) for line in lines}:
+            if len(key) >= MIN_REPEAT_CHARS:
+                body_counts[key] = body_counts.get(key, 0) + 1
+    threshold = max(2, len(pages) * PAGE_REPEAT_RATIO)
+    edges = {key for key, count in edge_counts.items() if count >= threshold}
+    body = {key for key, count in body_counts.items() if count >= max(3, threshold)}
+    edges.discard("")
+    return edges, body
+
+
+def clean_pages(pages: List[str]) -> Tuple[str, Dict]:
+    """清理一个文档的各页文本，返回 (全文, 统计)；统计中的字节数按 UTF-8 计"""
+    raw = "".join(page + "\n" for page in pages if page)
+    edges, body = repeated_page_lines(pages)
+    kept, removed = [], 0
+    for page in pages:
+        lines = page.splitlines()
+        filled = [i for i, line in enumerate(lines) if line.strip()]
+        # 页码只在页面首尾找；短页面只看第一行和最后一行
+        edge = EDGE_LINES if len(filled) > 2 * EDGE_LINES else 1
+        edge_rows = set(filled[:edge] + filled[-edge:])
+        for i, line in enumerate(lines):
+            if line.strip():
+                edge_key = line_key(line, digits=True)
+                if (edge_key in edges or line_key(line) in body
+                        or (i in edge_rows and is_page_number(line))):
+                    removed += 1
+                    continue
+            kept.append(line)
+        kept.append("")
+    text = collapse_whitespace(dehyphenate("\n".join(kept)))
+    text = text + "\n" if text else ""
+    return text, {"bytes_before": len(raw.encode("utf-8")), "bytes_after": len(text.encode("utf-8")),
+                  "lines_removed": removed}
+
+
+class BoilerplateStats:
+    """语料中各行出现在多少个文档里（每个文档只计一次）"""
+
+    def __init__(self, path: Path = BOILERPLATE_FILE):
+        self.path = Path(path) if path else None
+        self.documents: Set[str] = set()
+        self.counts: Dict[str, int] = {}
+        if self.path and self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.documents = set(data.get("documents", []))
+                self.counts = data.get("lines", {})
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"警告: 模板文字统计读取失败，将重新统计 - {str(e)}")
+
+    def add_document(self, name: str, text: str):
+        if name in self.documents:
+            return
+        self.documents.add(name)
+        for key in {line_key(line) for line in text.splitlines()}:
+            if len(key) >= MIN_REPEAT_CHARS:
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def boilerplate(self) -> Set[str]:
+        docs = len(self.documents)
+        if docs < CORPUS_MIN_DOCS:
+            return set()
+        threshold = max(CORPUS_MIN_DOCS, docs * CORPUS_RATIO)
+        return {key for key, count in self.counts.items() if count >= threshold}
+
+    def save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 只出现在一个文档里的行不可能成为模板文字，不保存
+        lines = {key: count for key, count in self.counts.items() if count > 1}
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"documents": sorted(self.documents), "lines": lines}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+def strip_boilerplate(text: str, boilerplate: Set[str]) -> Tuple[str, int]:
+    """删掉模板行（章节标题和标签行除外），返回 (文本, 删除的行数)"""
+    kept, removed = [], 0
+    for line in text.splitlines():
+        if line_key(line) in boilerplate and not is_heading(line) and not is_label_line(line):
+            removed += 1
+            continue
+        kept.append(line)
+    cleaned = collapse_whitespace("\n".join(kept))
+    return (cleaned + "\n" if cleaned else ""), removed
+
+
+def clean_corpus(texts_dir: Path, names: List[str], stats_path: Path = BOILERPLATE_FILE) -> Dict:
+    """
+    把本次新提取的文本计入语料统计，再从这些文本中删除模板行（原地改写 .txt）
+    返回 {文本名: {"bytes_before", "bytes_after", "lines_removed"}}
+    """
+    stats = BoilerplateStats(stats_path)
+    texts = {}
+    for name in names:
+        path = Path(texts_dir) / f"{name}.txt"
+        if path.exists():
+            texts[name] = path.read_text(encoding="utf-8")
+            stats.add_document(name, texts[name])
+    stats.save()
+    boilerplate = stats.boilerplate()
+    report = {}
+    for name, text in texts.items():
+        cleaned, removed = strip_boilerplate(text, boilerplate) if boilerplate else (text, 0)
+        if removed:
+            (Path(texts_dir) / f"{name}.txt").write_text(cleaned, encoding="utf-8")
+        report[name] = {"bytes_before": len(text.encode("utf-8")), "bytes_after": len(cleaned.encode("utf-8")),
+                        "lines_removed": removed}
+    return report
+
+
+def format_saving(before: int, after: int) -> str:
+    saved = before - after
+    percent = saved / before * 100 if before else 0.0
+    return f"{before:,} -> {after:,} 字节，节省 {saved:,} 字节（{percent:.1f}%）"
@@ -0,0 +1,1072 @@
+"""
+无交互的批处理命令行，适合 cron / CI
+
+    python -m analyzer_core download  [--links-file links.txt]
+    python -m analyzer_core extract   [--workers 4] [--only 'P1*.pdf'] [--since 7d]
+    python -m analyzer_core analyze   [--workers 8]
+    python -m analyzer_core export    [--output-format excel,json,ndjson]
+    python -m analyzer_core all       [--progress json]
+    python -m analyzer_core watch     [--interval 1] [--debounce 2] [--once]
+    python -m analyzer_core serve     [--port 8765] [--workers 4]
+    python -m analyzer_core enqueue | worker | merge   多台机器共享任务表，见 analyzer_core/jobqueue.py
+
+project_analyzer.py / project_analyzer_local.py 后面跟子命令时也会转到这里。
+
+退出码：0 全部成功；1 部分失败；2 参数或配置错误。
+--progress json 时 stdout 每个事件输出一行 JSON（NDJSON），便于其他程序解析进度，其他提示信息输出到 stderr。
+每个子命令只接受它用到的选项（见 COMMAND_OPTIONS），--progress、--config 和目录参数所有子命令通用。
+watch 常驻运行，data/projects 中新增或修改的PDF在几秒内完成提取和分析，
+结果合并进 项目分析_watch.json（以及 --output-format 中的 Excel），Ctrl+C 退出。
+serve 启动本地HTTP分析服务（见 analyzer_core/service.py），单个PDF随时提交。
+analyze --dry-run 只估算用量；--max-tokens / --max-requests 达到上限时停止发请求，已完成的结果照常写出。
+"""
+
+import argparse
+import fnmatch
+import io
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import paths
+from .backends import BACKENDS
+
+COMMANDS = ("download", "extract", "analyze", "export", "all", "watch", "serve", "enqueue", "worker", "merge")
+OUTPUT_FORMATS = ("excel", "json", "ndjson", "parquet", "arrow")
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_USAGE = 2
+
+# 提取失败时占位行的项目名称（见 ai.failure_row）
+FAILED_NAMES = {"解析失败", "提取失败"}
+
+
+class Progress:
+    """进度输出：text 为人读格式，json 为每行一个事件"""
+
+    def __init__(self, mode: str = "text", stream=None):
+        self.mode = mode
+        self.stream = stream or sys.stdout
+
+    def emit(self, event: str, stage: str, **fields):
+        if self.mode == "json":
+            record = {"event": event, "stage": stage, "time": round(time.time(), 3), **fields}
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.stream.flush()
+            return
+        if event == "start":
+            total = fields.get("total", 0)
+            print(f"\n[{stage}] 共 {total} 项" if total is not None else f"\n[{stage}] 开始", file=self.stream)
+        elif event == "item":
+            mark = "✓" if fields.get("status") == "ok" else "✗"
+            error = f" - {fields['error']}" if fields.get("error") else ""
+            count = f"{fields.get('done')}/{fields.get('total')}" if fields.get("total") is not None \
+                else str(fields.get("done"))
+            print(f"[{count}] {mark} {fields.get('item')}{error}", file=self.stream)
+        elif event == "end":
+            print(f"[{stage}] 成功 {fields.get('ok', 0)}，失败 {fields.get('failed', 0)}", file=self.stream)
+        elif event == "output":
+            print(f"✓ 已写入: {fields.get('path')}", file=self.stream)
+        elif event == "clean":
+            print(f"[{stage}] 文本清理: {fields.get('message')}", file=self.stream)
+        elif event in ("watch", "serve", "queue", "schedule"):
+            print(f"[{stage}] {fields.get('message')}", file=self.stream)
+        elif event == "estimate":
+            print(f"[{stage}] 预估: {fields.get('message')}", file=self.stream)
+        elif event == "error":
+            print(f"✗ [{stage}] {fields.get('error')}", file=self.stream)
+
+
+def parse_since(value: str) -> float:
+    """
+    --since 参数转成时间戳，支持相对时间（30m / 12h / 7d）和 ISO 日期（2026-01-15、2026-01-15T08:00）
+    """
+    match = re.fullmatch(r"(\d+)([mhd])", value.strip())
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        delta = {"m": timedelta(minutes=amount), "h": timedelta(hours=amount), "d": timedelta(days=amount)}[unit]
+        return (datetime.now() - delta).timestamp()
+    try:
+        return datetime.fromisoformat(value.strip()).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无法解析时间: {value}（示例: 7d, 12h, 2026-01-15）")
+
+
+def parse_formats(value: str) -> List[str]:
+    formats = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in OUTPUT_FORMATS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"不支持的输出格式: {', '.join(unknown)}")
+    return formats
+
+
+def select_files(directory: Path, pattern: str, only: List[str] = None, since: float = None) -> List[Path]:
+    """按 --only 通配符和 --since 修改时间筛选文件，结果按文件名排序"""
+    files = []
+    for path in sorted(directory.glob(pattern)):
+        if only and not any(fnmatch.fnmatch(path.name, glob) for glob in only):
+            continue
+        if since is not None and path.stat().st_mtime < since:
+            continue
+        files.append(path)
+    return files
+
+
+def _run_parallel(func, items: List, workers: int, use_processes: bool = False):
+    """按完成顺序产出 (item, result)；workers <= 1 时在当前进程串行执行"""
+    if workers <= 1:
+        for item in items:
+            yield item, func(item)
+        return
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+    executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_cls(max_workers=workers) as executor:
+        futures = {executor.submit(func, item): item for item in items}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+# ---------------------------------------------------------------------------
+# 各阶段
+# ---------------------------------------------------------------------------
+
+def _load_config(args) -> Dict:
+    config_path = Path(args.config)
+    if not config_path.exists():
+        return {}
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _load_links(args) -> List[str]:
+    if args.links_file:
+        with open(args.links_file, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    config = _load_config(args)
+    return [link for link in config.get("google_drive_links", [])
+            if link and not link.startswith("在此处") and not link.startswith("例如")]
+
+
+def _download_one(task):
+    from .drive import GoogleDriveDownloader
+    link, output_path = task
+    file_id = GoogleDriveDownloader.extract_file_id(link)
+    if not file_id:
+        return "无法提取文件ID"
+    return None if GoogleDriveDownloader.download_file(file_id, output_path) else "下载失败"
+
+
+def cmd_download(args, progress: Progress) -> int:
+    from .drive import GoogleDriveDownloader
+    links = _load_links(args)
+    folders = [link for link in links if GoogleDriveDownloader.is_folder_link(link)]
+    # 文件编号按配置中的位置，混有文件夹链接时已有文件的名字不变
+    tasks = [(link, args.projects_dir / f"project_{i:03d}.pdf") for i, link in enumerate(links, 1)
+             if not GoogleDriveDownloader.is_folder_link(link)]
+    if args.only:
+        tasks = [t for t in tasks if any(fnmatch.fnmatch(t[1].name, glob) for glob in args.only)]
+    status = EXIT_OK
+    if tasks or not folders:
+        status = _run_stage("download", tasks, _download_one, args.workers, progress,
+                            label=lambda t: t[1].name)
+    for link in folders:
+        result = _download_folder(args, link, progress)
+        if result == EXIT_USAGE:
+            return result
+        status = max(status, result)
+    return status
+
+
+def _download_folder(args, link: str, progress: Progress) -> int:
+    """爬取文件夹，边列边下载；只下载新增或修改过的PDF"""
+    import http.client
+    from .drive import DriveClient, DriveError, DriveFolderCrawler, GoogleDriveDownloader
+    folder_id = GoogleDriveDownloader.extract_folder_id(link)
+    try:
+        client = DriveClient.from_config(_load_config(args))
+    except DriveError as e:
+        progress.emit("error", "download", error=str(e))
+        return EXIT_USAGE
+    crawler = DriveFolderCrawler(client, args.projects_dir, args.output_dir / "drive_listing.json",
+                                 workers=args.workers)
+    lock = threading.Lock()
+    counts = {"done": 0}
+
+    def report(name, status, error=None):
+        if status == "unchanged":
+            return
+        with lock:
+            counts["done"] += 1
+            done = counts["done"]
+        fields = {"status": "error", "error": error} if status == "failed" else {"status": "ok"}
+        progress.emit("item", "download", item=name, done=done, total=None, **fields)
+
+    def select(name):
+        return not args.only or any(fnmatch.fnmatch(name, glob) for glob in args.only)
+
+    progress.emit("start", "download", folder=folder_id, total=None)
+    try:
+        result = crawler.sync(folder_id, on_file=report, select=select)
+    except (DriveError, OSError, http.client.HTTPException) as e:
+        progress.emit("error", "download", error=f"文件夹列表失败: {e}")
+        return EXIT_PARTIAL
+    finally:
+        client.close()
+    progress.emit("end", "download", ok=len(result["downloaded"]), failed=len(result["failed"]),
+                  unchanged=result["unchanged"], listed=result["listed"])
+    return EXIT_PARTIAL if result["failed"] else EXIT_OK
+
+
+def _extract_one(task):
+    """
+    子进程入口：提取一个PDF并写出文本文件，只回传索引条目
+    有页面没有文本层且开启了 OCR 时不写文件，回传各页文本留给 OCR 阶段
+    """
+    from .ocr import needs_ocr
+    from .cleaning import clean_pages
+    from .pdf import PDFExtractor, save_text
+    pdf_path, texts_dir, use_ocr = task
+    pages = PDFExtractor.extract_pages(pdf_path)
+    if use_ocr and any(needs_ocr(page) for page in pages):
+        return {"ocr_pages": pages, "pdf_path": str(pdf_path)}
+    text, saving = clean_pages(pages)
+    if not text:
+        return {"error": "无法提取文本（扫描件需要 pdftoppm 和 tesseract 做 OCR）" if pages else "无法提取文本"}
+    return {**save_text(pdf_path, text, texts_dir), "cleaning": saving}
+
+
+def _ocr_stage(scanned: Dict[Path, List[str]], ocr, texts_dir: Path, progress: Progress, entries: List[Dict]) -> int:
+    """扫描件的所有页面先一起提交给 OCR 进程池，再按PDF收取结果"""
+    from .cleaning import clean_pages
+    from .pdf import save_text
+    jobs = {pdf_path: ocr.submit(pdf_path, pages) for pdf_path, pages in scanned.items()}
+
+    def finish(pdf_path):
+        text, saving = clean_pages(jobs[pdf_path].result())
+        if not text:
+            return {"error": "OCR后仍无法提取文本"}
+        return {**save_text(pdf_path, text, texts_dir), "cleaning": saving}
+
+    status = _run_stage("ocr", sorted(jobs), finish, 1, progress, label=lambda p: p.name, collect=entries)
+    ocr.close()
+    progress.emit("output", "ocr", path=str(ocr.cache_dir), recognized=ocr.stats["recognized"],
+                  cached=ocr.stats["cached"])
+    return status
+
+
+def _update_text_index(texts_dir: Path, entries: List[Dict]):
+    """合并进 index.json（同名PDF覆盖旧条目）"""
+    index_file = texts_dir / "index.json"
+    existing = []
+    if index_file.exists():
+        with open(index_file, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+    merged = {item["pdf_file"]: item for item in existing}
+    merged.update({item["pdf_file"]: item for item in entries})
+    with open(index_file, 'w', encoding='utf-8') as f:
+        json.dump(sorted(merged.values(), key=lambda item: item["pdf_file"]), f, ensure_ascii=False, indent=2)
+
+
+def cmd_extract(args, progress: Progress) -> int:
+    args.texts_dir.mkdir(parents=True, exist_ok=True)
+    pdf_files = select_files(args.projects_dir, "*.pdf", args.only, args.since)
+    status, _ = _extract(args, pdf_files, progress)
+    return status
+
+
+def _extract(args, pdf_files: List[Path], progress: Progress) -> Tuple[int, List[Dict]]:
+    """提取、OCR、清理并更新 index.json 和向量索引，返回 (退出码, 成功的索引条目)"""
+    from .ocr import OCRFallback
+    try:
+        ocr = OCRFallback.from_config(_load_config(args), args.output_dir / "ocr_cache") if not args.no_ocr else None
+    except ValueError as e:
+        progress.emit("error", "extract", error=str(e))
+        return EXIT_USAGE, []
+    from .scheduler import ExtractionScheduler, format_report
+    scheduler = ExtractionScheduler.from_config(_load_config(args), args.workers, args.memory_budget,
+                                                args.max_files_per_worker)
+    tasks = [(p, args.texts_dir, ocr is not None) for p in pdf_files]
+    results = []
+    status = _run_stage("extract", tasks, _extract_one, args.workers, progress, label=lambda t: t[0].name,
+                        collect=results, runner=scheduler.run(_extract_one, tasks, path_of=lambda t: t[0]))
+    if tasks:
+        progress.emit("schedule", "extract", message=format_report(scheduler.report), **scheduler.report)
+    entries = [r for r in results if "ocr_pages" not in r]
+    scanned = {Path(r["pdf_path"]): r["ocr_pages"] for r in results if "ocr_pages" in r}
+    if scanned:
+        status = max(status, _ocr_stage(scanned, ocr, args.texts_dir, progress, entries))
+    if entries:
+        _clean_corpus(args, entries, progress)
+        _update_text_index(args.texts_dir, entries)
+        status = max(status, _update_embeddings(args, progress))
+    return status, entries
+
+
+def _clean_corpus(args, entries: List[Dict], progress: Progress, stage: str = "extract"):
+    """去掉跨文档重复的模板文字，汇报清理节省的字节数"""
+    from .cleaning import clean_corpus, format_saving
+    from .pdf import refresh_entry
+    savings = [entry.pop("cleaning") for entry in entries if "cleaning" in entry]
+    report = clean_corpus(args.texts_dir, [Path(entry["text_file"]).stem for entry in entries],
+                          args.output_dir / "boilerplate.json")
+    for entry in entries:
+        refresh_entry(entry, args.texts_dir)
+    before = sum(s["bytes_before"] for s in savings)
+    after = sum(s["bytes_after"] for s in savings) - sum(r["bytes_before"] - r["bytes_after"] for r in report.values())
+    progress.emit("clean", stage, message=format_saving(before, after), bytes_before=before,
+                  bytes_after=after, lines_removed=sum(s["lines_removed"] for s in savings)
+                  + sum(r["lines_removed"] for r in report.values()))
+
+
+def _update_embeddings(args, progress: Progress) -> int:
+    """新提取的文本增量加入向量索引（相似项目、适配度查询用）"""
+    from .embeddings import update_index
+    index_dir = args.output_dir / "embeddings"
+    try:
+        result = update_index(args.texts_dir, index_dir, _load_config(args))
+    except (ValueError, ImportError) as e:
+        progress.emit("error", "embed", error=f"向量索引更新失败: {e}")
+        return EXIT_PARTIAL
+    progress.emit("output", "embed", path=str(index_dir), added=result["added"],
+                  updated=result["updated"], total=result["total"])
+    return EXIT_OK
+
+
+def _analysis_inputs(args) -> List[Path]:
+    """analyze 的输入：优先用已提取的文本，没有文本的PDF直接解析"""
+    texts = {p.stem: p for p in select_files(args.texts_dir, "*.txt", None, None)}
+    selected = []
+    for pdf in select_files(args.projects_dir, "*.pdf", args.only, args.since):
+        selected.append(texts.get(pdf.stem, pdf))
+    if not selected:
+        # 只有文本没有PDF（如 PDF 已清理）时也能分析
+        selected = [p for p in texts.values()
+                    if not args.only or any(fnmatch.fnmatch(p.stem + ".pdf", g) for g in args.only)]
+        if args.since is not None:
+            selected = [p for p in selected if p.stat().st_mtime >= args.since]
+    return sorted(selected, key=lambda p: p.stem)
+
+
+def _read_input(source: Path) -> str:
+    from .pdf import PDFExtractor
+    if source.suffix == ".txt":
+        return source.read_text(encoding='utf-8')
+    return PDFExtractor.extract_text(source)
+
+
+def _estimate(args, config: Dict, progress: Progress) -> int:
+    """--dry-run：只估算用量，不调用模型"""
+    from .usage import estimate_corpus, format_estimate
+    documents = []
+    for source in _analysis_inputs(args):
+        text = _read_input(source)
+        if text:
+            documents.append((text, f"{source.stem}.pdf"))
+    if not documents:
+        progress.emit("error", "estimate", error="没有可估算的文档")
+        return EXIT_USAGE
+    estimate = estimate_corpus(documents, config, args.workers)
+    files = estimate.pop("files")
+    progress.emit("estimate", "analyze", message=format_estimate(estimate), **estimate)
+    output_path = args.output_dir / "token预估.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({"summary": estimate, "files": files}, f, ensure_ascii=False, indent=2)
+    progress.emit("output", "estimate", path=str(output_path))
+    return EXIT_OK
+
+
+def _analysis_config(args) -> Dict:
+    """配置文件 + 命令行覆盖"""
+    config = _load_config(args)
+    if args.backend:
+        config["llm_backend"] = args.backend
+    if args.max_tokens is not None:
+        config["max_tokens_per_run"] = args.max_tokens
+    if args.max_requests is not None:
+        config["max_requests_per_run"] = args.max_requests
+    return config
+
+
+class AnalysisSession:
+    """
+    一次运行共用的模型后端、块缓存、用量计数和评分器
+    watch 模式下跨批次复用，连接池和本地模型不用每批重新建立
+    """
+
+    def __init__(self, args, config: Dict):
+        from .ai import ProjectInfoExtractor
+        from .backends import create_backend
+        from .chunking import ChunkCache
+        from .usage import UsageMeter
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+        self.args = args
+        self.config = config
+        self.meter = UsageMeter.from_config(config)
+        self.backend = create_backend(config, os.getenv("OPENAI_API_KEY"))
+        self.cache = ChunkCache(args.output_dir / "chunk_cache.json")
+        self.extractor = ProjectInfoExtractor(self.backend, cache=self.cache,
+                                              long_document_mode=config.get("long_document_mode", "map_reduce"),
+                                              meter=self.meter)
+        from profile_scorer import ProfileScorer
+        self.scorer = ProfileScorer.from_file()
+
+    def _analyze_one(self, source: Path):
+        text = _read_input(source)
+        if not text:
+            return {"error": "无法提取文本"}
+        return self.analyze_text(text, f"{source.stem}.pdf")
+
+    def analyze_text(self, text: str, filename: str) -> Dict:
+        """分析一个文档，返回 {"project": ...} 或 {"error": ...}（线程安全）"""
+        from .usage import BudgetExceeded
+        try:
+            info = self.extractor.extract(text, filename)
+        except BudgetExceeded as e:
+            return {"error": str(e)}
+        if info.get("项目名称") in FAILED_NAMES:
+            return {"error": info.get("公司用心程度", "AI提取失败"), "project": info}
+        if self.scorer:
+            info.update(self.scorer.score(text))
+        return {"project": info}
+
+    def analyze(self, sources: List[Path], progress: Progress) -> Tuple[int, List[Dict]]:
+        projects = []
+        status = _run_stage("analyze", sources, self._analyze_one, self.args.workers, progress,
+                            label=lambda p: p.stem, collect=projects, key="project")
+        # 每批结束都保存块缓存，watch 被中断也不丢
+        self.checkpoint()
+        return status, projects
+
+    def checkpoint(self):
+        self.cache.save()
+
+    def close(self, progress: Progress, run_id: str):
+        self.backend.close()
+        self.cache.save()
+        if self.meter.requests:
+            usage_path = self.args.output_dir / f"token用量_{run_id}.json"
+            self.meter.save(usage_path, self.config)
+            progress.emit("output", "usage", path=str(usage_path), **self.meter.summary(self.config))
+
+
+def cmd_analyze(args, progress: Progress) -> int:
+    config = _analysis_config(args)
+    if args.dry_run:
+        return _estimate(args, config, progress)
+    try:
+        session = AnalysisSession(args, config)
+    except Exception as e:
+        progress.emit("error", "analyze", error=f"AI提取器初始化失败: {e}")
+        return EXIT_USAGE
+
+    status, projects = session.analyze(_analysis_inputs(args), progress)
+    run_id = time.strftime('%Y%m%d_%H%M%S')
+    session.close(progress, run_id)
+    if projects:
+        projects.sort(key=lambda p: p.get("源文件", ""))
+        output_path = args.output_dir / f"项目分析_{run_id}.json"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(projects, f, ensure_ascii=False, indent=2)
+        progress.emit("output", "analyze", path=str(output_path), count=len(projects))
+
+        from .store import ResultsStore
+        with ResultsStore(args.output_dir / "results.db", args.projects_dir) as store:
+            store.record_run(projects, run_id, source=output_path.name)
+    return status
+
+
+def latest_results(output_dir: Path) -> Optional[Path]:
+    json_files = [*output_dir.glob("项目分析_*.json"), *output_dir.glob("项目分析_*.ndjson")]
+    return max(json_files, key=lambda p: p.stat().st_mtime) if json_files else None
+
+
+def cmd_export(args, progress: Progress) -> int:
+    source = Path(args.input) if args.input else latest_results(args.output_dir)
+    if source is None or not source.exists():
+        progress.emit("error", "export", error="未找到项目分析JSON文件，请先运行 analyze")
+        return EXIT_USAGE
+    from .records import load_projects
+    projects = load_projects(source)
+    if args.only:
+        projects = [p for p in projects
+                    if any(fnmatch.fnmatch(p.get("源文件", ""), glob) for glob in args.only)]
+
+    progress.emit("start", "export", total=len(args.output_format), source=str(source))
+    failed = 0
+    timestamp = time.strftime('%Y%m%d_%H%M%S')
+    for done, fmt in enumerate(args.output_format, 1):
+        try:
+            if fmt == "excel":
+                from .excel import ExcelExporter
+                output_path = args.output_dir / f"项目分析_{timestamp}.xlsx"
+                ExcelExporter.export_to_excel(projects, output_path, bid_plan=_bid_plan(projects))
+            elif fmt in ("parquet", "arrow"):
+                from .columnar import ColumnarExporter
+                output_path = ColumnarExporter.export(projects, args.output_dir / "columnar", format=fmt,
+                                                      run_id=timestamp)
+                if output_path is None:
+                    raise RuntimeError("需要安装 pyarrow")
+            elif fmt == "ndjson":
+                from .records import write_ndjson
+                output_path = args.output_dir / f"项目分析_{timestamp}.ndjson"
+                if output_path.resolve() != source.resolve():
+                    write_ndjson(projects, output_path)
+            else:
+                output_path = args.output_dir / f"项目分析_{timestamp}.json"
+                if output_path.resolve() != source.resolve():
+                    with open(output_path, 'w', encoding='utf-8') as f:
+                        json.dump(projects, f, ensure_ascii=False, indent=2)
+            progress.emit("item", "export", item=str(output_path), status="ok", done=done,
+                          total=len(args.output_format))
+        except Exception as e:
+            failed += 1
+            progress.emit("item", "export", item=fmt, status="error", error=str(e), done=done,
+                          total=len(args.output_format))
+    progress.emit("end", "export", ok=len(args.output_format) - failed, failed=failed)
+    return EXIT_PARTIAL if failed else EXIT_OK
+
+
+def _bid_plan(projects: List[Dict]) -> Optional[List[Dict]]:
+    from profile_scorer import load_user_profile
+    from bid_optimizer import BidOptimizer
+    profile = load_user_profile()
+    if not profile or not projects:
+        return None
+    try:
+        return BidOptimizer.from_profile(profile).solve(projects)
+    except ValueError:
+        return None
+
+
+def cmd_all(args, progress: Progress) -> int:
+    status = EXIT_OK
+    # --dry-run 只预估，不导出
+    stages = [cmd_extract, cmd_analyze] if args.dry_run else [cmd_extract, cmd_analyze, cmd_export]
+    if _load_links(args):
+        stages.insert(0, cmd_download)
+    for stage in stages:
+        result = stage(args, progress)
+        if result == EXIT_USAGE:
+            return result
+        status = max(status, result)
+    return status
+
+
+WATCH_RESULTS = "项目分析_watch.json"
+
+
+def _load_watch_results(args) -> List[Dict]:
+    """watch 的结果文件；第一次运行时从最新的批处理结果开始"""
+    source = args.output_dir / WATCH_RESULTS
+    if not source.exists():
+        source = latest_results(args.output_dir)
+    if source is None:
+        return []
+    from .records import load_projects
+    return load_projects(source)
+
+
+def _write_watch_results(args, projects: List[Dict], run_id: str, progress: Progress) -> int:
+    """原地更新 项目分析_watch.json、Excel 和历史结果库"""
+    output_path = args.output_dir / WATCH_RESULTS
+    tmp = output_path.with_suffix(".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(projects, f, ensure_ascii=False, indent=2)
+    tmp.replace(output_path)
+    progress.emit("output", "watch", path=str(output_path), count=len(projects))
+
+    from .store import ResultsStore
+    with ResultsStore(args.output_dir / "results.db", args.projects_dir) as store:
+        # 同一次 watch 的结果记为一个 run，每批替换
+        store.record_run(projects, run_id, source=output_path.name)
+    if "excel" not in args.output_format:
+        return EXIT_OK
+    try:
+        from .excel import ExcelExporter
+        excel_path = args.output_dir / "项目分析_watch.xlsx"
+        ExcelExporter.export_to_excel(projects, excel_path, bid_plan=_bid_plan(projects))
+        progress.emit("output", "watch", path=str(excel_path), count=len(projects))
+    except Exception as e:
+        progress.emit("error", "watch", error=f"Excel导出失败: {e}")
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+
+def _watch_batch(args, session: AnalysisSession, changed: List[Path], deleted: List[str],
+                 projects: List[Dict], run_id: str, progress: Progress) -> int:
+    """处理一批变化：只提取和分析这些PDF，再按源文件替换结果中的对应行"""
+    status = EXIT_OK
+    analyzed = []
+    if changed:
+        status, entries = _extract(args, changed, progress)
+        if status == EXIT_USAGE:
+            return status
+        sources = [args.texts_dir / entry["text_file"] for entry in entries]
+        if sources:
+            analysis_status, analyzed = session.analyze(sorted(sources, key=lambda p: p.stem), progress)
+            status = max(status, analysis_status)
+    replaced = set(deleted) | {p.get("源文件") for p in analyzed}
+    projects[:] = sorted([p for p in projects if p.get("源文件") not in replaced] + analyzed,
+                         key=lambda p: p.get("源文件", ""))
+    return max(status, _write_watch_results(args, projects, run_id, progress))
+
+
+def cmd_watch(args, progress: Progress) -> int:
+    from .watch import DirectoryWatcher
+    try:
+        session = AnalysisSession(args, _analysis_config(args))
+    except Exception as e:
+        progress.emit("error", "watch", error=f"AI提取器初始化失败: {e}")
+        return EXIT_USAGE
+
+    watcher = DirectoryWatcher(args.projects_dir, "*.pdf", args.output_dir / "watch_state.json",
+                               debounce=args.debounce)
+    projects = _load_watch_results(args)
+    if watcher.is_new:
+        # 已经分析过的PDF不再重跑，只处理新增的
+        watcher.adopt(p["源文件"] for p in projects if p.get("源文件"))
+    run_id = time.strftime('%Y%m%d_%H%M%S')
+    progress.emit("watch", "watch", path=str(args.projects_dir),
+                  message=f"监视 {args.projects_dir}，已有 {len(projects)} 个项目结果（Ctrl+C 退出）")
+    status = EXIT_OK
+    try:
+        while True:
+            changed, deleted = watcher.poll()
+            if changed or deleted:
+                progress.emit("watch", "watch", changed=[p.name for p in changed], deleted=deleted,
+                              message=f"新增/修改 {len(changed)} 个，删除 {len(deleted)} 个")
+                result = _watch_batch(args, session, changed, deleted, projects, run_id, progress)
+                watcher.commit(p.name for p in changed)
+                if result == EXIT_USAGE:
+                    return result
+                status = max(status, result)
+            elif args.once and not watcher.pending:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        progress.emit("watch", "watch", message="已停止")
+    finally:
+        session.close(progress, run_id)
+    return status
+
+
+def cmd_serve(args, progress: Progress) -> int:
+    import asyncio
+    from .ocr import OCRFallback
+    from .service import AnalysisService
+    config = _analysis_config(args)
+    try:
+        ocr = OCRFallback.from_config(config, args.output_dir / "ocr_cache") if not args.no_ocr else None
+        session = AnalysisSession(args, config)
+    except Exception as e:
+        progress.emit("error", "serve", error=f"AI提取器初始化失败: {e}")
+        return EXIT_USAGE
+
+    service = AnalysisService(session, args.output_dir, workers=args.workers, ocr=ocr)
+
+    def ready(address):
+        url = f"http://{address[0]}:{address[1]}"
+        progress.emit("serve", "serve", url=url, message=f"服务已启动: {url}（Ctrl+C 退出）")
+
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        progress.emit("serve", "serve", message="已停止")
+    except OSError as e:
+        progress.emit("error", "serve", error=f"无法监听 {args.host}:{args.port} - {e}")
+        return EXIT_USAGE
+    finally:
+        if ocr is not None:
+            ocr.close()
+        session.close(progress, time.strftime('%Y%m%d_%H%M%S'))
+    return EXIT_OK
+
+
+def _queue_path(args) -> Path:
+    return Path(args.queue) if args.queue else args.output_dir / "jobs.db"
+
+
+def cmd_enqueue(args, progress: Progress) -> int:
+    from .jobqueue import JobQueue, file_signature
+    pdf_files = select_files(args.projects_dir, "*.pdf", args.only, args.since)
+    if not pdf_files:
+        progress.emit("error", "enqueue", error=f"{args.projects_dir} 中没有要处理的PDF")
+        return EXIT_USAGE
+    queue = JobQueue(_queue_path(args))
+    counts = queue.enqueue((p.name, file_signature(p)) for p in pdf_files)
+    progress.emit("queue", "enqueue", path=str(queue.path), **counts,
+                  message=f"新增 {counts['added']}，重新排队 {counts['requeued']}，未变化 {counts['unchanged']}")
+    return EXIT_OK
+
+
+def _work_one(args, session: AnalysisSession, ocr, boilerplate, name: str) -> Dict:
+    """
+    处理一个任务：提取、清理、AI分析；返回 {"pdf_file", "text", "cleaning", "project"} 或 {"error"}
+    文本不写到本机的 --texts-dir，随结果存入任务表，由 merge 写出
+    """
+    from .cleaning import clean_pages, strip_boilerplate
+    from .ocr import needs_ocr
+    from .pdf import PDFExtractor
+    pdf_path = args.projects_dir / name
+    if not pdf_path.exists():
+        return {"error": f"PDF不存在: {pdf_path}"}
+    pages = PDFExtractor.extract_pages(pdf_path)
+    if ocr is not None and any(needs_ocr(page) for page in pages):
+        pages = ocr.fill(pdf_path, pages)
+    text, saving = clean_pages(pages)
+    if text and boilerplate:
+        # 已知的模板文字先去掉再发给模型；语料统计由 merge 更新
+        text, removed = strip_boilerplate(text, boilerplate)
+        saving = {**saving, "bytes_after": len(text.encode("utf-8")),
+                  "lines_removed": saving["lines_removed"] + removed}
+    if not text:
+        return {"error": "无法提取文本"}
+    outcome = session.analyze_text(text, name)
+    if outcome.get("error"):
+        return {"error": outcome["error"]}
+    return {"pdf_file": name, "text": text, "cleaning": saving, "project": outcome["project"]}
+
+
+def cmd_worker(args, progress: Progress) -> int:
+    """领取任务直到任务表中没有未完成的任务；可以在多台机器上同时运行"""
+    import socket
+    from .cleaning import BoilerplateStats
+    from .jobqueue import WORKER_POLL_S, JobQueue
+    from .ocr import OCRFallback
+    queue = JobQueue(_queue_path(args), lease_s=args.lease)
+    # 共享卷上的模板文字统计只读，工作进程不写
+    boilerplate = BoilerplateStats(args.output_dir / "boilerplate.json").boilerplate()
+    config = _analysis_config(args)
+    try:
+        ocr = OCRFallback.from_config(config, args.output_dir / "ocr_cache") if not args.no_ocr else None
+        session = AnalysisSession(args, config)
+    except Exception as e:
+        progress.emit("error", "worker", error=f"AI提取器初始化失败: {e}")
+        return EXIT_USAGE
+
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    held: Dict[str, str] = {}
+    lock = threading.Lock()
+    stop = threading.Event()
+    tally = {"ok": 0, "failed": 0}
+    total = queue.unfinished()
+
+    def heartbeat():
+        while not stop.wait(queue.lease_s / 3):
+            with lock:
+                leases = list(held.items())
+            if leases:
+                queue.heartbeat(leases)
+
+    def finish(name: str, error: Optional[str]):
+        with lock:
+            held.pop(name, None)
+            tally["failed" if error else "ok"] += 1
+            done = tally["ok"] + tally["failed"]
+        fields = {"status": "error", "error": error} if error else {"status": "ok"}
+        progress.emit("item", "worker", item=name, done=done, total=max(total, done), **fields)
+
+    def drain(_):
+        # 每个线程一次领一个任务，慢任务不会拖住其他线程
+        while True:
+            leases = queue.lease(worker, 1)
+            if not leases:
+                if not queue.unfinished():
+                    return
+                # 其他工作进程持有的任务可能在租约过期后回到队列
+                time.sleep(min(WORKER_POLL_S, queue.lease_s / 4))
+                continue
+            (name, token), = leases
+            with lock:
+                held[name] = token
+            try:
+                result = _work_one(args, session, ocr, boilerplate, name)
+            except Exception as e:
+                result = {"error": str(e)}
+            if result.get("error"):
+                queue.fail(name, token, result["error"])
+                finish(name, result["error"])
+            elif not queue.complete(name, token, result):
+                finish(name, "租约已过期，结果由其他工作进程提交")
+            else:
+                finish(name, None)
+
+    progress.emit("start", "worker", total=total, worker=worker)
+    beat = threading.Thread(target=heartbeat, daemon=True)
+    beat.start()
+    try:
+        list(_run_parallel(drain, list(range(max(1, args.workers))), args.workers))
+    finally:
+        stop.set()
+        if ocr is not None:
+            ocr.close()
+        session.close(progress, time.strftime('%Y%m%d_%H%M%S'))
+    progress.emit("end", "worker", **tally)
+    return EXIT_PARTIAL if tally["failed"] else EXIT_OK
+
+
+def cmd_merge(args, progress: Progress) -> int:
+    """协调者：把任务表中已完成的结果合并成常规输出"""
+    from .jobqueue import JobQueue
+    queue = JobQueue(_queue_path(args))
+    results = queue.results()
+    if not results:
+        progress.emit("error", "merge", error=f"任务表 {queue.path} 中还没有完成的任务")
+        return EXIT_USAGE
+    # 工作进程的文本写到协调者的 --texts-dir，再按整个语料清理模板文字
+    from .pdf import save_text
+    args.texts_dir.mkdir(parents=True, exist_ok=True)
+    entries = [{**save_text(Path(result["pdf_file"]), result["text"], args.texts_dir), "cleaning": result["cleaning"]}
+               for result in results]
+    _clean_corpus(args, entries, progress, stage="merge")
+    _update_text_index(args.texts_dir, entries)
+    status = _update_embeddings(args, progress)
+
+    projects = sorted((result["project"] for result in results), key=lambda p: p.get("源文件", ""))
+    run_id = time.strftime('%Y%m%d_%H%M%S')
+    output_path = args.output_dir / f"项目分析_{run_id}.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(projects, f, ensure_ascii=False, indent=2)
+    progress.emit("output", "merge", path=str(output_path), count=len(projects))
+    from .store import ResultsStore
+    with ResultsStore(args.output_dir / "results.db", args.projects_dir) as store:
+        store.record_run(projects, run_id, source=output_path.name)
+    args.input = str(output_path)
+    status = max(status, cmd_export(args, progress))
+
+    for name, error in queue.failures():
+        progress.emit("error", "merge", item=name, error=f"{name}: {error}")
+        status = max(status, EXIT_PARTIAL)
+    unfinished = queue.unfinished()
+    if unfinished:
+        progress.emit("error", "merge", error=f"还有 {unfinished} 个任务未完成，结果不完整")
+        status = max(status, EXIT_PARTIAL)
+    return status
+
+
+def _run_stage(stage: str, items: List, func, workers: int, progress: Progress, label,
+               use_processes: bool = False, collect: List = None, key: str = None, runner=None) -> int:
+    """
+    并行执行一个阶段并汇报进度
+    func 返回 None 表示成功、字符串表示错误信息，或返回带 "error" 的字典；
+    collect 不为 None 时收集成功结果（key 指定取字典中的哪个字段）；
+    runner 为产出 (item, result) 的迭代器时用它代替默认的进程/线程池（如 extract 的调度器）
+    """
+    total = len(items)
+    progress.emit("start", stage, total=total)
+    ok = failed = 0
+    if runner is None:
+        runner = _run_parallel(func, items, workers, use_processes)
+    for done, (item, result) in enumerate(runner, 1):
+        if isinstance(result, dict):
+            error = result.get("error")
+        else:
+            error = result
+        if error:
+            failed += 1
+            progress.emit("item", stage, item=label(item), status="error", error=error, done=done, total=total)
+            continue
+        ok += 1
+        if collect is not None and isinstance(result, dict):
+            collect.append(result[key] if key else result)
+        progress.emit("item", stage, item=label(item), status="ok", done=done, total=total)
+    progress.emit("end", stage, ok=ok, failed=failed)
+    return EXIT_PARTIAL if failed else EXIT_OK
+
+
+# ---------------------------------------------------------------------------
+# 参数解析
+# ---------------------------------------------------------------------------
+
+# 子命令用到的选项；--progress、--config 和目录参数所有子命令共用，其余选项只挂在用得到的子命令上，
+# 传给不用它的子命令时报错，而不是被静默忽略
+_EXTRACT_OPTIONS = ("--memory-budget", "--max-files-per-worker", "--no-ocr")
+_ANALYSIS_OPTIONS = ("--backend", "--max-tokens", "--max-requests")
+COMMAND_OPTIONS = {
+    "download": ("--workers", "--only", "--links-file"),
+    "extract": ("--workers", "--since", "--only", *_EXTRACT_OPTIONS),
+    "analyze": ("--workers", "--since", "--only", "--dry-run", *_ANALYSIS_OPTIONS),
+    "export": ("--only", "--output-format", "--input"),
+    "all": ("--workers", "--since", "--only", "--links-file", "--output-format", "--dry-run",
+            *_EXTRACT_OPTIONS, *_ANALYSIS_OPTIONS),
+    "watch": ("--workers", "--output-format", *_EXTRACT_OPTIONS, *_ANALYSIS_OPTIONS),
+    "serve": ("--workers", "--no-ocr", *_ANALYSIS_OPTIONS),
+    "enqueue": ("--since", "--only"),
+    "worker": ("--workers", "--no-ocr", *_ANALYSIS_OPTIONS),
+    "merge": ("--output-format",),
+}
+# 子命令内部共用的函数会读取的属性（如 merge 和 all 调用 cmd_export），不接受对应选项时的取值
+_DEFAULTS = {"workers": 4, "since": None, "only": None, "output_format": ["excel", "json"], "input": None,
+             "dry_run": False, "no_ocr": False, "memory_budget": None, "max_files_per_worker": None,
+             "backend": None, "max_tokens": None, "max_requests": None, "links_file": None}
+
+
+def _add_option(parser: argparse.ArgumentParser, option: str):
+    if option == "--workers":
+        parser.add_argument("--workers", type=int, default=4, help="并行数，1 表示串行（默认 4）")
+    elif option == "--memory-budget":
+        parser.add_argument("--memory-budget", type=float, default=None, metavar="MB",
+                            help="同时提取的PDF预估内存上限（默认物理内存的一半）")
+    elif option == "--max-files-per-worker":
+        parser.add_argument("--max-files-per-worker", type=int, default=None, metavar="N",
+                            help="提取进程处理 N 个文件后换新进程（默认 50）")
+    elif option == "--since":
+        parser.add_argument("--since", type=parse_since, default=None,
+                            help="只处理该时间之后修改的文件，如 7d、12h、2026-01-15")
+    elif option == "--only":
+        parser.add_argument("--only", action="append", default=None, metavar="GLOB",
+                            help="只处理匹配的文件名（可重复），如 'P1*.pdf'")
+    elif option == "--output-format":
+        parser.add_argument("--output-format", type=parse_formats, default=["excel", "json"],
+                            help="导出格式，逗号分隔：excel,json,ndjson,parquet,arrow（默认 excel,json）")
+    elif option == "--links-file":
+        parser.add_argument("--links-file", default=None, help="每行一个Google Drive链接，优先于配置文件")
+    elif option == "--no-ocr":
+        parser.add_argument("--no-ocr", action="store_true", help="扫描件不做 OCR（默认有 tesseract 时自动 OCR）")
+    elif option == "--backend":
+        parser.add_argument("--backend", choices=BACKENDS, default=None,
+                            help="AI提取的模型后端，覆盖配置中的 llm_backend")
+    elif option == "--dry-run":
+        parser.add_argument("--dry-run", action="store_true",
+                            help="只估算 token、请求数、费用和耗时，不调用模型")
+    elif option == "--max-tokens":
+        parser.add_argument("--max-tokens", type=int, default=None,
+                            help="本次运行的 token 上限，覆盖配置中的 max_tokens_per_run")
+    elif option == "--max-requests":
+        parser.add_argument("--max-requests", type=int, default=None,
+                            help="本次运行的请求数上限，覆盖配置中的 max_requests_per_run")
+    elif option == "--input":
+        parser.add_argument("--input", default=None,
+                            help="使用的结果文件，.json 或 .ndjson（默认最新的项目分析_*.json/.ndjson）")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--progress", choices=("text", "json"), default="text",
+                        help="进度输出格式，json 为每行一个事件（其他提示信息改到 stderr）")
+    common.add_argument("--projects-dir", type=Path, default=paths.PROJECTS_DIR)
+    common.add_argument("--texts-dir", type=Path, default=paths.TEXTS_DIR)
+    common.add_argument("--output-dir", type=Path, default=paths.OUTPUT_DIR)
+    common.add_argument("--config", default="project_analyzer_config.json", help="配置文件")
+
+    parser = argparse.ArgumentParser(prog="python -m analyzer_core", description="项目分析系统批处理命令行")
+    sub = parser.add_subparsers(dest="command", required=True)
+    helps = {
+        "download": "从Google Drive链接下载PDF",
+        "extract": "提取PDF文本到 data/project_texts",
+        "analyze": "AI提取项目信息，结果写入 data/output/项目分析_*.json",
+        "export": "把最新的分析结果导出为 Excel / JSON",
+        "all": "依次执行 download（有链接时）、extract、analyze、export",
+        "watch": "监视 data/projects，新增或修改的PDF自动提取、分析并更新结果",
+        "serve": "启动本地HTTP分析服务，提交单个PDF、查询状态和结果",
+        "enqueue": "把PDF加入共享任务表（多台机器分担处理）",
+        "worker": "从共享任务表领取任务，提取并分析，直到任务表处理完",
+        "merge": "合并共享任务表中的结果，写出 Excel / JSON",
+    }
+    for name in COMMANDS:
+        command = sub.add_parser(name, parents=[common], help=helps[name])
+        command.set_defaults(**_DEFAULTS)
+        for option in COMMAND_OPTIONS[name]:
+            _add_option(command, option)
+        if name == "watch":
+            command.add_argument("--interval", type=float, default=1.0, help="扫描目录的间隔秒数（默认 1）")
+            command.add_argument("--debounce", type=float, default=2.0,
+                                 help="文件多少秒内不再变化才处理，一次拷入的一批文件合并处理（默认 2）")
+            command.add_argument("--once", action="store_true", help="处理完当前的新文件后退出")
+        elif name == "serve":
+            command.add_argument("--host", default="127.0.0.1", help="监听地址（默认只监听本机）")
+            command.add_argument("--port", type=int, default=8765, help="监听端口（默认 8765）")
+        if name in ("enqueue", "worker", "merge"):
+            command.add_argument("--queue", default=None, help="共享任务表路径（默认 <output-dir>/jobs.db）")
+        if name == "worker":
+            command.add_argument("--lease", type=float, default=120.0,
+                                 help="任务租约秒数，工作进程掉线后任务在这之后被重新领取（默认 120）")
+    return parser
+
+
+HANDLERS = {
+    "download": cmd_download,
+    "extract": cmd_extract,
+    "analyze": cmd_analyze,
+    "export": cmd_export,
+    "all": cmd_all,
+    "watch": cmd_watch,
+    "serve": cmd_serve,
+    "enqueue": cmd_enqueue,
+    "worker": cmd_worker,
+    "merge": cmd_merge,
+}
+
+
+def _move_stdout_to_stderr():
+    """
+    把 stdout 改到 stderr，返回 (事件输出流, 恢复函数)
+    stdout 是真实文件时在文件描述符层面重定向，子进程也生效；否则（如被测试捕获）只替换 sys.stdout
+    """
+    sys.stdout.flush()
+    try:
+        fd = sys.stdout.fileno()
+        sys.stderr.fileno()
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        fd = None
+    saved = sys.stdout
+    if fd is None:
+        sys.stdout = sys.stderr
+
+        def restore():
+            sys.stdout = saved
+        return saved, restore
+
+    events = os.fdopen(os.dup(fd), "w", encoding="utf-8", errors="replace")
+    os.dup2(sys.stderr.fileno(), fd)
+
+    def restore():
+        sys.stdout.flush()
+        events.flush()
+        os.dup2(events.fileno(), fd)
+        events.close()
+    return events, restore
+
+
+_stdout_lock = threading.Lock()
+_stdout_state = {"users": 0, "events": None, "restore": None}
+
+
+@contextmanager
+def _events_on_stdout():
+    """--progress json：stdout 只输出事件，其他代码（包括子进程）的 print 改到 stderr；可以在多个线程中同时使用"""
+    with _stdout_lock:
+        if not _stdout_state["users"]:
+            _stdout_state["events"], _stdout_state["restore"] = _move_stdout_to_stderr()
+        _stdout_state["users"] += 1
+        events = _stdout_state["events"]
+    try:
+        yield events
+    finally:
+        with _stdout_lock:
+            _stdout_state["users"] -= 1
+            if not _stdout_state["users"]:
+                _stdout_state["restore"]()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    for directory in (args.projects_dir, args.texts_dir, args.output_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+    if args.progress != "json":
+        return HANDLERS[args.command](args, Progress(args.progress))
+    with _events_on_stdout() as events:
+        return HANDLERS[args.command](args, Progress("json", events))
@@ -0,0 +1,169 @@
+"""
+列式导出 - Parquet / Arrow IPC
+
+按运行日期分区（hive 风格目录），一次运行一个文件：
+
+    data/output/columnar/run_date=2026-01-15/项目分析_20260115_093000.parquet
+
+所处行业、公司名称取值重复多，写成字典编码列；其余列为字符串，适配得分为整数。
+读取时只解码需要的列，不必解析整个 JSON。pyarrow 是可选依赖，用到时才导入。
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .excel import COLUMN_ORDER
+from .paths import COLUMNAR_DIR
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+CATEGORICAL_COLUMNS = ("所处行业", "公司名称")
+INTEGER_COLUMNS = ("适配得分",)
+RUN_ID_COLUMN = "run_id"
+
+
+def partition_dir(base_dir: Path, run_date: str) -> Path:
+    return Path(base_dir) / f"run_date={run_date}"
+
+
+def run_files(base_dir: Path = COLUMNAR_DIR) -> List[Path]:
+    """所有运行的文件，按 (运行日期, 运行ID) 从旧到新排序"""
+    files = [p for p in Path(base_dir).glob("run_date=*/项目分析_*")
+             if p.suffix in FORMATS.values()]
+    return sorted(files, key=lambda p: (p.parent.name, p.stem))
+
+
+def latest_run_file(base_dir: Path = COLUMNAR_DIR) -> Optional[Path]:
+    files = run_files(base_dir)
+    return files[-1] if files else None
+
+
+def _cell(value):
+    """AI 返回的字段类型不固定，统一成字符串（列表/字典转 JSON）"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _int_cell(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_table(projects: List[Dict], run_id: str):
+    """项目列表 -> pyarrow.Table（列顺序与 Excel 一致）"""
+    import pyarrow as pa
+
+    columns = [col for col in COLUMN_ORDER if any(col in p for p in projects)]
+    for project in projects:
+        columns.extend(col for col in project if col not in columns)
+
+    arrays, names = [], []
+    for col in columns:
+        if col in INTEGER_COLUMNS:
+            array = pa.array([_int_cell(p.get(col)) for p in projects], type=pa.int64())
+        else:
+            array = pa.array([_cell(p.get(col)) for p in projects], type=pa.string())
+            if col in CATEGORICAL_COLUMNS:
+                array = array.dictionary_encode()
+        arrays.append(array)
+        names.append(col)
+    arrays.append(pa.array([run_id] * len(projects), type=pa.string()).dictionary_encode())
+    names.append(RUN_ID_COLUMN)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+class ColumnarExporter:
+    """写出和读取列式结果"""
+
+    @staticmethod
+    def export(projects: List[Dict], base_dir: Path = COLUMNAR_DIR, format: str = "parquet",
+               run_id: str = None) -> Optional[Path]:
+        """写出一次运行的结果，返回文件路径；未安装 pyarrow 时返回 None"""
+        if format not in FORMATS:
+            raise ValueError(f"不支持的列式格式: {format}")
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("错误: 列式导出需要安装 pyarrow")
+            return None
+
+        run_id = run_id or time.strftime("%Y%m%d_%H%M%S")
+        try:
+            run_date = time.strftime("%Y-%m-%d", time.strptime(run_id, "%Y%m%d_%H%M%S"))
+        except ValueError:
+            run_date = time.strftime("%Y-%m-%d")
+        output_dir = partition_dir(base_dir, run_date)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_path = output_dir / f"项目分析_{run_id}{FORMATS[format]}"
+
+        table = build_table(projects, run_id)
+        if format == "parquet":
+            pq.write_table(table, output_path, use_dictionary=list(CATEGORICAL_COLUMNS) + [RUN_ID_COLUMN],
+                           compression="zstd")
+        else:
+            with pa.OSFile(str(output_path), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+        print(f"✓ {format} 文件已导出: {output_path}")
+        return output_path
+
+    @staticmethod
+    def read_table(path: Path, columns: List[str] = None):
+        """只读取指定的列，返回 pyarrow.Table"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = Path(path)
+        if path.suffix == FORMATS["parquet"]:
+            return pq.read_table(path, columns=columns)
+        # Arrow IPC 文件用内存映射打开，只有选中的列会被实际读入
+        with pa.memory_map(str(path), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns:
+            table = table.select([col for col in columns if col in table.column_names])
+        return table
+
+    @staticmethod
+    def load_latest(base_dir: Path = COLUMNAR_DIR, columns: List[str] = None) -> Optional[List[Dict]]:
+        """
+        读取最新一次运行的结果（项目字典列表），没有列式文件或未安装 pyarrow 时返回 None，
+        调用方可以回退到 JSON。空单元格的键省略（与 JSON 结果一致），project.get(key, 默认值) 照常回退
+        """
+        latest = latest_run_file(base_dir)
+        if latest is None:
+            return None
+        try:
+            table = ColumnarExporter.read_table(latest, columns)
+        except ImportError:
+            return None
+        return [{key: value for key, value in row.items() if value is not None and key != RUN_ID_COLUMN}
+                for row in table.to_pylist()]
+
+    @staticmethod
+    def load_runs(base_dir: Path = COLUMNAR_DIR, columns: List[str] = None, since: str = None):
+        """
+        读取多次运行并拼接成一个 pyarrow.Table（跨学期分析用）
+        since 为 "YYYY-MM-DD"，按分区目录过滤，早于该日期的文件不会被打开
+        """
+        import pyarrow as pa
+
+        tables = []
+        for path in run_files(base_dir):
+            if since and path.parent.name.split("=", 1)[1] < since:
+                continue
+            table = ColumnarExporter.read_table(path, columns)
+            if columns and RUN_ID_COLUMN not in table.column_names:
+                table = table.append_column(RUN_ID_COLUMN, pa.array([path.stem[len("项目分析_"):]] * len(table)))
+            tables.append(table)
+        if not tables:
+            return None
+        return pa.concat_tables(tables, promote_options="default")
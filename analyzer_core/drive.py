@@ -0,0 +1,417 @@
+"""
+Google Drive 下载
+
+- GoogleDriveDownloader  单个共享链接的下载
+- DriveClient            Drive API v3 的最小客户端（标准库 http.client，每个线程一个长连接）
+- DriveFolderCrawler     按文件夹链接分页、递归列出所有PDF，边列边交给下载线程池；
+                         列表（文件ID、修改时间、MD5）缓存在 data/output/drive_listing.json，
+                         再次同步时只下载新增或修改过的文件
+
+列文件夹需要 API 密钥（文件夹"任何知道链接的人可查看"即可）或 OAuth 访问令牌，
+配置在 project_analyzer_config.json 或环境变量中：
+
+    "google_api_key": "AIza...",           # 或环境变量 GOOGLE_API_KEY
+    "google_access_token": "ya29...",      # 或环境变量 GOOGLE_ACCESS_TOKEN（私有文件夹）
+    "drive_api_base": "https://www.googleapis.com/drive/v3"
+
+Google 文档、幻灯片按PDF导出下载。
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlencode, urlparse
+
+from .paths import OUTPUT_DIR
+
+DRIVE_API = "https://www.googleapis.com/drive/v3"
+FOLDER_MIME = "application/vnd.google-apps.folder"
+PDF_MIME = "application/pdf"
+# 原生 Google 文件按PDF导出
+EXPORT_MIMES = {"application/vnd.google-apps.document", "application/vnd.google-apps.presentation"}
+PAGE_SIZE = 1000
+LISTING_CACHE = OUTPUT_DIR / "drive_listing.json"
+RETRIES = 3
+_LIST_FIELDS = "nextPageToken,files(id,name,mimeType,modifiedTime,size,md5Checksum)"
+_UNSAFE_NAME = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+
+class GoogleDriveDownloader:
+    """从Google Drive共享链接下载PDF文件"""
+    
+    @staticmethod
+    def extract_file_id(share_link: str) -> Optional[str]:
+        """从Google Drive共享链接中提取文件ID"""
+        patterns = [
+            r'/file/d/([a-zA-Z0-9_-]+)',
+            r'id=([a-zA-Z0-9_-]+)',
+            r'/([a-zA-Z0-9_-]{25,})',  # Google Drive文件ID通常是25+字符
+        ]
+        
+        for pattern in patterns:
+            match = re.search(pattern, share_link)
+            if match:
+                return match.group(1)
+        return None
+    
+    @staticmethod
+    def extract_folder_id(folder_link: str) -> Optional[str]:
+        """从Google Drive文件夹链接中提取文件夹ID"""
+        patterns = [
+            r'/folders/([a-zA-Z0-9_-]+)',
+            r'id=([a-zA-Z0-9_-]+)',
+        ]
+        
+        for pattern in patterns:
+            match = re.search(pattern, folder_link)
+            if match:
+                return match.group(1)
+        return None
+    
+    @staticmethod
+    def download_file(file_id: str, output_path: Path, filename: str = None) -> bool:
+        """下载Google Drive文件"""
+        import requests
+        
+        # 使用export格式下载（适用于PDF）
+        download_url = f"https://drive.google.com/uc?export=download&id={file_id}"
+        
+        try:
+            # 首先获取确认页面（大文件需要确认）
+            session = requests.Session()
+            response = session.get(f"https://drive.google.com/uc?id={file_id}", stream=True)
+            
+            # 检查是否需要确认
+            if 'download_warning' in response.url or 'confirm' in response.url:
+                # 提取确认token
+                confirm_match = re.search(r'confirm=([^&]+)', response.url)
+                if confirm_match:
+                    confirm_token = confirm_match.group(1)
+                    download_url = f"https://drive.google.com/uc?export=download&id={file_id}&confirm={confirm_token}"
+                    response = session.get(download_url, stream=True)
+            
+            # 如果响应是HTML（错误页面），尝试直接下载
+            if response.headers.get('Content-Type', '').startswith('text/html'):
+                # 尝试使用不同的下载方式
+                download_url = f"https://drive.google.com/uc?export=download&id={file_id}"
+                response = requests.get(download_url, stream=True, allow_redirects=True)
+            
+            if response.status_code == 200:
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(output_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        f.write(chunk)
+                print(f"✓ 下载成功: {output_path.name}")
+                return True
+            else:
+                print(f"✗ 下载失败: {response.status_code} - {output_path.name}")
+                return False
+                
+        except Exception as e:
+            print(f"✗ 下载错误: {output_path.name} - {str(e)}")
+            return False
+    
+    @staticmethod
+    def is_folder_link(link: str) -> bool:
+        return "/folders/" in link
+
+    @staticmethod
+    def download_from_folder_link(folder_link: str, output_dir: Path, config: Dict = None,
+                                  workers: int = 4) -> List[str]:
+        """
+        从Google Drive文件夹链接下载所有PDF文件（含子文件夹），返回本次下载的文件名
+        没有配置 API 密钥或访问令牌时抛出 DriveError；重试后仍连不上时抛出 OSError / http.client.HTTPException
+        """
+        folder_id = GoogleDriveDownloader.extract_folder_id(folder_link)
+        if not folder_id:
+            raise DriveError(f"无法从链接中提取文件夹ID: {folder_link}")
+        client = DriveClient.from_config(config or {})
+        crawler = DriveFolderCrawler(client, output_dir, workers=workers)
+
+        def report(name, status, error=None):
+            if status == "downloaded":
+                print(f"✓ 下载成功: {name}")
+            elif status == "failed":
+                print(f"✗ 下载失败: {name} - {error}")
+
+        try:
+            result = crawler.sync(folder_id, on_file=report)
+        finally:
+            client.close()
+        print(f"✓ 文件夹同步完成: 共 {result['listed']} 个PDF，下载 {len(result['downloaded'])} 个，"
+              f"未变化 {result['unchanged']} 个，失败 {len(result['failed'])} 个")
+        return result["downloaded"]
+
+
+class DriveError(RuntimeError):
+    """Drive API 返回错误或缺少认证"""
+
+
+class DriveClient:
+    """Drive API v3：列文件夹、下载文件"""
+
+    def __init__(self, api_key: str = None, access_token: str = None, api_base: str = DRIVE_API,
+                 timeout: float = 60):
+        if not api_key and not access_token:
+            raise DriveError("列出文件夹需要 Google API 密钥（google_api_key / GOOGLE_API_KEY）"
+                             "或访问令牌（google_access_token / GOOGLE_ACCESS_TOKEN）")
+        self.api_key = api_key
+        self.access_token = access_token
+        url = urlparse(api_base)
+        self.https = url.scheme == "https"
+        self.host = url.hostname
+        self.port = url.port or (443 if self.https else 80)
+        self.prefix = url.path.rstrip("/")
+        self.timeout = timeout
+        self.requests = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # 每个线程一个连接，全部记下来，close() 时连下载线程的连接一起关闭
+        self._connections = []
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "DriveClient":
+        return cls(config.get("google_api_key") or os.getenv("GOOGLE_API_KEY"),
+                   config.get("google_access_token") or os.getenv("GOOGLE_ACCESS_TOKEN"),
+                   config.get("drive_api_base", DRIVE_API))
+
+    def _connection(self):
+        import http.client
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = cls(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _get(self, path: str, params: Dict, sink=None) -> bytes:
+        """
+        GET 请求；sink 不为 None 时把响应体分块交给它（下载大文件不占内存）
+        429 和 5xx 按指数退避重试，连接断开时重连；响应体已经开始交给 sink 后断开的不在这里重试，
+        直接抛出，由调用方（download）从头重新下载
+        """
+        import http.client
+        params = dict(params)
+        headers = {}
+        if self.access_token:
+            headers["Authorization"] = f"Bearer {self.access_token}"
+        elif self.api_key:
+            params["key"] = self.api_key
+        target = f"{self.prefix}{path}?{urlencode(params)}"
+        for attempt in range(RETRIES):
+            conn = self._connection()
+            streaming = False
+            try:
+                conn.request("GET", target, headers=headers)
+                response = conn.getresponse()
+                with self._lock:
+                    self.requests += 1
+                if response.status == 200:
+                    if sink is None:
+                        return response.read()
+                    streaming = True
+                    for block in iter(lambda: response.read(1 << 16), b""):
+                        sink(block)
+                    # read(amt) 遇到提前断开只返回 b""，按 Content-Length 检查是否收全
+                    if response.length:
+                        raise http.client.IncompleteRead(b"", response.length)
+                    return b""
+                body = response.read()
+                if response.status != 429 and response.status < 500:
+                    raise DriveError(f"Drive API {response.status}: {body[:200].decode('utf-8', 'replace')}")
+            except (http.client.HTTPException, ConnectionError, TimeoutError):
+                conn.close()
+                self._local.conn = None
+                with self._lock:
+                    if conn in self._connections:
+                        self._connections.remove(conn)
+                if streaming or attempt == RETRIES - 1:
+                    raise
+            time.sleep(0.5 * 2 ** attempt)
+        raise DriveError(f"Drive API 重试 {RETRIES} 次仍失败: {path}")
+
+    def list_children(self, folder_id: str) -> Iterator[Dict]:
+        """逐页列出文件夹的直接子项"""
+        page_token = None
+        while True:
+            params = {"q": f"'{folder_id}' in parents and trashed = false", "fields": _LIST_FIELDS,
+                      "pageSize": PAGE_SIZE, "supportsAllDrives": "true", "includeItemsFromAllDrives": "true"}
+            if page_token:
+                params["pageToken"] = page_token
+            page = json.loads(self._get("/files", params))
+            yield from page.get("files", [])
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                return
+
+    def download(self, item: Dict, output_path: Path) -> str:
+        """
+        下载到临时文件再改名，返回内容的 MD5；Drive 给出了 MD5 时校验
+        传输中断时从头重新下载（临时文件清空、MD5 重新计算；导出的 Google 文档没有 MD5 可校验），
+        失败时删除临时文件
+        """
+        import http.client
+        if item.get("mimeType") in EXPORT_MIMES:
+            path, params = f"/files/{item['id']}/export", {"mimeType": PDF_MIME}
+        else:
+            path, params = f"/files/{item['id']}", {"alt": "media", "supportsAllDrives": "true"}
+        tmp = output_path.with_name(output_path.name + ".part")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            for attempt in range(RETRIES):
+                digest = hashlib.md5()
+                try:
+                    with open(tmp, 'wb') as f:
+                        def sink(block):
+                            digest.update(block)
+                            f.write(block)
+
+                        self._get(path, params, sink)
+                    break
+                except (http.client.HTTPException, ConnectionError, TimeoutError):
+                    if attempt == RETRIES - 1:
+                        raise
+                    time.sleep(0.5 * 2 ** attempt)
+            expected = item.get("md5Checksum")
+            if expected and expected != digest.hexdigest():
+                raise DriveError("下载内容校验失败（MD5 不一致）")
+            os.replace(tmp, output_path)
+        except BaseException:
+            if tmp.exists():
+                tmp.unlink()
+            raise
+        return digest.hexdigest()
+
+    def close(self):
+        """关闭所有线程打开的连接"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local.conn = None
+
+
+def _is_pdf(item: Dict) -> bool:
+    return (item.get("mimeType") == PDF_MIME or item.get("mimeType") in EXPORT_MIMES
+            or item.get("name", "").lower().endswith(".pdf"))
+
+
+class DriveFolderCrawler:
+    """
+    递归列出文件夹中的PDF并同步到本地目录
+    子文件夹中的文件也保存到 output_dir 下（不建子目录），重名时文件名后加文件ID前缀
+    """
+
+    def __init__(self, client: DriveClient, output_dir: Path, cache_path: Optional[Path] = LISTING_CACHE,
+                 workers: int = 4):
+        self.client = client
+        self.output_dir = Path(output_dir)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.workers = max(1, workers)
+        self.cache: Dict[str, Dict] = {}
+        if self.cache_path and self.cache_path.exists():
+            try:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    self.cache = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"警告: Drive 列表缓存读取失败，将重新下载 - {str(e)}")
+
+    def walk(self, folder_id: str) -> Iterator[Dict]:
+        """广度优先列出所有PDF，每项带 "folder"（相对路径）"""
+        queue = [(folder_id, "")]
+        seen = {folder_id}
+        while queue:
+            current, prefix = queue.pop(0)
+            for item in self.client.list_children(current):
+                if item.get("mimeType") == FOLDER_MIME:
+                    # 快捷方式可能造成循环
+                    if item["id"] not in seen:
+                        seen.add(item["id"])
+                        queue.append((item["id"], f"{prefix}{item['name']}/"))
+                elif _is_pdf(item):
+                    yield {**item, "folder": prefix}
+
+    def local_name(self, item: Dict, taken: Dict[str, str]) -> str:
+        cached = self.cache.get(item["id"], {}).get("local")
+        if cached and taken.get(cached, item["id"]) == item["id"]:
+            return cached
+        name = _UNSAFE_NAME.sub("_", item["name"]).strip() or item["id"]
+        if not name.lower().endswith(".pdf"):
+            name += ".pdf"
+        if taken.get(name, item["id"]) != item["id"]:
+            stem, suffix = os.path.splitext(name)
+            name = f"{stem}_{item['id'][:8]}{suffix}"
+        return name
+
+    def _unchanged(self, item: Dict, name: str) -> bool:
+        """修改时间没变，或只改了元数据（MD5 相同）"""
+        cached = self.cache.get(item["id"])
+        if not cached or cached.get("local") != name or not (self.output_dir / name).exists():
+            return False
+        return cached.get("modifiedTime") == item.get("modifiedTime") \
+            or (item.get("md5Checksum") is not None and cached.get("md5") == item["md5Checksum"])
+
+    def sync(self, folder_id: str, on_file: Callable = None, select: Callable = None) -> Dict:
+        """
+        列出并下载；列表还没列完时下载就已经开始
+        on_file(文件名, "downloaded" / "unchanged" / "failed", 错误信息) 用于汇报进度
+        select(文件名) 返回 False 的文件跳过（命令行的 --only）
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        on_file = on_file or (lambda *args: None)
+        result = {"listed": 0, "unchanged": 0, "downloaded": [], "failed": []}
+        taken = {entry["local"]: file_id for file_id, entry in self.cache.items() if entry.get("local")}
+        lock = threading.Lock()
+
+        def fetch(item, name):
+            try:
+                md5 = self.client.download(item, self.output_dir / name)
+            except Exception as e:
+                with lock:
+                    result["failed"].append(name)
+                on_file(name, "failed", str(e))
+                return
+            with lock:
+                self.cache[item["id"]] = {"local": name, "name": item["name"], "folder": item["folder"],
+                                          "modifiedTime": item.get("modifiedTime"), "md5": md5}
+                result["downloaded"].append(name)
+            on_file(name, "downloaded")
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for item in self.walk(folder_id):
+                    result["listed"] += 1
+                    with lock:
+                        name = self.local_name(item, taken)
+                        taken[name] = item["id"]
+                    if select is not None and not select(name):
+                        continue
+                    if self._unchanged(item, name):
+                        with lock:
+                            self.cache[item["id"]]["modifiedTime"] = item.get("modifiedTime")
+                        result["unchanged"] += 1
+                        on_file(name, "unchanged")
+                        continue
+                    pool.submit(fetch, item, name)
+        finally:
+            # 列表中途出错时，已下载的文件也记入缓存
+            self.save()
+        result["downloaded"].sort()
+        result["failed"].sort()
+        return result
+
+    def save(self):
+        if not self.cache_path:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.cache_path)
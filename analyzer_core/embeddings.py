@@ -0,0 +1,517 @@
+"""
+项目文本的向量索引 - 相似项目与适配度排序
+
+"找和我喜欢的这三个项目相似的项目"、"按我的兴趣给所有项目排序"不再需要整轮调用AI：
+data/project_texts 下的每篇文本转成一个向量，查询只是在本地做点积。
+
+向量化（按配置 embedding_backend 选择）：
+
+- hashed_tfidf           默认，只用标准库。英文按词、中文按相邻两字切分，特征哈希到 2^20 个桶，
+                         用 1+log(tf) * idf 加权，再用固定的稀疏随机投影降到 256 维并归一化
+                         （投影与语料无关，新增文本不需要重算已有向量）
+- sentence_transformers  本地 CPU 模型（pip install sentence-transformers），
+                         模型名由 embedding_model 指定，默认 all-MiniLM-L6-v2
+
+存储（data/output/embeddings/）：
+
+    vectors.f32   N × dim 的 float32 矩阵（本机字节序），查询时内存映射，不整体读入
+    meta.json     行号 -> 文本名、修改时间，idf 统计，IVF 聚类
+
+行数少时逐行点积（flat）；超过 IVF_MIN_ROWS 行后按 k-means 分成 √N 个列表，
+查询只扫描最近的 NPROBE 个列表。
+
+update() 只向量化新增或修改过的文本；有文本被删除、换了向量化方式或语料比上次全量构建
+增长了一半以上（idf 偏差变大）时才全量重建。
+
+    python -m analyzer_core.embeddings update
+    python -m analyzer_core.embeddings similar project_003 project_017 --k 5
+    python -m analyzer_core.embeddings fit --k 20
+    python -m analyzer_core.embeddings search "portfolio risk dashboard"
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import sys
+import zlib
+from array import array
+from functools import lru_cache
+from operator import mul
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from .paths import OUTPUT_DIR, TEXTS_DIR
+
+EMBEDDINGS_DIR = OUTPUT_DIR / "embeddings"
+VECTORS_FILE = "vectors.f32"
+META_FILE = "meta.json"
+
+HASHED_DIM = 256
+FEATURE_BITS = 20
+PROJECTIONS_PER_FEATURE = 4
+
+IVF_MIN_ROWS = 1024
+NPROBE = 4
+KMEANS_ITERATIONS = 8
+# k-means 只用等距抽取的 KMEANS_SAMPLE × 聚类数 行训练
+KMEANS_SAMPLE = 8
+
+# 语料比上次全量构建增长超过这个比例时重建（idf 随语料变化）
+REBUILD_GROWTH = 1.5
+
+# 适配度：兴趣方向的相似度减去 AVOID_WEIGHT × 想避开行业的相似度
+AVOID_WEIGHT = 0.5
+
+_TOKEN = re.compile(r"[a-z][a-z0-9+#]*|[一-鿿]+")
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "will", "are", "was", "were", "been", "have", "has",
+    "our", "their", "they", "you", "your", "its", "into", "over", "such", "also", "can", "may", "which",
+    "who", "what", "when", "where", "how", "all", "any", "each", "other", "more", "most", "than", "then",
+    "these", "those", "there", "here", "not", "but", "about", "project", "projects", "team", "students",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """英文取小写单词（去停用词），中文取相邻两字"""
+    tokens = []
+    for match in _TOKEN.finditer(text.lower()):
+        word = match.group()
+        if word[0] >= "一":
+            tokens.extend(word[i:i + 2] for i in range(max(1, len(word) - 1)))
+        elif len(word) > 1 and word not in STOPWORDS:
+            tokens.append(word)
+    return tokens
+
+
+def _normalize(values: List[float]) -> array:
+    norm = math.sqrt(sum(v * v for v in values))
+    return array("f", (v / norm for v in values) if norm else values)
+
+
+def _dot(a, b) -> float:
+    return sum(map(mul, a, b))
+
+
+@lru_cache(maxsize=1 << 16)
+def _projection(bucket: int) -> Tuple[Tuple[int, float], ...]:
+    """特征桶 -> 投影到的 (维度, ±权重)，由桶号确定，与语料无关"""
+    digest = hashlib.blake2b(bucket.to_bytes(4, "little"), digest_size=8).digest()
+    weight = 1 / math.sqrt(PROJECTIONS_PER_FEATURE)
+    signs = digest[PROJECTIONS_PER_FEATURE]
+    return tuple((digest[i] % HASHED_DIM, weight if signs >> i & 1 else -weight)
+                 for i in range(PROJECTIONS_PER_FEATURE))
+
+
+class HashedTfidfEmbedder:
+    """特征哈希 TF-IDF + 稀疏随机投影；idf 统计随 observe 累积"""
+
+    name = "hashed_tfidf"
+    dim = HASHED_DIM
+
+    def __init__(self, df: Dict[int, int] = None, docs: int = 0):
+        self.df: Dict[int, int] = dict(df or {})
+        self.docs = docs
+
+    @staticmethod
+    def features(text: str) -> Dict[int, int]:
+        counts: Dict[int, int] = {}
+        mask = (1 << FEATURE_BITS) - 1
+        for token in tokenize(text):
+            bucket = zlib.crc32(token.encode("utf-8")) & mask
+            counts[bucket] = counts.get(bucket, 0) + 1
+        return counts
+
+    def observe(self, text: str):
+        """把一篇文档计入 idf 统计"""
+        for bucket in self.features(text):
+            self.df[bucket] = self.df.get(bucket, 0) + 1
+        self.docs += 1
+
+    def embed(self, text: str) -> array:
+        vector = [0.0] * HASHED_DIM
+        for bucket, count in self.features(text).items():
+            idf = math.log((1 + self.docs) / (1 + self.df.get(bucket, 0))) + 1
+            weight = (1 + math.log(count)) * idf
+            for position, sign in _projection(bucket):
+                vector[position] += sign * weight
+        return _normalize(vector)
+
+    def state(self) -> Dict:
+        return {"df": {str(k): v for k, v in self.df.items()}, "docs": self.docs}
+
+    def load_state(self, state: Dict):
+        self.df = {int(k): v for k, v in state.get("df", {}).items()}
+        self.docs = state.get("docs", 0)
+
+
+class SentenceTransformerEmbedder:
+    """本地 CPU 句向量模型（需要 pip install sentence-transformers）"""
+
+    def __init__(self, model: str = "all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model, device="cpu")
+        self.name = f"sentence_transformers:{model}"
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def observe(self, text: str):
+        pass
+
+    def embed(self, text: str) -> array:
+        return _normalize([float(v) for v in self.model.encode(text)])
+
+    def state(self) -> Dict:
+        return {}
+
+    def load_state(self, state: Dict):
+        pass
+
+
+def create_embedder(config: Dict = None):
+    """按配置创建向量化方式，默认 hashed_tfidf"""
+    config = config or {}
+    kind = config.get("embedding_backend", "hashed_tfidf")
+    if kind == "hashed_tfidf":
+        return HashedTfidfEmbedder()
+    if kind == "sentence_transformers":
+        return SentenceTransformerEmbedder(config.get("embedding_model", "all-MiniLM-L6-v2"))
+    raise ValueError(f"未知的向量化方式: {kind}（可选: hashed_tfidf, sentence_transformers）")
+
+
+def profile_texts(profile: Dict) -> Tuple[str, str]:
+    """从 user_profile.json 拼出 (感兴趣的方向, 想避开的行业) 两段查询文本"""
+    background = profile.get("background", {})
+    preferences = profile.get("preferences", {})
+    education = background.get("education", {})
+    positive = []
+    positive += background.get("interests", [])
+    positive += preferences.get("preferred_industries", [])
+    positive += background.get("technical_skills", {}).get("programming", [])
+    positive += [job.get("role", "") for job in background.get("work_experience", [])]
+    positive += [education.get("undergraduate", "")]
+    avoid = preferences.get("avoid_industries", [])
+    return " ".join(filter(None, positive)), " ".join(filter(None, avoid))
+
+
+def kmeans(rows: List[array], clusters: int, iterations: int = KMEANS_ITERATIONS) -> List[array]:
+    """球面 k-means（向量已归一化，用点积作相似度），初始中心按行号等距取"""
+    step = len(rows) / clusters
+    centroids = [rows[int(i * step)] for i in range(clusters)]
+    dim = len(rows[0])
+    for _ in range(iterations):
+        sums = [[0.0] * dim for _ in centroids]
+        for row in rows:
+            best = max(range(len(centroids)), key=lambda c: _dot(row, centroids[c]))
+            total = sums[best]
+            for i, value in enumerate(row):
+                total[i] += value
+        centroids = [_normalize(total) if any(total) else centroids[c] for c, total in enumerate(sums)]
+    return centroids
+
+
+class EmbeddingIndex:
+    """向量索引：meta.json + 内存映射的 float32 矩阵"""
+
+    def __init__(self, index_dir: Path = EMBEDDINGS_DIR, embedder=None):
+        self.index_dir = Path(index_dir)
+        self.embedder = embedder or HashedTfidfEmbedder()
+        self.docs: List[Dict] = []
+        self.built_docs = 0
+        self.centroids: List[array] = []
+        self.lists: List[List[int]] = []
+        self._file = None
+        self._mmap = None
+        self._view = None
+        self._load()
+
+    # ------------------------------------------------------------------
+    # 存储
+    # ------------------------------------------------------------------
+
+    @property
+    def dim(self) -> int:
+        return self.embedder.dim
+
+    @property
+    def meta_path(self) -> Path:
+        return self.index_dir / META_FILE
+
+    @property
+    def vectors_path(self) -> Path:
+        return self.index_dir / VECTORS_FILE
+
+    def _load(self):
+        if not self.meta_path.exists():
+            return
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("embedder") != self.embedder.name or meta.get("dim") != self.dim:
+            # 换了向量化方式，旧向量不能混用，下次 update 时全量重建
+            return
+        self.docs = meta["docs"]
+        self.built_docs = meta.get("built_docs", len(self.docs))
+        self.embedder.load_state(meta.get("embedder_state", {}))
+        self.centroids = [array("f", c) for c in meta.get("centroids", [])]
+        self.lists = meta.get("lists", [])
+        self._map()
+
+    def _map(self):
+        self._unmap()
+        if not self.docs or not self.vectors_path.exists():
+            return
+        self._file = open(self.vectors_path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap).cast("f")
+
+    def _unmap(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _save_meta(self):
+        meta = {
+            "embedder": self.embedder.name,
+            "dim": self.dim,
+            "built_docs": self.built_docs,
+            "docs": self.docs,
+            "embedder_state": self.embedder.state(),
+            "centroids": [list(c) for c in self.centroids],
+            "lists": self.lists,
+        }
+        tmp = self.meta_path.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, self.meta_path)
+
+    def close(self):
+        self._unmap()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def row(self, index: int) -> memoryview:
+        return self._view[index * self.dim:(index + 1) * self.dim]
+
+    # ------------------------------------------------------------------
+    # 构建与增量更新
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _scan(texts_dir: Path) -> Dict[str, Dict]:
+        found = {}
+        for path in sorted(Path(texts_dir).glob("*.txt")):
+            stat = path.stat()
+            found[path.stem] = {"name": path.stem, "mtime": stat.st_mtime, "size": stat.st_size, "path": path}
+        return found
+
+    def rebuild(self, texts_dir: Path = TEXTS_DIR) -> Dict:
+        """全量重建：重新统计 idf、向量化全部文本并重新聚类"""
+        self._unmap()
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        found = self._scan(texts_dir)
+        texts = {name: info["path"].read_text(encoding="utf-8") for name, info in found.items()}
+        self.embedder.load_state({})
+        for text in texts.values():
+            self.embedder.observe(text)
+        vectors = array("f")
+        for text in texts.values():
+            vectors.extend(self.embedder.embed(text))
+        tmp = self.vectors_path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            vectors.tofile(f)
+        os.replace(tmp, self.vectors_path)
+        self.docs = [{k: v for k, v in info.items() if k != "path"} for info in found.values()]
+        self.built_docs = len(self.docs)
+        self._map()
+        self._build_ivf()
+        self._save_meta()
+        return {"added": len(self.docs), "updated": 0, "removed": 0, "rebuilt": True}
+
+    def update(self, texts_dir: Path = TEXTS_DIR) -> Dict:
+        """只向量化新增或修改过的文本；需要时自动全量重建"""
+        found = self._scan(texts_dir)
+        known = {doc["name"]: i for i, doc in enumerate(self.docs)}
+        removed = [name for name in known if name not in found]
+        if not self.docs or removed or len(found) > self.built_docs * REBUILD_GROWTH:
+            return self.rebuild(texts_dir)
+
+        changed = [name for name, i in known.items()
+                   if (self.docs[i]["mtime"], self.docs[i]["size"]) != (found[name]["mtime"], found[name]["size"])]
+        added = [name for name in found if name not in known]
+        if not changed and not added:
+            return {"added": 0, "updated": 0, "removed": 0, "rebuilt": False}
+
+        texts = {name: found[name]["path"].read_text(encoding="utf-8") for name in changed + added}
+        for name in added:
+            self.embedder.observe(texts[name])
+        self._unmap()
+        row_bytes = self.dim * 4
+        with open(self.vectors_path, "r+b") as f:
+            for name in changed:
+                f.seek(known[name] * row_bytes)
+                self.embedder.embed(texts[name]).tofile(f)
+                self.docs[known[name]].update(mtime=found[name]["mtime"], size=found[name]["size"])
+            f.seek(len(self.docs) * row_bytes)
+            for name in added:
+                self.embedder.embed(texts[name]).tofile(f)
+                self.docs.append({k: v for k, v in found[name].items() if k != "path"})
+        self._map()
+        if self.centroids:
+            self._assign(range(len(self.docs) - len(added), len(self.docs)))
+            for name in changed:
+                self._reassign(known[name])
+        elif len(self.docs) >= IVF_MIN_ROWS:
+            self._build_ivf()
+        self._save_meta()
+        return {"added": len(added), "updated": len(changed), "removed": 0, "rebuilt": False}
+
+    def _build_ivf(self):
+        if len(self.docs) < IVF_MIN_ROWS:
+            self.centroids, self.lists = [], []
+            return
+        clusters = int(math.sqrt(len(self.docs)))
+        step = max(1, len(self.docs) // (clusters * KMEANS_SAMPLE))
+        sample = [array("f", self.row(i)) for i in range(0, len(self.docs), step)]
+        self.centroids = kmeans(sample, clusters)
+        self.lists = [[] for _ in self.centroids]
+        self._assign(range(len(self.docs)))
+
+    def _nearest_centroid(self, vector) -> int:
+        return max(range(len(self.centroids)), key=lambda c: _dot(vector, self.centroids[c]))
+
+    def _assign(self, rows: Iterable[int]):
+        for i in rows:
+            self.lists[self._nearest_centroid(self.row(i))].append(i)
+
+    def _reassign(self, index: int):
+        for members in self.lists:
+            if index in members:
+                members.remove(index)
+        self._assign([index])
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def _candidates(self, query) -> Iterable[int]:
+        if not self.centroids:
+            return range(len(self.docs))
+        nearest = heapq.nlargest(NPROBE, range(len(self.centroids)), key=lambda c: _dot(query, self.centroids[c]))
+        return [i for c in nearest for i in self.lists[c]]
+
+    def query(self, vector, k: int = 10, exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """与 vector 最相似的 k 篇文本，返回 (文本名, 余弦相似度)"""
+        if not self.docs:
+            return []
+        skip = set(exclude)
+        scored = ((_dot(vector, self.row(i)), i) for i in self._candidates(vector)
+                  if self.docs[i]["name"] not in skip)
+        return [(self.docs[i]["name"], round(score, 4)) for score, i in heapq.nlargest(k, scored)]
+
+    def search(self, text: str, k: int = 10) -> List[Tuple[str, float]]:
+        return self.query(self.embedder.embed(text), k)
+
+    def similar(self, names: List[str], k: int = 10) -> List[Tuple[str, float]]:
+        """和给定的几个项目整体最相似的其他项目（用它们向量的平均值查询）"""
+        index = {doc["name"]: i for i, doc in enumerate(self.docs)}
+        missing = [name for name in names if name not in index]
+        if missing:
+            raise KeyError(f"索引中没有: {', '.join(missing)}")
+        total = [0.0] * self.dim
+        for name in names:
+            for i, value in enumerate(self.row(index[name])):
+                total[i] += value
+        return self.query(_normalize(total), k, exclude=names)
+
+    def profile_fit(self, profile: Dict, k: int = None) -> List[Tuple[str, float]]:
+        """
+        按用户配置给所有项目打适配分（兴趣方向相似度 - AVOID_WEIGHT × 避开行业相似度）
+        适配分需要覆盖每个项目，所以总是逐行计算
+        """
+        positive, avoid = profile_texts(profile)
+        want = self.embedder.embed(positive)
+        unwanted = self.embedder.embed(avoid) if avoid else None
+        scored = []
+        for i, doc in enumerate(self.docs):
+            row = self.row(i)
+            score = _dot(want, row)
+            if unwanted is not None:
+                score -= AVOID_WEIGHT * _dot(unwanted, row)
+            scored.append((round(score, 4), doc["name"]))
+        top = heapq.nlargest(k or len(scored), scored)
+        return [(name, score) for score, name in top]
+
+
+def _load_config() -> Dict:
+    config_path = Path("project_analyzer_config.json")
+    if config_path.exists():
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def update_index(texts_dir: Path = TEXTS_DIR, index_dir: Path = EMBEDDINGS_DIR, config: Dict = None) -> Dict:
+    """提取文本后调用：增量更新向量索引"""
+    config = _load_config() if config is None else config
+    with EmbeddingIndex(index_dir, create_embedder(config)) as index:
+        result = index.update(texts_dir)
+        result["total"] = len(index)
+    return result
+
+
+def main(argv: List[str] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m analyzer_core.embeddings", description="项目文本向量索引")
+    parser.add_argument("command", choices=("update", "rebuild", "similar", "fit", "search"))
+    parser.add_argument("names", nargs="*", help="similar 的项目文本名（如 project_003），search 的查询文本")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--texts-dir", type=Path, default=TEXTS_DIR)
+    parser.add_argument("--index-dir", type=Path, default=EMBEDDINGS_DIR)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    with EmbeddingIndex(args.index_dir, create_embedder(_load_config())) as index:
+        if args.command in ("update", "rebuild"):
+            result = index.rebuild(args.texts_dir) if args.command == "rebuild" else index.update(args.texts_dir)
+            print(f"✓ 新增 {result['added']}，更新 {result['updated']}，共 {len(index)} 篇"
+                  f"{'（全量重建）' if result['rebuilt'] else ''}")
+            return 0
+        if not len(index):
+            print("✗ 索引为空，请先运行: python -m analyzer_core.embeddings update")
+            return 2
+        if args.command == "similar":
+            try:
+                results = index.similar(args.names, args.k)
+            except KeyError as e:
+                print(f"✗ {e.args[0]}")
+                return 2
+        elif args.command == "search":
+            results = index.search(" ".join(args.names), args.k)
+        else:
+            from profile_scorer import load_user_profile
+            profile = load_user_profile()
+            if not profile:
+                print("✗ 未找到 user_profile.json")
+                return 2
+            results = index.profile_fit(profile, args.k)
+        for name, score in results:
+            print(f"{score:7.3f}  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Excel 导出
+"""
+
+from pathlib import Path
+from typing import Dict, List
+
+# 导出时的列顺序，重要信息在前（列式导出也使用）
+COLUMN_ORDER = [
+    "项目编号", "项目名称", "公司名称", "所处行业",
+    "适配星级", "建议bidding分数", "应用场景", "公司用心程度", "预期成果",
+    "技能要求", "项目描述摘要", "适配得分", "适配理由", "bidding理由", "源文件"
+]
+
+
+class ExcelExporter:
+    """导出数据到Excel"""
+    
+    @staticmethod
+    def export_to_excel(projects: List[Dict], output_path: Path, scorer=None, bid_plan: List[Dict] = None):
+        """
+        导出项目数据到Excel文件
+        提供 scorer 时补上适配星级和bidding列，提供 bid_plan 时额外写一个 "Bidding方案" 工作表
+        """
+        import pandas as pd
+        from openpyxl.styles import Font, PatternFill, Alignment
+        from openpyxl.utils import get_column_letter
+        
+        if scorer is not None:
+            projects = [scorer.score_project(p) for p in projects]
+        df = pd.DataFrame(projects)
+        
+        # 只保留存在的列，重要信息在前
+        existing_columns = [col for col in COLUMN_ORDER if col in df.columns]
+        other_columns = [col for col in df.columns if col not in COLUMN_ORDER]
+        df = df[existing_columns + other_columns]
+        
+        # 使用openpyxl创建格式化的Excel
+        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False, sheet_name='项目分析')
+            
+            # 获取工作表
+            worksheet = writer.sheets['项目分析']
+            
+            # 设置标题行样式
+            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+            header_font = Font(bold=True, color="FFFFFF", size=11)
+            
+            for cell in worksheet[1]:
+                cell.fill = header_fill
+                cell.font = header_font
+                cell.alignment = Alignment(horizontal="center", vertical="center")
+            
+            # 自动调整列宽
+            for column in worksheet.columns:
+                max_length = 0
+                column_letter = get_column_letter(column[0].column)
+                
+                for cell in column:
+                    try:
+                        if len(str(cell.value)) > max_length:
+                            max_length = len(str(cell.value))
+                    except:
+                        pass
+                
+                # 设置列宽，但不超过50
+                adjusted_width = min(max_length + 2, 50)
+                worksheet.column_dimensions[column_letter].width = adjusted_width
+            
+            # 设置行高
+            worksheet.row_dimensions[1].height = 25
+            for row in range(2, len(df) + 2):
+                worksheet.row_dimensions[row].height = 20
+            
+            # 设置文本换行
+            for row in worksheet.iter_rows(min_row=2, max_row=len(df) + 1):
+                for cell in row:
+                    cell.alignment = Alignment(vertical="top", wrap_text=True)
+            
+            # Bidding分配方案
+            if bid_plan:
+                pd.DataFrame(bid_plan).to_excel(writer, index=False, sheet_name='Bidding方案')
+                plan_sheet = writer.sheets['Bidding方案']
+                for cell in plan_sheet[1]:
+                    cell.fill = header_fill
+                    cell.font = header_font
+                    cell.alignment = Alignment(horizontal="center", vertical="center")
+                plan_sheet.column_dimensions['B'].width = 40
+        
+        print(f"✓ Excel文件已导出: {output_path}")
+        return df
@@ -0,0 +1,160 @@
+"""
+本地规则预提取
+
+项目文档里 项目编号、项目名称、公司名称、技能要求 经常以 "Project Title: ..." 这类
+标签行出现在固定位置，用正则就能取到，不必让模型再输出一遍。每个字段给出置信度：
+标签行直接命中的较高，靠推测得到的较低。只有不低于阈值的字段会跳过模型，
+其余字段仍由模型提取；一个都没命中时就用原来的完整提示词。
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .chunking import is_heading
+
+CONFIDENCE_THRESHOLD = 0.8
+# 技能一节超过 MAX_SECTION_CHARS 被截断时，多半没找到节的结尾、混进了下一节，交给模型
+TRUNCATED_CONFIDENCE = 0.6
+
+# 只在文档开头找标题和公司
+HEAD_LINES = 40
+MAX_SECTION_CHARS = 400
+
+LABELS = {
+    "项目编号": r"(?:project\s*(?:id|number|no\.?|#)|项目编号|项目ID)",
+    "项目名称": r"(?:project\s*(?:title|name)|项目名称|项目题目)",
+    "公司名称": r"(?:company(?:\s*name)?|sponsor(?:ing\s*organization)?|organization|client|公司名称|合作公司|合作单位)",
+    "技能要求": r"(?:(?:required|preferred)?\s*skills?(?:\s*(?:required|needed|&\s*qualifications))?"
+                r"|technical\s*requirements|技能要求|所需技能)",
+}
+
+# 任何已知标签开头的行都视为下一节的开始
+_ANY_LABEL = re.compile(
+    r"^\s*(?:" + "|".join(LABELS.values()) +
+    r"|project\s*description|background|deliverables?|objectives?|data|timeline|contact)\b.*[:：]",
+    re.IGNORECASE,
+)
+
+_LABEL_LINE = {
+    # "标签: 值" 或单独一行的标签
+    field: re.compile(r"^\s*" + pattern + r"\s*(?:[:：]\s*(.*)|$)", re.IGNORECASE)
+    for field, pattern in LABELS.items()
+}
+
+# 文件名里形如 P012 / P-12 的编号
+_FILENAME_ID = re.compile(r"(?<![A-Za-z])(P[-_]?\d{2,4})(?!\d)", re.IGNORECASE)
+
+_COMPANY_SUFFIX = re.compile(
+    r"\b((?:[A-Z][\w&.'-]*\s+){0,4}(?:Inc\.?|LLC|Ltd\.?|Corp(?:oration)?\.?|Capital|Partners|Group|"
+    r"Analytics|Solutions|Technologies|Holdings|Bank)\b)"
+)
+
+_KNOWN_SKILLS = ["Python", "SQL", "R", "Tableau", "Power BI", "Excel", "Machine Learning", "NLP",
+                 "Deep Learning", "Spark", "AWS", "Statistics", "Optimization", "Forecasting"]
+_SKILL_PATTERNS = [(skill, re.compile(r"(?<![\w+])" + re.escape(skill) + r"(?![\w+])")) for skill in _KNOWN_SKILLS]
+
+
+def is_label_line(line: str) -> bool:
+    """"Required Skills: ..." 这类标签行（文本清理时不当作模板文字删除）"""
+    return bool(_ANY_LABEL.match(line))
+
+
+def _clean(value: str) -> str:
+    return re.sub(r"\s+", " ", value).strip(" \t-–:：;；,，")
+
+
+class HeuristicExtractor:
+    """按标签行和文件名提取简单字段，返回 {字段: (值, 置信度)}"""
+
+    def extract(self, text: str, filename: str = None) -> Dict[str, Tuple[str, float]]:
+        lines = text.splitlines()
+        results: Dict[str, Tuple[str, float]] = {}
+
+        def put(field, value, confidence):
+            value = _clean(value or "")
+            if value and confidence > results.get(field, ("", 0.0))[1]:
+                results[field] = (value, confidence)
+
+        for field in ("项目编号", "项目名称", "公司名称"):
+            value, confidence = self._labeled_value(lines[:HEAD_LINES], field)
+            if value and field == "项目名称" and not 4 <= len(value) <= 150:
+                confidence -= 0.3
+            if value and field == "公司名称" and len(value) > 80:
+                confidence -= 0.3
+            put(field, value, confidence)
+
+        skills, truncated = self._section(lines, "技能要求")
+        if skills:
+            put("技能要求", skills, TRUNCATED_CONFIDENCE if truncated else 0.85)
+        else:
+            found = [skill for skill, pattern in _SKILL_PATTERNS if pattern.search(text)]
+            if found:
+                put("技能要求", "、".join(found), 0.5)
+
+        if filename:
+            match = _FILENAME_ID.search(filename)
+            if match:
+                put("项目编号", match.group(1).upper().replace("_", "-"), 0.85)
+
+        if "公司名称" not in results:
+            match = _COMPANY_SUFFIX.search("\n".join(lines[:HEAD_LINES]))
+            if match:
+                put("公司名称", match.group(1), 0.5)
+
+        return results
+
+    def confident(self, text: str, filename: str = None,
+                  threshold: float = CONFIDENCE_THRESHOLD) -> Dict[str, str]:
+        """置信度不低于阈值的字段"""
+        return {field: value for field, (value, confidence) in self.extract(text, filename).items()
+                if confidence >= threshold}
+
+    @staticmethod
+    def _labeled_value(lines: List[str], field: str) -> Tuple[Optional[str], float]:
+        """"标签: 值" 在同一行时置信度 0.9；标签单独一行、值在下一行时 0.8"""
+        pattern = _LABEL_LINE[field]
+        for i, line in enumerate(lines):
+            match = pattern.match(line)
+            if not match:
+                continue
+            value = (match.group(1) or "").strip()
+            if value:
+                return value, 0.9
+            for following in lines[i + 1:i + 3]:
+                if following.strip():
+                    if _ANY_LABEL.match(following):
+                        break
+                    return following.strip(), 0.8
+        return None, 0.0
+
+    @staticmethod
+    def _section(lines: List[str], field: str) -> Tuple[Optional[str], bool]:
+        """
+        标签行开始、到空行、下一个标签或下一个章节标题为止的一节，返回 (内容, 是否被截断)
+        "SQL"、"Power BI" 这类单独成行的技能看起来也像标题，含已知技能的行不当作标题
+        """
+        pattern = _LABEL_LINE[field]
+        for i, line in enumerate(lines):
+            match = pattern.match(line)
+            if not match:
+                continue
+            first = (match.group(1) or "").strip()
+            parts = [first] if first else []
+            truncated = False
+            for following in lines[i + 1:]:
+                if not following.strip():
+                    if parts:
+                        break
+                    continue
+                if _ANY_LABEL.match(following) or (
+                        is_heading(following) and not any(p.search(following) for _, p in _SKILL_PATTERNS)):
+                    break
+                parts.append(following.strip().lstrip("•·-*").strip())
+                if sum(len(p) for p in parts) > MAX_SECTION_CHARS:
+                    truncated = True
+                    break
+            section = "; ".join(p for p in parts if p)
+            if len(section) > MAX_SECTION_CHARS:
+                truncated = True
+            return (section[:MAX_SECTION_CHARS], truncated) if section else (None, False)
+        return None, False
@@ -0,0 +1,188 @@
+"""
+多台机器分担提取和分析：共享卷上的 SQLite 任务表，按租约领取任务
+
+    # 协调者：把要处理的PDF加入任务表
+    python -m analyzer_core enqueue --output-dir /shared/output --projects-dir /shared/projects
+    # 每台机器启动任意多个工作进程（目录指向同一个共享卷）
+    python -m analyzer_core worker  --output-dir /shared/output --projects-dir /shared/projects --workers 4
+    # 协调者：合并结果，写出 Excel / JSON，更新 index.json 和向量索引
+    python -m analyzer_core merge   --output-dir /shared/output
+
+- 每个PDF一个任务（提取 + 清理 + AI分析），任务名为PDF文件名；工作进程按共享的 boilerplate.json
+  去掉已知的模板文字，清理后的文本随结果存入任务表，merge 时写到协调者的 --texts-dir，
+  再更新语料的模板文字统计，--texts-dir 不需要在共享卷上
+- 工作进程的每个线程一次领取一个任务（慢任务不拖住其他线程），租约 LEASE_S 秒，后台线程每 LEASE_S/3 秒续约；
+  进程崩溃或机器掉线后租约过期，任务由其他工作进程重新领取
+- 每次领取生成新的租约令牌，只有持有当前令牌的工作进程能提交结果，
+  过期后才完成的旧工作进程的结果被丢弃，结果只写一次
+- 失败的任务重新排队，失败 MAX_ATTEMPTS 次后标记为 failed；租约过期也算一次失败
+- 已完成的PDF内容变化后（修改时间或大小不同）重新 enqueue 会重新排队
+
+任务表用回滚日志而不是 WAL（WAL 需要共享内存，NFS/SMB 上不可用），每次操作单独连接、
+短事务，领取用 BEGIN IMMEDIATE 保证同一任务不会被两个工作进程同时领到。
+"""
+
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LEASE_S = 120.0
+MAX_ATTEMPTS = 3
+BUSY_TIMEOUT_S = 30.0
+WORKER_POLL_S = 5.0
+
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    name           TEXT PRIMARY KEY,
+    signature      TEXT NOT NULL,
+    status         TEXT NOT NULL,
+    worker         TEXT,
+    token          TEXT,
+    lease_expires  REAL,
+    attempts       INTEGER NOT NULL DEFAULT 0,
+    result         TEXT,
+    error          TEXT,
+    updated_at     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, lease_expires);
+"""
+
+
+def file_signature(path: Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class JobQueue:
+    """任务表；每个方法单独打开连接，可以在多个线程和进程中同时使用"""
+
+    def __init__(self, path: Path, lease_s: float = LEASE_S, max_attempts: int = MAX_ATTEMPTS,
+                 clock=time.time):
+        self.path = Path(path)
+        self.lease_s = lease_s
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT_S)
+        try:
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self, immediate: bool = False):
+        conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT_S, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def enqueue(self, jobs: Iterable[Tuple[str, str]]) -> Dict[str, int]:
+        """
+        加入 (PDF文件名, 签名)；已有且签名相同的任务不变，签名不同的重新排队
+        返回 {"added", "requeued", "unchanged"}
+        """
+        counts = {"added": 0, "requeued": 0, "unchanged": 0}
+        now = self.clock()
+        with self._connect(immediate=True) as conn:
+            existing = dict(conn.execute("SELECT name, signature FROM jobs"))
+            for name, signature in jobs:
+                if name not in existing:
+                    conn.execute("INSERT INTO jobs (name, signature, status, updated_at) VALUES (?, ?, ?, ?)",
+                                 (name, signature, PENDING, now))
+                    counts["added"] += 1
+                elif existing[name] != signature:
+                    conn.execute("UPDATE jobs SET signature = ?, status = ?, worker = NULL, token = NULL,"
+                                 " lease_expires = NULL, attempts = 0, result = NULL, error = NULL,"
+                                 " updated_at = ? WHERE name = ?", (signature, PENDING, now, name))
+                    counts["requeued"] += 1
+                else:
+                    counts["unchanged"] += 1
+        return counts
+
+    def lease(self, worker: str, count: int = 1) -> List[Tuple[str, str]]:
+        """
+        领取最多 count 个待处理或租约已过期的任务，返回 [(任务名, 租约令牌)]
+        租约过期且已领取 max_attempts 次的任务（多半每次都把工作进程弄崩溃）标记为 failed，不再派发
+        """
+        now = self.clock()
+        with self._connect(immediate=True) as conn:
+            conn.execute("UPDATE jobs SET status = ?, error = ?, worker = NULL, token = NULL, lease_expires = NULL,"
+                         " updated_at = ? WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                         (FAILED, f"租约过期 {self.max_attempts} 次（工作进程可能崩溃）", now, LEASED, now,
+                          self.max_attempts))
+            names = [row[0] for row in conn.execute(
+                "SELECT name FROM jobs WHERE status = ? OR (status = ? AND lease_expires < ?)"
+                " ORDER BY attempts, name LIMIT ?", (PENDING, LEASED, now, count))]
+            leased = []
+            for name in names:
+                token = uuid.uuid4().hex
+                conn.execute("UPDATE jobs SET status = ?, worker = ?, token = ?, lease_expires = ?,"
+                             " attempts = attempts + 1, updated_at = ? WHERE name = ?",
+                             (LEASED, worker, token, now + self.lease_s, now, name))
+                leased.append((name, token))
+        return leased
+
+    def heartbeat(self, leases: Iterable[Tuple[str, str]]) -> int:
+        """续约，返回仍然持有的任务数"""
+        now = self.clock()
+        held = 0
+        with self._connect() as conn:
+            for name, token in leases:
+                held += conn.execute("UPDATE jobs SET lease_expires = ?, updated_at = ?"
+                                     " WHERE name = ? AND token = ? AND status = ?",
+                                     (now + self.lease_s, now, name, token, LEASED)).rowcount
+        return held
+
+    def complete(self, name: str, token: str, result: Dict) -> bool:
+        """提交结果；租约已被别人接手时返回 False，结果不写入"""
+        with self._connect() as conn:
+            return conn.execute("UPDATE jobs SET status = ?, result = ?, error = NULL, token = NULL,"
+                                " lease_expires = NULL, updated_at = ? WHERE name = ? AND token = ? AND status = ?",
+                                (DONE, json.dumps(result, ensure_ascii=False), self.clock(), name, token,
+                                 LEASED)).rowcount == 1
+
+    def fail(self, name: str, token: str, error: str) -> bool:
+        """任务失败：未达到最大次数时重新排队"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT attempts FROM jobs WHERE name = ? AND token = ? AND status = ?",
+                               (name, token, LEASED)).fetchone()
+            if row is None:
+                return False
+            status = FAILED if row[0] >= self.max_attempts else PENDING
+            conn.execute("UPDATE jobs SET status = ?, error = ?, token = NULL, lease_expires = NULL,"
+                         " updated_at = ? WHERE name = ?", (status, error, self.clock(), name))
+        return True
+
+    def counts(self) -> Dict[str, int]:
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        with self._connect() as conn:
+            for status, count in conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+                counts[status] = count
+        return counts
+
+    def unfinished(self) -> int:
+        counts = self.counts()
+        return counts[PENDING] + counts[LEASED]
+
+    def results(self) -> List[Dict]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT result FROM jobs WHERE status = ? ORDER BY name", (DONE,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def failures(self) -> List[Tuple[str, Optional[str]]]:
+        with self._connect() as conn:
+            return conn.execute("SELECT name, error FROM jobs WHERE status = ? ORDER BY name", (FAILED,)).fetchall()
@@ -0,0 +1,209 @@
+"""
+解析AI返回的JSON
+
+模型回复里常见的问题：前后有说明文字或 ```json 代码块、对象后面还跟着别的内容、
+结尾多余的逗号、字符串里没转义的引号和换行、max_tokens 截断导致对象不完整。
+这里先取出第一个括号配平的对象（可以边接收流式输出边判断，对象一结束就可以停止），
+解析失败再做修复，最后按九个字段校验，返回缺失的字段以便只补问这几个。
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .prompts import PROJECT_FIELDS
+
+
+class JSONObjectScanner:
+    """
+    增量查找第一个括号配平的 JSON 对象
+
+        scanner = JSONObjectScanner()
+        for chunk in stream:
+            obj_text = scanner.feed(chunk)
+            if obj_text is not None:
+                break            # 对象已完整，不必等模型说完
+        else:
+            obj_text = scanner.partial()
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.complete: Optional[str] = None
+
+    def feed(self, chunk: str) -> Optional[str]:
+        if self.complete is not None:
+            return self.complete
+        start = 0
+        if not self._started:
+            start = chunk.find("{")
+            if start < 0:
+                return None
+            self._started = True
+        for i in range(start, len(chunk)):
+            c = chunk[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c == "{":
+                self._depth += 1
+            elif c == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(chunk[start:i + 1])
+                    self.complete = "".join(self._parts)
+                    return self.complete
+        self._parts.append(chunk[start:])
+        return None
+
+    def partial(self) -> Optional[str]:
+        """未配平时已收到的部分（从第一个 { 开始），没有 { 时为 None"""
+        if self.complete is not None:
+            return self.complete
+        return "".join(self._parts) if self._started else None
+
+
+def first_json_object(text: str) -> Optional[str]:
+    scanner = JSONObjectScanner()
+    return scanner.feed(text) or scanner.partial()
+
+
+def _next_significant(text: str, i: int) -> str:
+    while i < len(text) and text[i] in " \t\r\n":
+        i += 1
+    return text[i] if i < len(text) else ""
+
+
+def _strip_trailing_comma(out: List[str]):
+    while out and out[-1] in " \t\r\n":
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def _close(out: List[str], stack: List[str], in_string: bool) -> str:
+    """补上未结束的字符串和括号"""
+    out = list(out)
+    if in_string:
+        out.append('"')
+    _strip_trailing_comma(out)
+    text = "".join(out).rstrip()
+    if text.endswith(":"):
+        text += ' ""'
+    return text + "".join("}" if opener == "{" else "]" for opener in reversed(stack))
+
+
+def repair_json(text: str) -> str:
+    """
+    修复常见错误：字符串内未转义的引号（后面不是 , : } ] 的引号视为内容）、
+    字符串内的裸换行/制表符、结尾多余的逗号、截断后未闭合的字符串和括号
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = False
+    # 每个逗号处的 (输出长度, 括号栈)，截断的对象补不好时退回到最近一个逗号
+    commas: List[Tuple[int, List[str]]] = []
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if in_string:
+            if c == "\\" and i + 1 < len(text):
+                out.append(text[i:i + 2])
+                i += 2
+                continue
+            if c == '"':
+                if _next_significant(text, i + 1) in (",", ":", "}", "]", ""):
+                    in_string = False
+                    out.append(c)
+                else:
+                    out.append('\\"')
+            elif c == "\n":
+                out.append("\\n")
+            elif c == "\r":
+                out.append("\\r")
+            elif c == "\t":
+                out.append("\\t")
+            else:
+                out.append(c)
+        else:
+            if c == '"':
+                in_string = True
+            elif c in "{[":
+                stack.append(c)
+            elif c in "}]":
+                _strip_trailing_comma(out)
+                if stack:
+                    stack.pop()
+            elif c == ",":
+                commas.append((len(out), list(stack)))
+            out.append(c)
+            if c in "}]" and not stack:
+                break
+        i += 1
+
+    repaired = _close(out, stack, in_string)
+    if not stack and not in_string:
+        return repaired
+    # 截断的情况：如果补全后仍无法解析（如停在键名上），退回到之前的逗号
+    for position, comma_stack in [(None, None)] + list(reversed(commas)):
+        candidate = repaired if position is None else _close(out[:position], comma_stack, False)
+        try:
+            json.loads(candidate)
+            return candidate
+        except json.JSONDecodeError:
+            continue
+    return repaired
+
+
+def parse_json_reply(text: str) -> Optional[Dict]:
+    """从模型回复中取出 JSON 对象，无法解析时返回 None"""
+    if not text:
+        return None
+    candidate = first_json_object(text)
+    if candidate is None:
+        return None
+    for attempt in (candidate, repair_json(candidate)):
+        try:
+            value = json.loads(attempt)
+        except json.JSONDecodeError:
+            continue
+        return value if isinstance(value, dict) else None
+    return None
+
+
+def _normalize(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (list, tuple)):
+        return "、".join(str(item).strip() for item in value if str(item).strip())
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def validate_project(info: Optional[Dict], fields: Iterable[str] = PROJECT_FIELDS) -> Tuple[Dict, List[str]]:
+    """
+    按字段表校验：各字段统一成字符串（列表用顿号连接），返回 (清理后的字典, 缺失字段)
+    缺失指没有该字段或值为空；其他多出来的键原样保留
+    """
+    result = dict(info or {})
+    missing = []
+    for field in fields:
+        value = _normalize(result.get(field))
+        if value:
+            result[field] = value
+        else:
+            result.pop(field, None)
+            missing.append(field)
+    return result, missing
@@ -0,0 +1,212 @@
+"""
+扫描件的 OCR 兜底
+
+PyPDF2 对只有图片的页面返回空文本。这类页面用 poppler 的 pdftoppm 渲染成图片，
+再交给本地 Tesseract 识别（都是命令行工具，不需要额外的 Python 包）：
+
+    apt install poppler-utils tesseract-ocr tesseract-ocr-chi-sim
+    brew install poppler tesseract tesseract-lang
+
+OCR 在单独的进程池里运行，进程数默认为 CPU 核数的一半，每个 tesseract 限制为单线程，
+普通PDF的文本提取不受影响。识别结果按页面图片的哈希缓存，同一页不会识别第二次；
+换 DPI 后图片不同，缓存自然失效。
+
+配置（project_analyzer_config.json）：
+
+    "ocr_enabled": true,
+    "ocr_dpi": "balanced",        # fast=150 / balanced=200 / accurate=300，也可以直接写数字
+    "ocr_lang": "eng+chi_sim",
+    "ocr_workers": 2
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .paths import OUTPUT_DIR
+
+DPI_PRESETS = {"fast": 150, "balanced": 200, "accurate": 300}
+OCR_DPI = DPI_PRESETS["balanced"]
+OCR_LANG = "eng+chi_sim"
+OCR_CACHE_DIR = OUTPUT_DIR / "ocr_cache"
+OCR_TIMEOUT = 120
+CONFIG_FILE = Path("project_analyzer_config.json")
+
+# 少于这么多可见字符的页面视为没有文本层
+MIN_PAGE_CHARS = 20
+
+
+def needs_ocr(page_text: str) -> bool:
+    return len("".join((page_text or "").split())) < MIN_PAGE_CHARS
+
+
+def parse_dpi(value) -> int:
+    """DPI 配置：预设名或数字"""
+    if isinstance(value, str) and value in DPI_PRESETS:
+        return DPI_PRESETS[value]
+    try:
+        dpi = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"无效的 ocr_dpi: {value}（可选: {', '.join(DPI_PRESETS)} 或 72-600 之间的数字）")
+    if not 72 <= dpi <= 600:
+        raise ValueError(f"无效的 ocr_dpi: {value}（可选: {', '.join(DPI_PRESETS)} 或 72-600 之间的数字）")
+    return dpi
+
+
+def render_page(pdf_path: Path, page_number: int, dpi: int) -> bytes:
+    """把第 page_number 页（从 1 开始）渲染成 PNG"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "page"
+        subprocess.run(
+            ["pdftoppm", "-png", "-r", str(dpi), "-f", str(page_number), "-l", str(page_number),
+             "-singlefile", str(pdf_path), str(output)],
+            check=True, capture_output=True, timeout=OCR_TIMEOUT,
+        )
+        return output.with_suffix(".png").read_bytes()
+
+
+def recognize(image: bytes, lang: str = OCR_LANG) -> str:
+    """用 tesseract 识别一张图片"""
+    # 每个 tesseract 只用一个核，并行度由进程池控制
+    env = dict(os.environ, OMP_THREAD_LIMIT="1")
+    result = subprocess.run(
+        ["tesseract", "stdin", "stdout", "-l", lang],
+        input=image, check=True, capture_output=True, timeout=OCR_TIMEOUT, env=env,
+    )
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+def page_key(image: bytes, lang: str) -> str:
+    digest = hashlib.sha256(image)
+    digest.update(lang.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def ocr_page(task: Tuple[Path, int, int, str, Optional[Path]]) -> Tuple[str, bool]:
+    """
+    进程池入口：渲染一页并识别，返回 (文本, 是否命中缓存)
+    缓存每页一个文件，多个进程同时读写也不会冲突
+    """
+    pdf_path, page_number, dpi, lang, cache_dir = task
+    image = render_page(pdf_path, page_number, dpi)
+    cache_file = Path(cache_dir) / f"{page_key(image, lang)}.txt" if cache_dir else None
+    if cache_file and cache_file.exists():
+        return cache_file.read_text(encoding="utf-8"), True
+    text = recognize(image, lang)
+    if cache_file:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, cache_file)
+    return text, False
+
+
+class _Done:
+    """workers <= 1 时当场算好的结果，接口与 Future 相同"""
+
+    def __init__(self, func, task):
+        try:
+            self._value, self._error = func(task), None
+        except Exception as e:
+            self._value, self._error = None, e
+
+    def result(self):
+        if self._error:
+            raise self._error
+        return self._value
+
+
+class PendingPages:
+    """一个PDF已提交的 OCR 任务；result() 等待完成并返回补全后的各页文本"""
+
+    def __init__(self, fallback: "OCRFallback", pdf_path: Path, pages: List[str], futures: Dict[int, object]):
+        self.fallback = fallback
+        self.pdf_path = pdf_path
+        self.pages = pages
+        self.futures = futures
+
+    def result(self) -> List[str]:
+        pages = list(self.pages)
+        for index, future in self.futures.items():
+            try:
+                text, hit = future.result()
+            except Exception as e:
+                print(f"✗ OCR失败: {self.pdf_path.name} 第 {index + 1} 页 - {str(e)}")
+                continue
+            pages[index] = text
+            self.fallback.stats["cached" if hit else "recognized"] += 1
+        return pages
+
+
+class OCRFallback:
+    """只对没有文本层的页面做 OCR；submit 立即返回，普通PDF的提取可以继续"""
+
+    def __init__(self, dpi=OCR_DPI, lang: str = OCR_LANG, workers: int = None,
+                 cache_dir: Optional[Path] = OCR_CACHE_DIR):
+        self.dpi = parse_dpi(dpi)
+        self.lang = lang
+        self.workers = workers if workers is not None else max(1, (os.cpu_count() or 2) // 2)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.stats = {"recognized": 0, "cached": 0}
+        self._executor = None
+
+    @classmethod
+    def from_config(cls, config: Dict, cache_dir: Optional[Path] = OCR_CACHE_DIR) -> Optional["OCRFallback"]:
+        """按配置创建；关闭了 OCR 或缺少 pdftoppm / tesseract 时返回 None"""
+        if not config.get("ocr_enabled", True):
+            return None
+        if not cls.available():
+            return None
+        workers = config.get("ocr_workers")
+        return cls(config.get("ocr_dpi", OCR_DPI), config.get("ocr_lang", OCR_LANG),
+                   int(workers) if workers is not None else None, cache_dir)
+
+    @classmethod
+    def from_config_file(cls, config_path: Path = CONFIG_FILE) -> Optional["OCRFallback"]:
+        config = {}
+        if Path(config_path).exists():
+            try:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"警告: 配置文件读取失败，OCR 使用默认设置 - {str(e)}")
+        return cls.from_config(config)
+
+    @staticmethod
+    def available() -> bool:
+        return bool(shutil.which("pdftoppm") and shutil.which("tesseract"))
+
+    def submit(self, pdf_path: Path, pages: List[str]) -> PendingPages:
+        """提交需要 OCR 的页面"""
+        futures = {}
+        for index, text in enumerate(pages):
+            if not needs_ocr(text):
+                continue
+            task = (pdf_path, index + 1, self.dpi, self.lang, self.cache_dir)
+            if self.workers <= 1:
+                futures[index] = _Done(ocr_page, task)
+                continue
+            if self._executor is None:
+                from concurrent.futures import ProcessPoolExecutor
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            futures[index] = self._executor.submit(ocr_page, task)
+        return PendingPages(self, pdf_path, pages, futures)
+
+    def fill(self, pdf_path: Path, pages: List[str]) -> List[str]:
+        return self.submit(pdf_path, pages).result()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,13 @@
+"""
+数据目录配置
+"""
+
+from pathlib import Path
+
+PROJECTS_DIR = Path("data/projects")
+PROJECTS_DIR.mkdir(parents=True, exist_ok=True)
+OUTPUT_DIR = Path("data/output")
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+TEXTS_DIR = Path("data/project_texts")
+TEXTS_DIR.mkdir(parents=True, exist_ok=True)
+COLUMNAR_DIR = OUTPUT_DIR / "columnar"
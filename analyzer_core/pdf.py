@@ -0,0 +1,153 @@
+"""
+PDF 文本提取
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from .paths import PROJECTS_DIR, TEXTS_DIR
+
+
+def save_text(pdf_path: Path, text: str, texts_dir: Path = None) -> Dict:
+    """写出文本文件，返回 index.json 条目"""
+    text_file = (texts_dir or TEXTS_DIR) / f"{pdf_path.stem}.txt"
+    with open(text_file, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return {
+        "pdf_file": pdf_path.name,
+        "text_file": text_file.name,
+        "text_length": len(text),
+        "text_preview": text[:500]  # 前500字符预览
+    }
+
+
+def refresh_entry(entry: Dict, texts_dir: Path = None) -> Dict:
+    """文本文件被清理改写后，更新索引条目的长度和预览"""
+    text = ((texts_dir or TEXTS_DIR) / entry["text_file"]).read_text(encoding='utf-8')
+    entry.update(text_length=len(text), text_preview=text[:500])
+    return entry
+
+
+class PDFExtractor:
+    """提取PDF文本内容"""
+    
+    @staticmethod
+    def extract_pages(pdf_path: Path) -> List[str]:
+        """逐页提取文本，没有文本层的页面为空字符串"""
+        try:
+            # 尝试使用PyPDF2
+            try:
+                import PyPDF2
+                with open(pdf_path, 'rb') as f:
+                    pdf_reader = PyPDF2.PdfReader(f)
+                    return [page.extract_text() or "" for page in pdf_reader.pages]
+            except ImportError:
+                # 如果PyPDF2不可用，尝试pdfplumber
+                try:
+                    import pdfplumber
+                    with pdfplumber.open(pdf_path) as pdf:
+                        return [page.extract_text() or "" for page in pdf.pages]
+                except ImportError:
+                    print("错误: 需要安装 PyPDF2 或 pdfplumber")
+                    return []
+        except Exception as e:
+            print(f"✗ PDF解析错误: {pdf_path.name} - {str(e)}")
+            return []
+    
+    @staticmethod
+    def extract_text(pdf_path: Path) -> str:
+        """
+        从PDF文件中提取文本（只读文本层，扫描件见 extract_all_pdfs_to_texts 的 OCR 兜底）
+        页眉页脚、页码等重复行已去掉（见 cleaning.py）
+        """
+        from .cleaning import clean_pages
+        return clean_pages(PDFExtractor.extract_pages(pdf_path))[0]
+    
+    @staticmethod
+    def extract_all_pdfs_to_texts(pdf_dir: Path = None, use_ocr: bool = True) -> List[Dict]:
+        """
+        提取所有PDF文本并保存为文本文件
+        没有文本层的页面交给 OCR 进程池（见 ocr.py），先继续处理后面的PDF，最后再收取 OCR 结果
+        """
+        from .cleaning import clean_corpus, clean_pages, format_saving
+        from .ocr import OCRFallback, needs_ocr
+        if pdf_dir is None:
+            pdf_dir = PROJECTS_DIR
+        
+        pdf_files = list(pdf_dir.glob("*.pdf"))
+        if not pdf_files:
+            print("未找到PDF文件")
+            return []
+        
+        extracted_files = []
+        ocr, pending = None, []
+        before = after = 0
+        
+        for i, pdf_file in enumerate(pdf_files, 1):
+            print(f"\n[{i}/{len(pdf_files)}] 提取文本: {pdf_file.name}")
+            
+            pages = PDFExtractor.extract_pages(pdf_file)
+            scanned = [n for n, page in enumerate(pages, 1) if needs_ocr(page)]
+            if scanned and use_ocr:
+                if ocr is None:
+                    ocr = OCRFallback.from_config_file()
+                    use_ocr = ocr is not None
+                    if not use_ocr:
+                        print("提示: OCR 已关闭或未找到 pdftoppm / tesseract，扫描页将被跳过")
+            if scanned and ocr:
+                print(f"  {len(scanned)} 页没有文本层，已加入OCR队列")
+                pending.append((pdf_file, ocr.submit(pdf_file, pages)))
+                continue
+            
+            text, saving = clean_pages(pages)
+            if not text:
+                print(f"✗ 无法提取文本: {pdf_file.name}")
+                continue
+            before += saving["bytes_before"]
+            after += saving["bytes_after"]
+            
+            # 保存文本文件
+            extracted_files.append(save_text(pdf_file, text))
+            print(f"✓ 文本已保存: {pdf_file.stem}.txt ({len(text)} 字符)")
+        
+        if pending:
+            print(f"\n等待OCR完成（{len(pending)} 个PDF）...")
+            for pdf_file, job in pending:
+                text, saving = clean_pages(job.result())
+                if not text:
+                    print(f"✗ 无法提取文本（OCR后仍为空）: {pdf_file.name}")
+                    continue
+                before += saving["bytes_before"]
+                after += saving["bytes_after"]
+                extracted_files.append(save_text(pdf_file, text))
+                print(f"✓ OCR文本已保存: {pdf_file.stem}.txt ({len(text)} 字符)")
+            ocr.close()
+            print(f"✓ OCR识别 {ocr.stats['recognized']} 页，缓存命中 {ocr.stats['cached']} 页")
+        
+        # 跨文档的模板文字（课程说明等）
+        if extracted_files:
+            report = clean_corpus(TEXTS_DIR, [Path(item["text_file"]).stem for item in extracted_files])
+            for item in extracted_files:
+                refresh_entry(item, TEXTS_DIR)
+            after -= sum(r["bytes_before"] - r["bytes_after"] for r in report.values())
+            print(f"\n✓ 文本清理: {format_saving(before, after)}")
+        
+        # 保存索引文件
+        index_file = TEXTS_DIR / "index.json"
+        with open(index_file, 'w', encoding='utf-8') as f:
+            json.dump(extracted_files, f, ensure_ascii=False, indent=2)
+        
+        print(f"\n✓ 共提取 {len(extracted_files)} 个PDF的文本")
+        print(f"✓ 文本文件保存在: {TEXTS_DIR}")
+        print(f"✓ 索引文件: {index_file}")
+        
+        # 增量更新向量索引（相似项目、适配度查询用）
+        try:
+            from .embeddings import update_index
+            result = update_index()
+            print(f"✓ 向量索引: 新增 {result['added']}，共 {result['total']} 篇")
+        except (ValueError, ImportError, OSError) as e:
+            print(f"警告: 向量索引更新失败 - {str(e)}")
+        
+        return extracted_files
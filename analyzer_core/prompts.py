@@ -0,0 +1,97 @@
+"""
+AI提取用的提示词和字段定义
+"""
+
+from typing import Dict, List
+
+SYSTEM_PROMPT = "你是一个专业的项目分析助手，擅长从项目文档中提取结构化信息。请只返回JSON格式，不要添加任何解释文字。"
+
+# 需要提取的九个字段 -> 说明（顺序即JSON中的顺序）
+PROJECT_FIELDS: Dict[str, str] = {
+    "项目名称": "项目标题或名称",
+    "所处行业": "如：金融、医疗、教育、科技、零售等",
+    "应用场景": "项目的具体应用场景和用途，详细描述",
+    "公司用心程度": "根据文档的详细程度、完整性、专业性评分，1-10分，并说明理由",
+    "预期成果": "项目预期交付的成果或产出",
+    "项目编号": "如果有项目编号或ID",
+    "公司名称": "合作公司或组织名称",
+    "技能要求": "所需技能和技术栈",
+    "项目描述摘要": "项目简要描述（100字以内）",
+}
+
+MAX_TEXT_LENGTH = 8000
+MAX_TOKENS = 1000
+
+# 各字段回答的大致输出 token 数，只问部分字段时据此缩小 max_tokens
+FIELD_TOKENS = {
+    "项目名称": 40,
+    "所处行业": 20,
+    "应用场景": 200,
+    "公司用心程度": 120,
+    "预期成果": 150,
+    "项目编号": 20,
+    "公司名称": 30,
+    "技能要求": 80,
+    "项目描述摘要": 150,
+}
+TOKEN_MARGIN = 190
+
+# 补问缺失字段时只带文档开头
+FOLLOWUP_TEXT_LENGTH = 4000
+
+
+def truncate(text: str, max_length: int) -> str:
+    if len(text) > max_length:
+        return text[:max_length] + "...[文本已截断]"
+    return text
+
+
+def _field_block(fields: List[str]) -> str:
+    lines = [f'  "{name}": "{PROJECT_FIELDS[name]}"' for name in fields]
+    return "{\n" + ",\n".join(lines) + "\n}"
+
+
+def build_prompt(text: str, fields: List[str] = None, max_length: int = MAX_TEXT_LENGTH) -> str:
+    """完整的提取提示词；fields 默认为全部九个字段"""
+    fields = list(fields or PROJECT_FIELDS)
+    return f"""请从以下项目文档中提取关键信息。文档内容：
+
+{truncate(text, max_length)}
+
+请提取以下信息，并以JSON格式返回：
+{_field_block(fields)}
+
+只返回JSON，不要其他文字。"""
+
+
+def build_followup_prompt(text: str, missing: List[str]) -> str:
+    """只补问缺失的字段，文档截得更短"""
+    return f"""以下项目文档中还缺少这些信息，请补充。文档内容：
+
+{truncate(text, FOLLOWUP_TEXT_LENGTH)}
+
+只返回包含以下字段的JSON：
+{_field_block(missing)}"""
+
+
+def build_chunk_prompt(chunk: str, index: int, total: int, title: str = "", fields: List[str] = None) -> str:
+    """map-reduce 中单个块的提示词：只根据本块回答，本块没有的字段填空字符串"""
+    fields = list(fields or PROJECT_FIELDS)
+    section = f"（{title}）" if title else ""
+    return f"""以下是一份项目文档的第 {index}/{total} 部分{section}。文档内容：
+
+{chunk}
+
+请只根据这一部分提取以下信息，这一部分没有提到的字段填空字符串 ""，以JSON格式返回：
+{_field_block(fields)}
+
+只返回JSON，不要其他文字。"""
+
+
+def max_tokens_for(fields: List[str]) -> int:
+    """只提取部分字段时的 max_tokens，全部字段时等于 MAX_TOKENS"""
+    return min(MAX_TOKENS, sum(FIELD_TOKENS.get(field, 150) for field in fields) + TOKEN_MARGIN)
+
+
+def followup_max_tokens(missing: List[str]) -> int:
+    return max_tokens_for(missing)
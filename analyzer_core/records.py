@@ -0,0 +1,194 @@
+"""
+项目记录的紧凑表示和流式 NDJSON 读写
+
+流水线里项目仍以字典传递（Excel、Notion、结果库都按中文键读取）；大量存取时用这里的
+ProjectRecord：按 SCHEMA 声明字段的命名元组，不在 SCHEMA 中的键放进最后的 extra。
+每条记录省掉一个15键字典（约 640 字节），按位置构造，读写都不需要逐字段处理。
+
+NDJSON 文件（项目分析_*.ndjson）：
+
+    {"format": "project-records", "version": 1, "fields": ["项目编号", "项目名称", ...]}
+    ["P-001", "Risk model", ..., null]
+    ["P-002", "Churn", ..., {"其他字段": "..."}]
+
+第一行声明字段顺序，之后每行一条记录：按字段顺序的数组，缺失值为 null，最后一项是 extra。
+逐批读写，不需要把整个列表放进内存；读取时也接受每行一个普通 JSON 对象的文件。
+"""
+
+import json
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, IO, Iterable, Iterator, List, Union
+
+from .excel import COLUMN_ORDER
+
+FORMAT = "project-records"
+VERSION = 1
+
+# (中文键, 属性名)，顺序即 NDJSON 和导出的列顺序
+SCHEMA = (
+    ("项目编号", "project_no"),
+    ("项目名称", "name"),
+    ("公司名称", "company"),
+    ("所处行业", "industry"),
+    ("适配星级", "stars"),
+    ("建议bidding分数", "bid_score"),
+    ("应用场景", "scenarios"),
+    ("公司用心程度", "commitment"),
+    ("预期成果", "outcomes"),
+    ("技能要求", "skills"),
+    ("项目描述摘要", "summary"),
+    ("适配得分", "fit_score"),
+    ("适配理由", "fit_reason"),
+    ("bidding理由", "bid_reason"),
+    ("源文件", "source"),
+)
+FIELDS = tuple(key for key, _ in SCHEMA)
+ATTRS = tuple(attr for _, attr in SCHEMA)
+assert FIELDS == tuple(COLUMN_ORDER), "SCHEMA 应与 excel.COLUMN_ORDER 一致"
+
+_READ_HINT = 1 << 20  # 每批读取约 1MB 的行
+_WRITE_BATCH = 1000
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), check_circular=False).encode
+_decode = json.JSONDecoder().decode
+_ROW_LEN = len(FIELDS) + 1
+_FIELD_INDEX = {key: i for i, key in enumerate(FIELDS)}
+# 取值大量重复的字段：读取时同样的值只保留一个字符串对象
+SHARED_FIELDS = ("公司名称", "所处行业", "适配星级", "公司用心程度")
+_SHARED_INDEX = tuple(_FIELD_INDEX[key] for key in SHARED_FIELDS)
+
+
+class ProjectRecord(namedtuple("ProjectRecord", ATTRS + ("extra",), defaults=(None,) * _ROW_LEN)):
+    """一条项目记录；record.name 按属性读，record.get("项目名称") 按中文键读"""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, project: Dict) -> "ProjectRecord":
+        extra = {key: value for key, value in project.items() if key not in _FIELD_INDEX}
+        return cls._make([project.get(key) for key in FIELDS] + [extra or None])
+
+    def to_dict(self) -> Dict:
+        """转回字典：声明的字段在前（值为 None 的省略），extra 在后"""
+        project = {key: value for key, value in zip(FIELDS, self) if value is not None}
+        if self.extra:
+            project.update(self.extra)
+        return project
+
+    def get(self, key: str, default=None):
+        index = _FIELD_INDEX.get(key)
+        if index is not None:
+            value = self[index]
+            return default if value is None else value
+        return self.extra.get(key, default) if self.extra else default
+
+
+_make_record = ProjectRecord._make
+
+
+def _as_record(project) -> ProjectRecord:
+    return project if isinstance(project, ProjectRecord) else ProjectRecord.from_dict(project)
+
+
+def dump_ndjson(projects: Iterable, stream: IO[str]) -> int:
+    """把记录或字典逐批写入文本流，返回条数"""
+    stream.write(_encode({"format": FORMAT, "version": VERSION, "fields": list(FIELDS)}) + "\n")
+    count = 0
+    batch = []
+    for project in projects:
+        batch.append(_as_record(project))
+        if len(batch) >= _WRITE_BATCH:
+            stream.write("\n".join(map(_encode, batch)) + "\n")
+            count += len(batch)
+            batch.clear()
+    if batch:
+        stream.write("\n".join(map(_encode, batch)) + "\n")
+        count += len(batch)
+    return count
+
+
+def write_ndjson(projects: Iterable, path: Path) -> int:
+    """写到临时文件再改名，读取方不会看到写了一半的文件"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        count = dump_ndjson(projects, f)
+    tmp.replace(path)
+    return count
+
+
+def _remap(fields: List[str]):
+    """文件的字段顺序与当前 SCHEMA 不同时（旧版本写的文件），按字段名转换"""
+    def convert(row: List) -> ProjectRecord:
+        project = {key: value for key, value in zip(fields, row) if value is not None}
+        if len(row) > len(fields) and isinstance(row[len(fields)], dict):
+            project.update(row[len(fields)])
+        return ProjectRecord.from_dict(project)
+    return convert
+
+
+def _convert(values: List, convert) -> Iterator[ProjectRecord]:
+    for value in values:
+        if isinstance(value, list):
+            yield convert(value)
+        elif isinstance(value, dict):
+            yield ProjectRecord.from_dict(value)
+
+
+def _positional(row: List) -> ProjectRecord:
+    if len(row) == _ROW_LEN:
+        return _make_record(row)
+    return _make_record((row + [None] * _ROW_LEN)[:_ROW_LEN])
+
+
+def parse_ndjson(stream: IO[str]) -> Iterator[ProjectRecord]:
+    """逐批解析：一批行拼成一个数组交给 json 的 C 解析器，省掉逐行调用的开销"""
+    convert = _positional
+    first = True
+    shared = {}
+    while True:
+        lines = [line for line in stream.readlines(_READ_HINT) if not line.isspace()]
+        if not lines:
+            return
+        if first:
+            first = False
+            header = _decode(lines[0])
+            if isinstance(header, dict) and header.get("format") == FORMAT:
+                lines = lines[1:]
+                if tuple(header.get("fields", ())) != FIELDS:
+                    convert = _remap(header["fields"])
+            if not lines:
+                continue
+        try:
+            values = _decode("[" + ",".join(lines) + "]")
+        except json.JSONDecodeError:
+            # 逐行解析，让错误指向具体的行
+            values = [_decode(line) for line in lines]
+        if convert is _positional and all(type(v) is list and len(v) == _ROW_LEN for v in values):
+            for index in _SHARED_INDEX:
+                for row in values:
+                    value = row[index]
+                    if type(value) is str:
+                        row[index] = shared.setdefault(value, value)
+            yield from map(_make_record, values)
+        else:
+            yield from _convert(values, convert)
+
+
+def iter_ndjson(path: Path) -> Iterator[ProjectRecord]:
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from parse_ndjson(f)
+
+
+def read_ndjson(path: Path) -> List[ProjectRecord]:
+    return list(iter_ndjson(path))
+
+
+def load_projects(path: Union[str, Path]) -> List[Dict]:
+    """读取分析结果文件（.json 或 .ndjson），返回字典列表"""
+    path = Path(path)
+    if path.suffix == ".ndjson":
+        return [record.to_dict() for record in iter_ndjson(path)]
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
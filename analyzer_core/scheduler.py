@@ -0,0 +1,283 @@
+"""
+PDF 文本提取的调度：按预估开销从大到小派发（LPT），按内存预算控制同时处理的文件
+
+语料里的PDF从 100KB 到 200MB 不等。按文件名顺序交给进程池时，几个大文件同时落到不同进程会撑爆内存，
+最大的文件排在最后又会让整批处理拖一个长尾。这里：
+
+- estimate_cost 只读文件头尾各一小段，取页数（页树的 /Count），和文件大小一起估算处理时间和内存；
+- 任务按预估时间从大到小派发给空闲的工作进程，总耗时接近最优（LPT 调度）；
+- 同时处理的文件预估内存之和不超过 memory_budget_mb，放不下时等已派发的文件完成
+  （单个文件超过预算时单独处理）；
+- 每个工作进程处理 max_files_per_worker 个文件后退出并换新进程，避免内存碎片越积越多；
+  进程被系统杀掉（如内存不足）时该文件记为失败，换新进程继续。
+
+结束后 report 给出各工作进程的文件数、忙碌时间、利用率和峰值 RSS。
+"""
+
+import os
+import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+MAX_FILES_PER_WORKER = 50
+
+# 粗略的内存模型：解析器读入整个文件并保留解码后的对象，另加每页的文本和进程本身的开销
+BASE_MEMORY_MB = 40
+MEMORY_PER_FILE_MB = 2.5
+MEMORY_PER_PAGE_MB = 0.2
+# 预估处理时间的相对单位：文本提取主要按页计，解析按文件大小计
+WORK_PER_PAGE = 1.0
+WORK_PER_FILE_MB = 0.5
+# 读不到页数时（页树在压缩对象流里）按每页 100KB 估算
+BYTES_PER_PAGE_GUESS = 100 * 1024
+_PROBE_BYTES = 256 * 1024
+_COUNT = re.compile(rb"/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|/Count\s+(\d+)[^>]*?/Type\s*/Pages\b")
+
+
+def count_pages(pdf_path: Path) -> Optional[int]:
+    """从文件头尾找页树根的 /Count，找不到返回 None（不解析整个文件）"""
+    try:
+        size = pdf_path.stat().st_size
+        with open(pdf_path, 'rb') as f:
+            chunks = [f.read(_PROBE_BYTES)]
+            if size > _PROBE_BYTES:
+                f.seek(max(_PROBE_BYTES, size - _PROBE_BYTES))
+                chunks.append(f.read())
+    except OSError:
+        return None
+    counts = [int(a or b) for chunk in chunks for a, b in _COUNT.findall(chunk)]
+    return max(counts) if counts else None
+
+
+def estimate_cost(pdf_path: Path) -> Dict:
+    """预估一个PDF的处理开销：{"bytes", "pages", "pages_estimated", "work", "memory_mb"}"""
+    pdf_path = Path(pdf_path)
+    try:
+        size = pdf_path.stat().st_size
+    except OSError:
+        size = 0
+    pages = count_pages(pdf_path)
+    estimated = pages is None
+    if estimated:
+        pages = max(1, size // BYTES_PER_PAGE_GUESS)
+    size_mb = size / 1024 / 1024
+    return {
+        "bytes": size,
+        "pages": pages,
+        "pages_estimated": estimated,
+        "work": pages * WORK_PER_PAGE + size_mb * WORK_PER_FILE_MB,
+        "memory_mb": BASE_MEMORY_MB + size_mb * MEMORY_PER_FILE_MB + pages * MEMORY_PER_PAGE_MB,
+    }
+
+
+def default_memory_budget_mb() -> Optional[float]:
+    """默认预算为物理内存的一半；取不到（如 Windows）时不限制"""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024 / 1024 / 2
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """当前进程的峰值 RSS（MB）；没有 resource 模块时返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位是 KB，macOS 是字节
+    return peak / 1024 / 1024 if os.uname().sysname == "Darwin" else peak / 1024
+
+
+def _worker_main(conn, func: Callable, limit: int):
+    """工作进程：逐个接收任务，回传 (结果, 耗时, 峰值RSS)；处理 limit 个后退出"""
+    try:
+        for _ in range(limit):
+            task = conn.recv()
+            if task is None:
+                break
+            start = time.perf_counter()
+            try:
+                result = func(task)
+            except Exception as e:
+                result = {"error": f"{type(e).__name__}: {e}"}
+            conn.send((result, time.perf_counter() - start, peak_rss_mb()))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        conn.close()
+
+
+class _Slot:
+    """一个工作进程位置；进程回收后由同一个位置换新进程"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.files_in_process = 0
+        self.task = None
+        self.memory_mb = 0.0
+        self.files = 0
+        self.busy_s = 0.0
+        self.peak_rss_mb = None
+        self.processes = 0
+
+
+class ExtractionScheduler:
+    """按开销从大到小、在内存预算内把任务派发给会定期回收的工作进程"""
+
+    def __init__(self, workers: int = 4, memory_budget_mb: float = None,
+                 max_files_per_worker: int = MAX_FILES_PER_WORKER,
+                 cost: Callable[[Path], Dict] = estimate_cost):
+        self.workers = max(1, workers)
+        self.memory_budget_mb = memory_budget_mb if memory_budget_mb else default_memory_budget_mb()
+        self.max_files_per_worker = max(1, max_files_per_worker)
+        self.cost = cost
+        self.report: Dict = {}
+
+    @classmethod
+    def from_config(cls, config: Dict, workers: int, memory_budget_mb: float = None,
+                    max_files_per_worker: int = None) -> "ExtractionScheduler":
+        """命令行参数优先，其次配置文件的 extract_memory_budget_mb / extract_max_files_per_worker"""
+        return cls(
+            workers=workers,
+            memory_budget_mb=memory_budget_mb or config.get("extract_memory_budget_mb"),
+            max_files_per_worker=max_files_per_worker or config.get("extract_max_files_per_worker")
+            or MAX_FILES_PER_WORKER,
+        )
+
+    def plan(self, tasks: Iterable, path_of: Callable = lambda task: task) -> List[Tuple[object, Dict]]:
+        """[(任务, 开销)]，按预估处理时间从大到小"""
+        planned = [(task, self.cost(path_of(task))) for task in tasks]
+        planned.sort(key=lambda item: item[1]["work"], reverse=True)
+        return planned
+
+    def run(self, func: Callable, tasks: Iterable,
+            path_of: Callable = lambda task: task) -> Iterator[Tuple[object, object]]:
+        """按完成顺序产出 (任务, 结果)；workers <= 1 时在当前进程按同样的顺序串行执行"""
+        planned = self.plan(tasks, path_of)
+        start = time.perf_counter()
+        slots = [_Slot(i) for i in range(self.workers)]
+        admitted_peak = 0.0
+        try:
+            if self.workers <= 1:
+                slot = slots[0]
+                for task, cost in planned:
+                    admitted_peak = max(admitted_peak, cost["memory_mb"])
+                    began = time.perf_counter()
+                    result = func(task)
+                    slot.busy_s += time.perf_counter() - began
+                    slot.files += 1
+                    slot.peak_rss_mb = peak_rss_mb()
+                    yield task, result
+            else:
+                yield from self._run_processes(func, planned, slots)
+                admitted_peak = self._admitted_peak
+        finally:
+            for slot in slots:
+                self._stop(slot)
+            self.report = self._report(slots, time.perf_counter() - start, admitted_peak)
+
+    def _run_processes(self, func, planned, slots):
+        from multiprocessing import Pipe, Process
+        from multiprocessing.connection import wait
+
+        def spawn(slot):
+            parent, child = Pipe()
+            slot.process = Process(target=_worker_main, args=(child, func, self.max_files_per_worker),
+                                   daemon=True)
+            slot.process.start()
+            child.close()
+            slot.conn = parent
+            slot.files_in_process = 0
+            slot.processes += 1
+
+        budget = self.memory_budget_mb
+        pending = list(planned)
+        in_flight = 0.0
+        self._admitted_peak = 0.0
+        while pending or any(slot.task is not None for slot in slots):
+            # 按顺序派发：队首放不进内存预算时等待（不让小文件插队，避免大文件一直等不到）
+            for slot in slots:
+                if not pending or slot.task is not None:
+                    continue
+                task, cost = pending[0]
+                busy = any(s.task is not None for s in slots)
+                if budget is not None and busy and in_flight + cost["memory_mb"] > budget:
+                    break
+                pending.pop(0)
+                if slot.process is None or slot.files_in_process >= self.max_files_per_worker:
+                    self._stop(slot)
+                    spawn(slot)
+                slot.conn.send(task)
+                slot.task, slot.memory_mb = task, cost["memory_mb"]
+                slot.files_in_process += 1
+                in_flight += cost["memory_mb"]
+                self._admitted_peak = max(self._admitted_peak, in_flight)
+
+            ready = wait([slot.conn for slot in slots if slot.task is not None])
+            for slot in slots:
+                if slot.task is None or slot.conn not in ready:
+                    continue
+                task = slot.task
+                try:
+                    result, elapsed, rss = slot.conn.recv()
+                except (EOFError, OSError):
+                    # 进程异常退出（多半是内存不足被杀），换新进程处理后面的文件
+                    code = slot.process.exitcode if slot.process else None
+                    result, elapsed, rss = {"error": f"工作进程异常退出（exit code {code}）"}, 0.0, None
+                    self._stop(slot)
+                slot.task = None
+                in_flight -= slot.memory_mb
+                slot.files += 1
+                slot.busy_s += elapsed
+                if rss is not None:
+                    slot.peak_rss_mb = max(slot.peak_rss_mb or 0.0, rss)
+                yield task, result
+
+    @staticmethod
+    def _stop(slot: _Slot):
+        if slot.process is None:
+            return
+        try:
+            if slot.process.is_alive() and slot.files_in_process:
+                slot.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        slot.process.join(timeout=5)
+        if slot.process.is_alive():
+            slot.process.terminate()
+            slot.process.join()
+        slot.conn.close()
+        slot.process = slot.conn = None
+
+    def _report(self, slots: List[_Slot], wall_s: float, admitted_peak: float) -> Dict:
+        workers = [{
+            "worker": slot.index,
+            "files": slot.files,
+            "busy_s": round(slot.busy_s, 3),
+            "utilisation": round(slot.busy_s / wall_s, 3) if wall_s > 0 else 0.0,
+            "peak_rss_mb": round(slot.peak_rss_mb, 1) if slot.peak_rss_mb is not None else None,
+            "processes": slot.processes,
+        } for slot in slots]
+        peaks = [w["peak_rss_mb"] for w in workers if w["peak_rss_mb"] is not None]
+        busy = sum(slot.busy_s for slot in slots)
+        return {
+            "wall_s": round(wall_s, 3),
+            "utilisation": round(busy / (wall_s * len(slots)), 3) if wall_s > 0 else 0.0,
+            "peak_rss_mb": max(peaks) if peaks else None,
+            "memory_budget_mb": round(self.memory_budget_mb) if self.memory_budget_mb else None,
+            "admitted_peak_mb": round(admitted_peak, 1),
+            "workers": workers,
+        }
+
+
+def format_report(report: Dict) -> str:
+    """一行文字汇总：峰值内存、整体和各进程利用率"""
+    peak = f"{report['peak_rss_mb']:.0f} MB" if report.get("peak_rss_mb") is not None else "未知"
+    per_worker = ", ".join(f"w{w['worker']} {w['utilisation']:.0%}/{w['files']}个" for w in report["workers"])
+    recycled = sum(max(0, w["processes"] - 1) for w in report["workers"])
+    return (f"耗时 {report['wall_s']:.1f}s，利用率 {report['utilisation']:.0%}（{per_worker}），"
+            f"峰值RSS {peak}，进程回收 {recycled} 次")
@@ -0,0 +1,378 @@
+"""
+本地HTTP分析服务：常驻进程，单个PDF随时提交
+
+每次运行脚本都要付出解释器启动、pandas/openai/PyPDF2 导入和模型连接的开销。服务启动时
+把这些都做完，之后每个请求只花实际的提取和分析时间：
+
+    python -m analyzer_core serve --port 8765 --workers 4
+
+接口（JSON，只监听本机）：
+
+    POST /jobs?filename=P1.pdf      请求体为PDF文件，返回 {"id", "status", "coalesced"}
+    GET  /jobs/<id>                 任务状态：queued / running / done / failed
+    GET  /jobs/<id>/result?wait=30  分析结果；wait 为最多等待的秒数，未完成时返回 202
+    GET  /health                    各状态的任务数
+
+- 任务 id 是PDF内容的哈希：同一文件重复提交（排队中、处理中）合并为一个任务，
+  已完成的直接返回结果，不再调用模型；失败的重新排队
+- 任务和结果保存在 data/output/service_jobs.db（SQLite），上传的PDF保存在 service_uploads/，
+  服务重启后未完成的任务继续处理，已完成的结果仍可查询
+- PDF文本提取在预热好的进程池中进行（进程启动时已导入 PyPDF2），AI分析在服务进程内用线程并发，
+  模型后端、块缓存和用量计数在整个服务期间复用
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+MAX_WAIT_S = 300
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    filename    TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    result      TEXT,
+    error       TEXT
+);
+"""
+
+
+def job_id(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def _warm_up():
+    """进程池初始化：提前导入PDF解析库，第一个任务不用等导入"""
+    from . import cleaning, pdf  # noqa: F401
+    try:
+        import PyPDF2  # noqa: F401
+    except ImportError:
+        pass
+
+
+def _noop():
+    return None
+
+
+def extract_pages(pdf_path: str) -> List[str]:
+    """进程池入口"""
+    from .pdf import PDFExtractor
+    return PDFExtractor.extract_pages(Path(pdf_path))
+
+
+class Job:
+    """一个分析任务；done 在任务完成或失败时置位"""
+
+    def __init__(self, id: str, filename: str, status: str = QUEUED, created_at: float = None,
+                 updated_at: float = None, result: Optional[Dict] = None, error: Optional[str] = None):
+        self.id = id
+        self.filename = filename
+        self.status = status
+        self.created_at = created_at or time.time()
+        self.updated_at = updated_at or self.created_at
+        self.result = result
+        self.error = error
+        self.done = asyncio.Event()
+        if status in (DONE, FAILED):
+            self.done.set()
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "filename": self.filename, "status": self.status,
+                "created_at": round(self.created_at, 3), "updated_at": round(self.updated_at, 3),
+                "error": self.error}
+
+
+class JobStore:
+    """任务表（SQLite），只在事件循环线程中访问"""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+
+    def load(self) -> List[Job]:
+        jobs = []
+        for row in self.conn.execute(
+                "SELECT id, filename, status, created_at, updated_at, result, error FROM jobs"):
+            id, filename, status, created_at, updated_at, result, error = row
+            # 上次退出时没做完的任务重新排队
+            if status == RUNNING:
+                status = QUEUED
+            jobs.append(Job(id, filename, status, created_at, updated_at,
+                            json.loads(result) if result else None, error))
+        return jobs
+
+    def save(self, job: Job):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, filename, status, created_at, updated_at, result, error)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job.id, job.filename, job.status, job.created_at, job.updated_at,
+                 json.dumps(job.result, ensure_ascii=False) if job.result is not None else None, job.error))
+
+    def close(self):
+        self.conn.close()
+
+
+class AnalysisService:
+    """
+    任务队列 + 常驻工作者
+    session 提供 analyze_text(text, filename) 和 checkpoint()（见 cli.AnalysisSession）
+    """
+
+    def __init__(self, session, output_dir: Path, workers: int = 2, ocr=None):
+        self.session = session
+        self.output_dir = Path(output_dir)
+        self.uploads_dir = self.output_dir / "service_uploads"
+        self.workers = max(1, workers)
+        self.ocr = ocr
+        self.jobs: Dict[str, Job] = {}
+        self.store: Optional[JobStore] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self._server = None
+
+    # -- 生命周期 ----------------------------------------------------------
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> Tuple[str, int]:
+        """打开任务表、预热进程池、启动工作者和HTTP服务，返回实际监听的 (host, port)"""
+        loop = asyncio.get_running_loop()
+        self.uploads_dir.mkdir(parents=True, exist_ok=True)
+        self.store = JobStore(self.output_dir / "service_jobs.db")
+        self._queue = asyncio.Queue()
+        for job in sorted(self.store.load(), key=lambda j: j.created_at):
+            self.jobs[job.id] = job
+            if job.status == QUEUED:
+                self._queue.put_nowait(job.id)
+        if self.workers > 1:
+            # workers <= 1 时在线程中提取（与 cli._run_parallel 一致），便于调试
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+            await asyncio.gather(*(loop.run_in_executor(self._pool, _noop) for _ in range(self.workers)))
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown()
+        if self.store is not None:
+            self.store.close()
+
+    async def serve_forever(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, on_ready=None):
+        address = await self.start(host, port)
+        if on_ready:
+            on_ready(address)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    # -- 任务 --------------------------------------------------------------
+
+    def submit(self, data: bytes, filename: str) -> Tuple[Job, bool]:
+        """提交一个PDF，返回 (任务, 是否与已有任务合并)"""
+        id = job_id(data)
+        job = self.jobs.get(id)
+        if job is not None and job.status != FAILED:
+            return job, True
+        path = self.uploads_dir / f"{id}.pdf"
+        if not path.exists():
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            tmp.replace(path)
+        job = Job(id, filename)
+        self.jobs[id] = job
+        self.store.save(job)
+        self._queue.put_nowait(id)
+        return job, False
+
+    def _finish(self, job: Job, status: str, result: Dict = None, error: str = None):
+        job.status, job.result, job.error = status, result, error
+        job.updated_at = time.time()
+        self.store.save(job)
+        job.done.set()
+
+    async def _worker(self):
+        while True:
+            id = await self._queue.get()
+            job = self.jobs[id]
+            try:
+                job.status, job.updated_at = RUNNING, time.time()
+                self.store.save(job)
+                result, error = await self._run(job)
+                self._finish(job, FAILED if error else DONE, result, error)
+            except Exception as e:
+                self._finish(job, FAILED, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> Tuple[Optional[Dict], Optional[str]]:
+        from .cleaning import clean_pages
+        from .ocr import needs_ocr
+        loop = asyncio.get_running_loop()
+        path = self.uploads_dir / f"{job.id}.pdf"
+        pages = await loop.run_in_executor(self._pool, extract_pages, str(path))
+        if self.ocr is not None and any(needs_ocr(page) for page in pages):
+            pages = await loop.run_in_executor(None, self.ocr.fill, path, pages)
+        text, _ = clean_pages(pages)
+        if not text:
+            return None, "无法提取文本"
+        outcome = await loop.run_in_executor(None, self.session.analyze_text, text, job.filename)
+        await loop.run_in_executor(None, self.session.checkpoint)
+        return outcome.get("project"), outcome.get("error")
+
+    def counts(self) -> Dict[str, int]:
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    # -- HTTP --------------------------------------------------------------
+
+    async def route(self, method: str, target: str, body: bytes) -> Tuple[int, Dict]:
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        if method == "GET" and parts == ["health"]:
+            return 200, {"status": "ok", "jobs": self.counts()}
+        if method == "POST" and parts == ["jobs"]:
+            if not body:
+                return 400, {"error": "请求体应为PDF文件"}
+            filename = Path(query.get("filename", ["upload.pdf"])[0]).name
+            job, coalesced = self.submit(body, filename)
+            status = 200 if job.status == DONE else 202
+            return status, {"id": job.id, "status": job.status, "coalesced": coalesced}
+        if method == "GET" and len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return 404, {"error": f"任务不存在: {parts[1]}"}
+            if len(parts) == 2:
+                return 200, job.to_dict()
+            if parts[2] != "result":
+                return 404, {"error": f"未知的路径: {url.path}"}
+            try:
+                wait = min(float(query.get("wait", ["0"])[0]), MAX_WAIT_S)
+            except ValueError:
+                return 400, {"error": "wait 应为秒数"}
+            if wait > 0 and not job.done.is_set():
+                try:
+                    await asyncio.wait_for(job.done.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+            if job.status == DONE:
+                return 200, {"id": job.id, "status": job.status, "result": job.result}
+            if job.status == FAILED:
+                return 500, {"id": job.id, "status": job.status, "error": job.error}
+            return 202, {"id": job.id, "status": job.status}
+        return 404, {"error": f"未知的路径: {method} {url.path}"}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """最小的 HTTP/1.1 实现：按 Content-Length 读请求体，支持 keep-alive"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_UPLOAD_BYTES:
+                    await self._respond(writer, 413, {"error": f"文件超过 {MAX_UPLOAD_BYTES // 1024 // 1024} MB"},
+                                        close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, payload = await self.route(method.upper(), target, body)
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+                close = headers.get("connection", "").lower() == "close"
+                await self._respond(writer, status, payload, close)
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Dict, close: bool = False):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+
+class ServiceThread:
+    """在后台线程里运行服务（嵌入到其他程序或测试中用）"""
+
+    def __init__(self, service: AnalysisService, host: str = DEFAULT_HOST, port: int = 0):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.base_url = None
+        self._loop = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+
+        def ready(address):
+            self.base_url = f"http://{address[0]}:{address[1]}"
+            self._ready.set()
+
+        try:
+            self._loop.run_until_complete(self.service.serve_forever(self.host, self.port, ready))
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._ready.set()
+            self._loop.close()
+
+    def __enter__(self) -> "ServiceThread":
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc):
+        loop = self._loop
+
+        def cancel():
+            for task in asyncio.all_tasks(loop):
+                task.cancel()
+
+        loop.call_soon_threadsafe(cancel)
+        self._thread.join()
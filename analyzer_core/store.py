@@ -0,0 +1,271 @@
+"""
+历史结果库 - SQLite
+
+每次运行的项目分析结果写进同一个数据库，可以跨运行查询，例如
+"这家公司的项目和上学期相比有什么变化"，不必逐个加载 项目分析_*.json。
+
+    runs(run_id, created_at, source, project_count)
+    projects(run_id, source_file, source_hash, project_no, project_name, company, industry, data)
+    imported_files(path, mtime, size, run_id)      -- JSON 存量导入的增量记录
+
+source_hash 是 PDF 内容的 SHA-256，同一份文档改名后仍能对上。
+data 列保存完整的项目字典（JSON），常用字段单独成列并建索引。
+
+    python -m analyzer_core.store import              # 导入 data/output 下已有的 JSON
+    python -m analyzer_core.store runs
+    python -m analyzer_core.store history "Acme Corp"
+"""
+
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .paths import OUTPUT_DIR, PROJECTS_DIR
+
+RESULTS_DB = OUTPUT_DIR / "results.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id        TEXT PRIMARY KEY,
+    created_at    TEXT NOT NULL,
+    source        TEXT,
+    project_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS projects (
+    id           INTEGER PRIMARY KEY,
+    run_id       TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    source_file  TEXT,
+    source_hash  TEXT,
+    project_no   TEXT,
+    project_name TEXT,
+    company      TEXT,
+    industry     TEXT,
+    data         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_projects_run ON projects(run_id);
+CREATE INDEX IF NOT EXISTS idx_projects_hash ON projects(source_hash);
+CREATE INDEX IF NOT EXISTS idx_projects_company ON projects(company);
+CREATE INDEX IF NOT EXISTS idx_projects_industry ON projects(industry);
+CREATE TABLE IF NOT EXISTS imported_files (
+    path   TEXT PRIMARY KEY,
+    mtime  REAL NOT NULL,
+    size   INTEGER NOT NULL,
+    run_id TEXT NOT NULL
+);
+"""
+
+
+def file_sha256(path: Path) -> Optional[str]:
+    path = Path(path)
+    if not path.is_file():
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def run_id_from_path(path: Path) -> str:
+    """项目分析_20260115_093000.json -> 20260115_093000"""
+    stem = Path(path).stem
+    return stem[len("项目分析_"):] if stem.startswith("项目分析_") else stem
+
+
+def _created_at(run_id: str) -> str:
+    try:
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.strptime(run_id, "%Y%m%d_%H%M%S"))
+    except ValueError:
+        return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+class ResultsStore:
+    """项目分析结果库，可用作上下文管理器"""
+
+    def __init__(self, db_path: Path = RESULTS_DB, projects_dir: Path = PROJECTS_DIR):
+        self.db_path = Path(db_path)
+        self.projects_dir = Path(projects_dir)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        # (路径, mtime, 大小) -> 哈希，同一次会话里同一个PDF只读一遍
+        self._hash_cache: Dict[tuple, Optional[str]] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _source_hash(self, source_file: str) -> Optional[str]:
+        if not source_file:
+            return None
+        path = self.projects_dir / source_file
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        key = (str(path), stat.st_mtime, stat.st_size)
+        if key not in self._hash_cache:
+            self._hash_cache[key] = file_sha256(path)
+        return self._hash_cache[key]
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    def record_run(self, projects: List[Dict], run_id: str = None, source: str = None) -> str:
+        """
+        写入一次运行的全部项目（单个事务内批量插入），返回 run_id
+        同一 run_id 再次写入时替换旧数据
+        """
+        run_id = run_id or time.strftime("%Y%m%d_%H%M%S")
+        rows = []
+        for project in projects:
+            source_file = project.get("源文件")
+            rows.append((
+                run_id,
+                source_file,
+                self._source_hash(source_file),
+                _text(project.get("项目编号")),
+                _text(project.get("项目名称")),
+                _text(project.get("公司名称")),
+                _text(project.get("所处行业")),
+                json.dumps(project, ensure_ascii=False),
+            ))
+        with self.conn:
+            self.conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            self.conn.execute(
+                "INSERT INTO runs (run_id, created_at, source, project_count) VALUES (?, ?, ?, ?)",
+                (run_id, _created_at(run_id), source, len(rows)),
+            )
+            self.conn.executemany(
+                "INSERT INTO projects (run_id, source_file, source_hash, project_no, project_name,"
+                " company, industry, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return run_id
+
+    def import_json_backlog(self, output_dir: Path = OUTPUT_DIR) -> List[str]:
+        """
+        导入已有的 项目分析_*.json，增量：按 (mtime, 大小) 跳过已导入且未变化的文件
+        返回本次导入的 run_id 列表
+        """
+        imported = {row["path"]: (row["mtime"], row["size"])
+                    for row in self.conn.execute("SELECT path, mtime, size FROM imported_files")}
+        run_ids = []
+        for json_file in sorted(Path(output_dir).glob("项目分析_*.json")):
+            stat = json_file.stat()
+            key = str(json_file.resolve())
+            if imported.get(key) == (stat.st_mtime, stat.st_size):
+                continue
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    projects = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"✗ 跳过无法读取的文件: {json_file.name} - {str(e)}")
+                continue
+            if not isinstance(projects, list):
+                continue
+            run_id = self.record_run(projects, run_id_from_path(json_file), source=json_file.name)
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO imported_files (path, mtime, size, run_id) VALUES (?, ?, ?, ?)",
+                    (key, stat.st_mtime, stat.st_size, run_id),
+                )
+            run_ids.append(run_id)
+        return run_ids
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def runs(self) -> List[Dict]:
+        """所有运行，从旧到新"""
+        return [dict(row) for row in self.conn.execute("SELECT * FROM runs ORDER BY created_at, run_id")]
+
+    def latest_run_id(self) -> Optional[str]:
+        row = self.conn.execute("SELECT run_id FROM runs ORDER BY created_at DESC, run_id DESC LIMIT 1").fetchone()
+        return row["run_id"] if row else None
+
+    def projects(self, run_id: str = None, company: str = None, industry: str = None,
+                 source_hash: str = None, since: str = None) -> List[Dict]:
+        """
+        按条件查询项目（条件之间为 AND），每项为完整的项目字典，附带 run_id
+        since 为 ISO 日期，只返回该日期之后的运行
+        """
+        clauses, params = [], []
+        for column, value in (("p.run_id", run_id), ("p.company", company),
+                              ("p.industry", industry), ("p.source_hash", source_hash)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("r.created_at >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = ("SELECT p.run_id, p.data FROM projects p JOIN runs r ON r.run_id = p.run_id "
+               f"{where} ORDER BY r.created_at, p.run_id, p.id")
+        results = []
+        for row in self.conn.execute(sql, params):
+            project = json.loads(row["data"])
+            project["run_id"] = row["run_id"]
+            results.append(project)
+        return results
+
+    def company_history(self, company: str, since: str = None) -> List[Dict]:
+        """某公司在各次运行中的项目，从旧到新"""
+        return self.projects(company=company, since=since)
+
+    def source_history(self, source_hash: str) -> List[Dict]:
+        """同一份PDF（按内容哈希）在各次运行中的提取结果"""
+        return self.projects(source_hash=source_hash)
+
+    def industry_counts(self, run_id: str = None) -> Dict[str, int]:
+        """各行业项目数，默认最新一次运行"""
+        run_id = run_id or self.latest_run_id()
+        rows = self.conn.execute(
+            "SELECT industry, COUNT(*) AS n FROM projects WHERE run_id = ? GROUP BY industry ORDER BY n DESC",
+            (run_id,),
+        )
+        return {row["industry"]: row["n"] for row in rows}
+
+
+def main(argv: List[str] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "import"
+    with ResultsStore() as store:
+        if command == "import":
+            run_ids = store.import_json_backlog()
+            print(f"✓ 导入 {len(run_ids)} 次运行，数据库: {store.db_path}")
+        elif command == "runs":
+            for run in store.runs():
+                print(f"{run['run_id']}  {run['project_count']:>4} 个项目  {run['source'] or ''}")
+        elif command == "history" and len(argv) > 1:
+            for project in store.company_history(argv[1]):
+                print(f"{project['run_id']}  {project.get('项目名称', '')}  {project.get('所处行业', '')}")
+        else:
+            print("用法: python -m analyzer_core.store [import | runs | history <公司名称>]")
+            return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
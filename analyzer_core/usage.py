@@ -0,0 +1,247 @@
+"""
+token 用量：本地估算、运行中记账和预算上限
+
+- estimate_tokens   不调用API估算文本的 token 数。安装了 tiktoken 时用它精确计数，
+                    否则按规则估算：中日韩字符每字约 1 token，英文单词每 4 个字母约 1 token，
+                    数字每 3 位、标点每个 1 token
+- estimate_corpus   按实际会发出的提示词（本地预提取、长文档分块都算在内）预估一批文档的
+                    输入/输出 token、请求数、耗时和费用（dry run）
+- UsageMeter        运行中按文件记录用量（后端返回了 usage 时用实际值，否则用估算值），
+                    发请求前检查 token 和请求数上限，超出时抛出 BudgetExceeded，已完成的结果照常导出
+
+配置（project_analyzer_config.json，均可省略）：
+
+    "max_tokens_per_run": 200000,
+    "max_requests_per_run": 500,
+    "price_input_per_million": 0.15,      # 美元 / 百万 token，默认 gpt-4o-mini 价格
+    "price_output_per_million": 0.60,
+    "estimate_latency_s": 1.5,            # 每次请求的固定耗时
+    "estimate_output_tps": 60             # 输出 token / 秒
+"""
+
+import json
+import math
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .prompts import FIELD_TOKENS, SYSTEM_PROMPT
+
+# 每条消息的格式开销（role、分隔符）
+MESSAGE_OVERHEAD = 4
+
+PRICE_INPUT_PER_MILLION = 0.15
+PRICE_OUTPUT_PER_MILLION = 0.60
+ESTIMATE_LATENCY_S = 1.5
+ESTIMATE_OUTPUT_TPS = 60
+
+_PIECES = re.compile(r"[一-鿿㐀-䶿぀-ヿ가-힯]|[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+_ENCODING = None
+
+
+def _tiktoken_encoding():
+    """有 tiktoken 时返回编码器，没有时返回 False（只尝试导入一次）"""
+    global _ENCODING
+    if _ENCODING is None:
+        try:
+            import tiktoken
+            _ENCODING = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _ENCODING = False
+    return _ENCODING
+
+
+def heuristic_tokens(text: str) -> int:
+    """规则估算，中英混排时误差一般在 15% 以内"""
+    count = 0
+    for piece in _PIECES.findall(text):
+        first = piece[0]
+        if first.isascii() and first.isalpha():
+            count += math.ceil(len(piece) / 4)
+        elif first.isdigit():
+            count += math.ceil(len(piece) / 3)
+        else:
+            count += 1
+    return count
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _tiktoken_encoding()
+    if encoding:
+        return len(encoding.encode(text))
+    return heuristic_tokens(text)
+
+
+def prompt_tokens(prompt: str) -> int:
+    """一次请求的输入 token（系统提示词 + 用户提示词 + 消息开销）"""
+    return estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt) + 2 * MESSAGE_OVERHEAD
+
+
+def expected_output_tokens(max_tokens: int, fields: List[str] = None) -> int:
+    """预估的输出 token：按字段的典型长度，不超过 max_tokens"""
+    if fields is None:
+        return max_tokens
+    return min(max_tokens, sum(FIELD_TOKENS.get(field, 150) for field in fields))
+
+
+class BudgetExceeded(RuntimeError):
+    """
+    本次运行的 token 或请求数达到上限
+    批量提取中途抛出时 results 为与输入一一对应的列表：已完成（已计费）的结果，没有运行的为 None
+    """
+
+    results: Optional[List] = None
+
+
+def _reply_usage(reply) -> Optional[Tuple[int, int]]:
+    usage = getattr(reply, "usage", None)
+    if not usage:
+        return None
+    try:
+        return int(usage["prompt_tokens"]), int(usage["completion_tokens"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class UsageMeter:
+    """
+    按文件记账并执行预算上限（线程安全）
+    reserve 按最坏情况（输入 + max_tokens）预留，record 时换成实际用量
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, max_requests: Optional[int] = None):
+        self.max_tokens = max_tokens
+        self.max_requests = max_requests
+        self.files: Dict[str, Dict] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.requests = 0
+        self.estimated_requests = 0
+        self._reserved_tokens = 0
+        self._reserved_requests = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "UsageMeter":
+        max_tokens = config.get("max_tokens_per_run")
+        max_requests = config.get("max_requests_per_run")
+        return cls(int(max_tokens) if max_tokens else None, int(max_requests) if max_requests else None)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def _fits(self, tokens: int, requests: int) -> bool:
+        if self.max_tokens is not None and self.total_tokens + self._reserved_tokens + tokens > self.max_tokens:
+            return False
+        if self.max_requests is not None and self.requests + self._reserved_requests + requests > self.max_requests:
+            return False
+        return True
+
+    def reserve(self, prompts: List[str], max_tokens: List[int]) -> int:
+        """发请求前预留额度，超出上限时抛出 BudgetExceeded；返回预留的 token 数"""
+        tokens = sum(prompt_tokens(p) for p in prompts) + sum(max_tokens)
+        with self._lock:
+            if not self._fits(tokens, len(prompts)):
+                raise BudgetExceeded(
+                    f"预算已用完：已用 {self.total_tokens} tokens / {self.requests} 次请求，"
+                    f"上限 {self.max_tokens or '不限'} tokens / {self.max_requests or '不限'} 次请求")
+            self._reserved_tokens += tokens
+            self._reserved_requests += len(prompts)
+        return tokens
+
+    def release(self, reserved: int, requests: int):
+        with self._lock:
+            self._reserved_tokens -= reserved
+            self._reserved_requests -= requests
+
+    def record(self, filename: str, prompt: str, reply):
+        """记录一次请求；reply 为异常时只计请求数（失败的请求通常也计费）"""
+        usage = None if isinstance(reply, Exception) else _reply_usage(reply)
+        if usage is None:
+            used_in = prompt_tokens(prompt)
+            used_out = 0 if isinstance(reply, Exception) else estimate_tokens(reply)
+        else:
+            used_in, used_out = usage
+        with self._lock:
+            entry = self.files.setdefault(filename, {"requests": 0, "prompt_tokens": 0,
+                                                     "completion_tokens": 0, "estimated": False})
+            entry["requests"] += 1
+            entry["prompt_tokens"] += used_in
+            entry["completion_tokens"] += used_out
+            entry["estimated"] = entry["estimated"] or usage is None
+            self.prompt_tokens += used_in
+            self.completion_tokens += used_out
+            self.requests += 1
+            self.estimated_requests += usage is None
+
+    def summary(self, config: Dict = None) -> Dict:
+        config = config or {}
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "estimated_requests": self.estimated_requests,
+            "cost_usd": round(cost_usd(self.prompt_tokens, self.completion_tokens, config), 4),
+            "max_tokens": self.max_tokens,
+            "max_requests": self.max_requests,
+        }
+
+    def save(self, path: Path, config: Dict = None):
+        """用量报告：汇总 + 每个文件的明细"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"summary": self.summary(config), "files": self.files}, f, ensure_ascii=False, indent=2)
+
+
+def cost_usd(input_tokens: int, output_tokens: int, config: Dict = None) -> float:
+    config = config or {}
+    return (input_tokens * float(config.get("price_input_per_million", PRICE_INPUT_PER_MILLION))
+            + output_tokens * float(config.get("price_output_per_million", PRICE_OUTPUT_PER_MILLION))) / 1e6
+
+
+def estimate_corpus(documents: List[Tuple[str, str]], config: Dict = None, workers: int = None) -> Dict:
+    """
+    dry run：不调用API，预估一批 (文本, 文件名) 的用量
+    按 ProjectInfoExtractor 实际会发出的提示词计算；补问次数无法预知，不计入
+    """
+    from .ai import ProjectInfoExtractor
+    config = config or {}
+    workers = workers or int(config.get("llm_workers", 4))
+    extractor = ProjectInfoExtractor(None, long_document_mode=config.get("long_document_mode", "map_reduce"))
+    files = {}
+    total_in = total_out = requests = 0
+    seconds = 0.0
+    latency = float(config.get("estimate_latency_s", ESTIMATE_LATENCY_S))
+    tps = float(config.get("estimate_output_tps", ESTIMATE_OUTPUT_TPS))
+    for text, filename in documents:
+        plan = extractor.plan_requests(text, filename)
+        used_in = sum(prompt_tokens(prompt) for prompt, _, _ in plan)
+        used_out = sum(expected_output_tokens(tokens, fields) for _, tokens, fields in plan)
+        files[filename] = {"requests": len(plan), "prompt_tokens": used_in, "completion_tokens": used_out}
+        total_in += used_in
+        total_out += used_out
+        requests += len(plan)
+        seconds += sum(latency + expected_output_tokens(tokens, fields) / tps for _, tokens, fields in plan)
+    return {
+        "documents": len(documents),
+        "requests": requests,
+        "prompt_tokens": total_in,
+        "completion_tokens": total_out,
+        "total_tokens": total_in + total_out,
+        "cost_usd": round(cost_usd(total_in, total_out, config), 4),
+        "seconds": round(seconds / max(1, workers), 1),
+        "tokenizer": "tiktoken" if _tiktoken_encoding() else "heuristic",
+        "files": files,
+    }
+
+
+def format_estimate(estimate: Dict) -> str:
+    return (f"{estimate['documents']} 个文档，约 {estimate['requests']} 次请求，"
+            f"输入 {estimate['prompt_tokens']:,} tokens，输出 {estimate['completion_tokens']:,} tokens，"
+            f"约 ${estimate['cost_usd']:.2f}，预计耗时 {estimate['seconds']:.0f} 秒"
+            f"（{estimate['tokenizer']} 估算，不含补问）")
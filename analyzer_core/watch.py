@@ -0,0 +1,153 @@
+"""
+监视 data/projects，新增或修改的PDF到达后增量处理
+
+DirectoryWatcher 只负责发现变化，处理流程（提取、分析、更新结果）在 cli.cmd_watch：
+
+- 每隔 interval 秒扫描一次目录（只做 stat，几百个文件也只要几毫秒），不依赖 inotify，
+  网络盘、Docker 挂载目录上也能用
+- 防抖：文件大小和修改时间在 debounce 秒内不再变化才算写完；一次拷进来一批文件时，
+  等整批都稳定后作为一个批次处理
+- 修改时间变了但内容没变（touch、重新同步）的文件按哈希跳过
+- 已处理文件的 (mtime, size, sha256) 保存在 data/output/watch_state.json，
+  重启后只处理期间新增或修改的文件
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEBOUNCE_S = 2.0
+POLL_INTERVAL_S = 1.0
+
+
+def file_signature(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DirectoryWatcher:
+    """
+    轮询目录，poll() 返回已稳定的新增/修改文件和已删除的文件名
+    处理完后调用 commit() 记入状态（处理失败的文件也记入，文件再次变化时才重试）
+    """
+
+    def __init__(self, directory: Path, pattern: str = "*.pdf", state_path: Optional[Path] = None,
+                 debounce: float = DEBOUNCE_S, clock=time.monotonic):
+        self.directory = Path(directory)
+        self.pattern = pattern
+        self.state_path = Path(state_path) if state_path else None
+        self.debounce = debounce
+        self.clock = clock
+        self.state: Dict[str, Dict] = {}
+        self.is_new = True
+        # 文件名 -> (签名, 最后一次变化的时间)
+        self._pending: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        # 文件名 -> (签名, sha256)，poll 返回后等待 commit
+        self._ready: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        if self.state_path and self.state_path.exists():
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    self.state = json.load(f)
+                self.is_new = False
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"警告: 监视状态读取失败，将重新处理所有文件 - {str(e)}")
+
+    @property
+    def pending(self) -> bool:
+        """是否还有没稳定下来的文件"""
+        return bool(self._pending)
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        files = {}
+        for path in self.directory.glob(self.pattern):
+            try:
+                files[path.name] = file_signature(path)
+            except FileNotFoundError:
+                # 扫描期间被删除或改名
+                continue
+        return files
+
+    def _unchanged(self, name: str, signature: Tuple[int, int]) -> bool:
+        entry = self.state.get(name)
+        return bool(entry) and (entry["mtime_ns"], entry["size"]) == tuple(signature)
+
+    def poll(self) -> Tuple[List[Path], List[str]]:
+        now = self.clock()
+        current = self.scan()
+        for name, signature in current.items():
+            if self._unchanged(name, signature):
+                self._pending.pop(name, None)
+                continue
+            previous = self._pending.get(name)
+            if previous is None or previous[0] != signature:
+                self._pending[name] = (signature, now)
+        for name in list(self._pending):
+            if name not in current:
+                del self._pending[name]
+
+        deleted = sorted(name for name in self.state if name not in current)
+        for name in deleted:
+            del self.state[name]
+        if deleted:
+            self.save()
+
+        # 整批文件都稳定后才一起交出，拷贝过程中不会处理半个文件
+        if not self._pending or any(now - since < self.debounce for _, since in self._pending.values()):
+            return [], deleted
+        changed = []
+        touched = False
+        for name, (signature, _) in sorted(self._pending.items()):
+            path = self.directory / name
+            try:
+                sha = file_sha256(path)
+            except FileNotFoundError:
+                continue
+            entry = self.state.get(name)
+            if entry and entry.get("sha256") == sha:
+                # 内容没变，只更新签名
+                entry.update(mtime_ns=signature[0], size=signature[1])
+                touched = True
+                continue
+            self._ready[name] = (signature, sha)
+            changed.append(path)
+        self._pending.clear()
+        if touched:
+            self.save()
+        return changed, deleted
+
+    def commit(self, names: Iterable[str]):
+        for name in names:
+            if name in self._ready:
+                (mtime_ns, size), sha = self._ready.pop(name)
+                self.state[name] = {"mtime_ns": mtime_ns, "size": size, "sha256": sha}
+        self.save()
+
+    def adopt(self, names: Iterable[str]):
+        """把已有结果的文件直接记为已处理（第一次启动时避免整批重跑）"""
+        for name in names:
+            path = self.directory / name
+            if path.exists() and name not in self.state:
+                mtime_ns, size = file_signature(path)
+                self.state[name] = {"mtime_ns": mtime_ns, "size": size, "sha256": file_sha256(path)}
+        self.is_new = False
+        self.save()
+
+    def save(self):
+        if not self.state_path:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.state_path)
@@ -0,0 +1,3 @@
+"""
+性能基准，在仓库根目录用 python -m benchmarks.<名称> 运行
+"""
@@ -0,0 +1,71 @@
+"""
+efficient_tasks 各解法的规模曲线：k 组解法 vs 三段切分 / 回溯 / 枚举参照解
+
+    python -m benchmarks.difficulty_scaling
+    python -m benchmarks.difficulty_scaling --sizes 1000,100000,1000000 --groups 3,10,100
+
+慢的解法只在它们还能在几秒内完成的规模上运行，其余格子显示 "-"。
+"""
+
+import argparse
+import random
+import time
+
+from efficient_tasks import (
+    getMaxDifficultyK,
+    max_difficulty_backtracking,
+    max_difficulty_contiguous,
+    max_difficulty_sorted_splits,
+)
+
+# 解法名 -> (函数, 适用条件)
+SOLVERS = {
+    "k组解法": (getMaxDifficultyK, lambda n, k: True),
+    "三段切分": (lambda d, k: max_difficulty_sorted_splits(d), lambda n, k: k == 3 and n <= 60),
+    "精确回溯": (lambda d, k: max_difficulty_backtracking(d), lambda n, k: k == 3 and n <= 16),
+    "枚举参照解": (max_difficulty_contiguous, lambda n, k: n <= 9 and k <= 5),
+}
+
+
+def timed(func, difficulty, k, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(list(difficulty), k)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="efficient_tasks 规模基准")
+    parser.add_argument("--sizes", default="8,16,60,10000,1000000")
+    parser.add_argument("--groups", default="3,5,50")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sizes = [int(n) for n in args.sizes.split(",")]
+    groups = [int(k) for k in args.groups.split(",")]
+
+    print(f"{'n':>9} {'k':>4} " + " ".join(f"{name:>16}" for name in SOLVERS))
+    for n in sizes:
+        difficulty = [rng.randint(1, 10 ** 9) for _ in range(n)]
+        for k in groups:
+            if k > n:
+                continue
+            cells = []
+            answers = set()
+            for func, applies in SOLVERS.values():
+                if not applies(n, k):
+                    cells.append(f"{'-':>16}")
+                    continue
+                elapsed, result = timed(func, difficulty, k, repeat=1 if n > 100_000 else 3)
+                answers.add(result)
+                cells.append(f"{elapsed * 1000:>13.3f} ms")
+            assert len(answers) == 1, f"结果不一致: n={n}, k={k}, {answers}"
+            print(f"{n:>9} {k:>4} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
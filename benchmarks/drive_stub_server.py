@@ -0,0 +1,129 @@
+"""
+Google Drive API v3 的本地替身（只用标准库），用于测试文件夹同步
+
+只实现爬取用到的接口：
+
+    GET /drive/v3/files?q='<id>' in parents&pageSize=&pageToken=   分页列出子项
+    GET /drive/v3/files/<id>?alt=media                              下载
+    GET /drive/v3/files/<id>/export?mimeType=application/pdf        导出 Google 文档
+
+    with DriveStubServer(page_size=2) as server:
+        root = server.add_folder("Projects")
+        server.add_file(root, "P1.pdf", b"%PDF-1.4 ...")
+        client = DriveClient(api_key="test", api_base=server.api_base)
+
+server.broken_downloads = n 时接下来的 n 次下载只发出一半内容就断开连接（模拟传输中断）。
+"""
+
+import hashlib
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from analyzer_core.drive import FOLDER_MIME, PDF_MIME
+
+_PARENT = re.compile(r"'([^']+)' in parents")
+
+
+class DriveStubServer:
+    def __init__(self, page_size: int = 100, api_key: str = "test", host: str = "127.0.0.1", port: int = 0):
+        self.page_size = page_size
+        self.api_key = api_key
+        self.items = {}
+        self.children = {}
+        self.list_requests = 0
+        self.downloads = []
+        self.broken_downloads = 0
+        self._lock = threading.Lock()
+        self._next_id = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body: bytes, content_type="application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                if query.get("key") != server.api_key:
+                    return self._send(403, b'{"error": "forbidden"}')
+                parts = url.path.split("/")[3:]
+                if parts == ["files"]:
+                    return self._send(200, json.dumps(server.list_page(query)).encode("utf-8"))
+                item = server.items.get(parts[1]) if len(parts) >= 2 else None
+                if item is None or item["mimeType"] == FOLDER_MIME:
+                    return self._send(404, b'{"error": "not found"}')
+                with server._lock:
+                    server.downloads.append(item["name"])
+                    broken = server.broken_downloads > 0
+                    server.broken_downloads -= broken
+                if broken:
+                    content = item["content"]
+                    self.send_response(200)
+                    self.send_header("Content-Type", PDF_MIME)
+                    self.send_header("Content-Length", str(len(content)))
+                    self.end_headers()
+                    self.wfile.write(content[:len(content) // 2])
+                    self.close_connection = True
+                    return
+                self._send(200, item["content"], PDF_MIME)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.api_base = f"http://{host}:{self._server.server_address[1]}/drive/v3"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def _add(self, parent, name, mime, **fields):
+        with self._lock:
+            self._next_id += 1
+            item_id = f"id{self._next_id:04d}_{'x' * 20}"
+        self.items[item_id] = {"id": item_id, "name": name, "mimeType": mime, **fields}
+        self.children.setdefault(parent, []).append(item_id)
+        return item_id
+
+    def add_folder(self, name: str, parent: str = None) -> str:
+        return self._add(parent, name, FOLDER_MIME)
+
+    def add_file(self, parent: str, name: str, content: bytes, mime: str = PDF_MIME,
+                 modified: str = "2026-01-01T00:00:00.000Z") -> str:
+        file_id = self._add(parent, name, mime)
+        self.update_file(file_id, content, modified)
+        return file_id
+
+    def update_file(self, file_id: str, content: bytes, modified: str):
+        item = self.items[file_id]
+        item.update(content=content, modifiedTime=modified, size=str(len(content)))
+        if item["mimeType"] == PDF_MIME:
+            item["md5Checksum"] = hashlib.md5(content).hexdigest()
+
+    def list_page(self, query):
+        with self._lock:
+            self.list_requests += 1
+        parent = _PARENT.search(query.get("q", "")).group(1)
+        ids = self.children.get(parent, [])
+        size = min(int(query.get("pageSize", 100)), self.page_size)
+        start = int(query.get("pageToken", 0))
+        page = {"files": [{k: v for k, v in self.items[i].items() if k != "content"}
+                          for i in ids[start:start + size]]}
+        if start + size < len(ids):
+            page["nextPageToken"] = str(start + size)
+        return page
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,77 @@
+"""
+向量索引的构建与查询耗时
+
+生成 N 篇合成项目文本，分别测全量构建、增量新增 10 篇、相似项目查询和适配度排序：
+
+    python -m benchmarks.embedding_query --docs 500
+    python -m benchmarks.embedding_query --docs 3000      # 超过 IVF_MIN_ROWS，查询走 IVF
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from analyzer_core import embeddings
+from analyzer_core.embeddings import EmbeddingIndex
+from benchmarks.prompt_size import SAMPLE
+
+TOPICS = [
+    "portfolio risk equity trading investment credit",
+    "hospital clinical patient readmission healthcare",
+    "retail merchant demand forecasting inventory",
+    "real estate property pricing housing reit",
+    "marketing churn customer segmentation campaign",
+    "supply chain logistics routing warehouse",
+]
+
+
+def write_corpus(directory: Path, count: int, start: int = 0):
+    rng = random.Random(start)
+    for i in range(start, start + count):
+        words = " ".join(rng.choice(TOPICS).split() * 3 + rng.sample(" ".join(TOPICS).split(), 6))
+        (directory / f"project_{i:05d}.txt").write_text(f"{SAMPLE}\n{words}\n", encoding="utf-8")
+
+
+def timed(func, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向量索引基准")
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    profile = {"background": {"interests": ["Investment analysis", "Risk management"]},
+               "preferences": {"preferred_industries": ["Finance"], "avoid_industries": ["Healthcare"]}}
+    with tempfile.TemporaryDirectory() as tmp:
+        texts, index_dir = Path(tmp) / "texts", Path(tmp) / "index"
+        texts.mkdir()
+        write_corpus(texts, args.docs)
+        with EmbeddingIndex(index_dir) as index:
+            build, _ = timed(lambda: index.update(texts))
+        write_corpus(texts, 10, start=args.docs)
+        with EmbeddingIndex(index_dir) as index:
+            incremental, result = timed(lambda: index.update(texts))
+            names = [doc["name"] for doc in index.docs[:3]]
+            similar, _ = timed(lambda: index.similar(names, k=10), args.queries)
+            search, _ = timed(lambda: index.search("equity portfolio risk", k=10), args.queries)
+            fit, _ = timed(lambda: index.profile_fit(profile, k=20), args.queries)
+            mode = f"IVF（{len(index.centroids)} 个列表，探查 {embeddings.NPROBE} 个）" if index.centroids else "flat"
+            size = index.vectors_path.stat().st_size
+
+    print(f"{args.docs} 篇文本，{mode}，向量文件 {size / 1024:.0f} KB\n")
+    print(f"全量构建              {build:9.1f} ms")
+    print(f"增量新增 10 篇        {incremental:9.1f} ms  {'（触发重建）' if result['rebuilt'] else ''}")
+    print(f"相似项目 top-10       {similar:9.2f} ms/次")
+    print(f"文本搜索 top-10       {search:9.2f} ms/次")
+    print(f"适配度排序（全部）    {fit:9.2f} ms/次")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+入口脚本的启动耗时基准
+
+每个模块在全新的解释器里导入若干次，取中位数，减去空解释器的启动时间，
+得到导入本身的耗时；同时检查重量级依赖没有在导入阶段被加载。
+
+用法：
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 20 --budget-ms 80
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_MODULES = [
+    "project_analyzer_local",
+    "analyze_projects_direct",
+    "process_local_pdfs",
+    "analyze_with_ai",
+    "profile_scorer",
+    "analyzer_core.cli",
+    "project_analyzer",
+]
+
+# 只应在真正用到时才导入的依赖
+HEAVY_MODULES = ["pandas", "openpyxl", "openai", "requests", "PyPDF2", "pdfplumber", "numpy"]
+
+# 导入耗时预算（不含解释器自身启动）
+STARTUP_BUDGET_MS = 50
+
+_PROBE = (
+    "import sys, json, importlib; "
+    "importlib.import_module({module!r}); "
+    "print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))"
+)
+
+
+def _run(code: str) -> tuple:
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                            capture_output=True, text=True)
+    return time.perf_counter() - start, result
+
+
+def heavy_modules_loaded(module: str) -> list:
+    """导入 module 后被加载的重量级依赖；模块本身无法导入时抛出 ImportError"""
+    _, result = _run(_PROBE.format(module=module, heavy=HEAVY_MODULES))
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1] if result.stderr else module)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(module: str, runs: int = 10) -> float:
+    """导入 module 的中位耗时（秒），已扣除空解释器启动时间"""
+    baseline = statistics.median(_run("pass")[0] for _ in range(runs))
+    samples = []
+    for _ in range(runs):
+        elapsed, result = _run(f"import {module}")
+        if result.returncode != 0:
+            raise ImportError(result.stderr.strip().splitlines()[-1])
+        samples.append(elapsed)
+    return max(0.0, statistics.median(samples) - baseline)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="入口脚本启动耗时基准")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args()
+
+    failed = False
+    for module in ENTRY_MODULES:
+        try:
+            heavy = heavy_modules_loaded(module)
+            elapsed_ms = measure(module, args.runs) * 1000
+        except ImportError as e:
+            print(f"  {module:26s} 跳过（{e}）")
+            continue
+        over = elapsed_ms > args.budget_ms
+        failed = failed or over or bool(heavy)
+        status = "✗" if over or heavy else "✓"
+        extra = f"  提前加载: {', '.join(heavy)}" if heavy else ""
+        print(f"{status} {module:26s} {elapsed_ms:7.1f} ms{extra}")
+
+    print(f"\n预算: {args.budget_ms:.0f} ms（不含解释器启动）")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+OpenAI 兼容的本地模型服务替身（只用标准库）
+
+在没有真实模型时用于基准和测试：按提示词里要求的字段返回 JSON，
+值来自本地规则预提取，取不到的字段给占位文本。latency 模拟每次推理耗时，
+slots 模拟服务端能同时处理的请求数（llama.cpp server 的 --parallel）。
+
+    with StubLLMServer(latency=0.05, slots=4) as server:
+        backend = LocalServerBackend(server.base_url)
+"""
+
+import json
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from analyzer_core.heuristics import HeuristicExtractor
+from analyzer_core.prompts import PROJECT_FIELDS
+from analyzer_core.usage import heuristic_tokens
+
+_DOCUMENT = re.compile(r"文档内容：\n\n(.*?)\n\n(?:请提取以下信息|请只根据这一部分|只返回包含以下字段)", re.DOTALL)
+_FIELD = re.compile(r'^\s*"([^"]+)":', re.MULTILINE)
+
+
+def answer(prompt: str) -> str:
+    """按提示词生成回复 JSON"""
+    match = _DOCUMENT.search(prompt)
+    document = match.group(1) if match else prompt
+    tail = prompt[match.end():] if match else prompt
+    fields = [field for field in _FIELD.findall(tail) if field in PROJECT_FIELDS]
+    guessed = HeuristicExtractor().extract(document)
+    reply = {field: guessed[field][0] if field in guessed else f"{field}（本地模型）" for field in fields}
+    return json.dumps(reply, ensure_ascii=False)
+
+
+class StubLLMServer:
+    def __init__(self, latency: float = 0.0, slots: int = 4, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self._slots = threading.Semaphore(slots)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # 响应头和正文分两次写出，关掉 Nagle 避免与延迟确认叠加出 40ms 等待
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length))
+                with server._slots:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    content = answer(body["messages"][-1]["content"])
+                with server._lock:
+                    server.requests += 1
+                payload = json.dumps({
+                    "object": "chat.completion",
+                    "model": body.get("model", "stub"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}],
+                    # 与真实服务一样回报用量（这里用本地估算）
+                    "usage": {
+                        "prompt_tokens": sum(heuristic_tokens(m["content"]) for m in body["messages"]),
+                        "completion_tokens": heuristic_tokens(content),
+                    },
+                }, ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,99 @@
+"""
+模型后端吞吐量对比
+
+同一批文档分别用各后端提取，比较 文档/秒 和请求数：
+
+- stub          本地服务替身（总是运行），分别测逐个调用和批量并发
+- local_server  --local-url 指向真实的 OpenAI 兼容本地服务时运行
+- llama_cpp     --model-path 指向 GGUF 模型且已安装 llama-cpp-python 时运行
+- openai        --remote 且设置了 OPENAI_API_KEY 时运行（会产生费用）
+
+用法：
+    python -m benchmarks.llm_throughput --docs 32 --latency 0.05
+    python -m benchmarks.llm_throughput --local-url http://127.0.0.1:8080/v1 --remote
+"""
+
+import argparse
+import os
+import time
+
+from analyzer_core.ai import ProjectInfoExtractor
+from analyzer_core.backends import LlamaCppBackend, LocalServerBackend, OpenAIBackend
+from benchmarks.llm_stub_server import StubLLMServer
+from benchmarks.prompt_size import SAMPLE
+
+
+def sample_documents(count: int) -> list:
+    docs = []
+    for i in range(count):
+        text = SAMPLE.replace("2026-F-014", f"2026-F-{i:03d}")
+        # 一半文档没有标签行，需要模型提取全部字段
+        if i % 2:
+            text = "\n".join(line.split(":", 1)[-1] for line in text.splitlines())
+        docs.append((text, f"project_{i:03d}.pdf"))
+    return docs
+
+
+def run(backend, documents: list, batch_size: int) -> dict:
+    extractor = ProjectInfoExtractor(backend)
+    failed = 0
+    start = time.perf_counter()
+    for offset in range(0, len(documents), batch_size):
+        for info in extractor.extract_batch(documents[offset:offset + batch_size]):
+            failed += info.get("项目名称") in ("解析失败", "提取失败")
+    elapsed = time.perf_counter() - start
+    return {"秒": elapsed, "文档/秒": len(documents) / elapsed, "失败": failed}
+
+
+def report(name: str, result: dict, extra: str = ""):
+    print(f"{name:28s} {result['秒']:8.2f} s {result['文档/秒']:8.1f} 文档/秒  失败 {result['失败']}{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模型后端吞吐量对比")
+    parser.add_argument("--docs", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="替身服务每次推理的模拟耗时（秒）")
+    parser.add_argument("--local-url", default=None)
+    parser.add_argument("--model-path", default=None)
+    parser.add_argument("--remote", action="store_true")
+    args = parser.parse_args()
+
+    documents = sample_documents(args.docs)
+    print(f"{args.docs} 篇文档，批大小 {args.batch_size}\n")
+
+    with StubLLMServer(latency=args.latency, slots=args.workers) as server:
+        for label, workers, batch in (("stub 逐个", 1, 1), ("stub 批量", args.workers, args.batch_size)):
+            before = (server.requests, server.connections)
+            backend = LocalServerBackend(server.base_url, workers=workers)
+            result = run(backend, documents, batch)
+            backend.close()
+            requests = server.requests - before[0]
+            connections = server.connections - before[1]
+            report(label, result, f"  请求 {requests}，连接 {connections}")
+
+    if args.local_url:
+        backend = LocalServerBackend(args.local_url, workers=args.workers)
+        report("local_server 批量", run(backend, documents, args.batch_size))
+        backend.close()
+
+    if args.model_path:
+        try:
+            backend = LlamaCppBackend(args.model_path)
+        except ImportError:
+            print("llama_cpp                    跳过（未安装 llama-cpp-python）")
+        else:
+            report("llama_cpp 冷启动后", run(backend, documents, args.batch_size))
+
+    if args.remote:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            print("openai                       跳过（未设置 OPENAI_API_KEY）")
+        else:
+            backend = OpenAIBackend(api_key, workers=args.workers)
+            report("openai 批量", run(backend, documents, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
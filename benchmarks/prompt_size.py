@@ -0,0 +1,81 @@
+"""
+本地预提取对提示词大小的影响
+
+对 data/project_texts 下每篇文本分别构造完整提示词和预提取后的提示词，
+比较输入字符数和 max_tokens（输出上限）。没有已提取的文本时用内置样例。
+
+用法：
+    python -m benchmarks.prompt_size
+    python -m benchmarks.prompt_size --texts-dir data/project_texts --threshold 0.9
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from analyzer_core.heuristics import CONFIDENCE_THRESHOLD, HeuristicExtractor
+from analyzer_core.prompts import PROJECT_FIELDS, build_prompt, max_tokens_for
+
+SAMPLE = """MSBA Capstone Project Proposal
+Project Title: Portfolio Risk Early Warning System
+Company Name: Acme Capital Partners
+Project ID: 2026-F-014
+
+Project Description:
+Acme manages a portfolio of small-business loans and wants an early warning
+system that flags borrowers likely to default in the next two quarters.
+
+Required Skills:
+- Python, SQL
+- Tableau or Power BI
+
+Deliverables:
+- A validated model, a dashboard and a written recommendation.
+"""
+
+
+def load_texts(texts_dir: Path) -> list:
+    texts = [(p.stem + ".pdf", p.read_text(encoding="utf-8")) for p in sorted(texts_dir.glob("*.txt"))]
+    return texts or [("P014_sample.pdf", SAMPLE)]
+
+
+def compare(texts: list, threshold: float = CONFIDENCE_THRESHOLD) -> dict:
+    heuristics = HeuristicExtractor()
+    full_chars, reduced_chars, full_tokens, reduced_tokens, skipped = [], [], [], [], []
+    start = time.perf_counter()
+    for filename, text in texts:
+        known = heuristics.confident(text, filename, threshold)
+        fields = [field for field in PROJECT_FIELDS if field not in known]
+        full_chars.append(len(build_prompt(text)))
+        reduced_chars.append(len(build_prompt(text, fields)))
+        full_tokens.append(max_tokens_for(list(PROJECT_FIELDS)))
+        reduced_tokens.append(max_tokens_for(fields))
+        skipped.append(len(known))
+    elapsed = time.perf_counter() - start
+    return {
+        "文档数": len(texts),
+        "平均预提取字段数": statistics.mean(skipped),
+        "提示词字符": (sum(full_chars), sum(reduced_chars)),
+        "max_tokens": (sum(full_tokens), sum(reduced_tokens)),
+        "预提取耗时ms/篇": elapsed * 1000 / len(texts),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地预提取对提示词大小的影响")
+    parser.add_argument("--texts-dir", type=Path, default=Path("data/project_texts"))
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD)
+    args = parser.parse_args()
+
+    result = compare(load_texts(args.texts_dir), args.threshold)
+    print(f"文档数: {result['文档数']}，平均预提取 {result['平均预提取字段数']:.1f} 个字段，"
+          f"每篇 {result['预提取耗时ms/篇']:.2f} ms")
+    for name in ("提示词字符", "max_tokens"):
+        full, reduced = result[name]
+        saving = (1 - reduced / full) * 100 if full else 0.0
+        print(f"{name:10s} 完整 {full:>8}  预提取后 {reduced:>8}  减少 {saving:5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+共享任务表的扩展性：N 个工作进程同时领取任务时的吞吐量
+
+每个任务用 sleep 模拟一次模型调用（--job-ms），只测任务表本身的领取和提交开销：
+
+    python -m benchmarks.queue_scaling --jobs 400 --job-ms 20 --workers 1,2,4,8
+"""
+
+import argparse
+import tempfile
+import time
+from multiprocessing import Process
+from pathlib import Path
+
+from analyzer_core.jobqueue import JobQueue
+
+
+def work(path: str, name: str, job_s: float):
+    queue = JobQueue(Path(path))
+    while True:
+        leases = queue.lease(name, 1)
+        if not leases:
+            return
+        (job, token), = leases
+        time.sleep(job_s)
+        queue.complete(job, token, {"job": job})
+
+
+def run(workers: int, jobs: int, job_s: float) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "jobs.db"
+        JobQueue(path).enqueue((f"p{i:05d}.pdf", "1") for i in range(jobs))
+        start = time.perf_counter()
+        processes = [Process(target=work, args=(str(path), f"w{i}", job_s)) for i in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+        assert len(JobQueue(path).results()) == jobs
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="共享任务表扩展性基准")
+    parser.add_argument("--jobs", type=int, default=400)
+    parser.add_argument("--job-ms", type=float, default=20.0)
+    parser.add_argument("--workers", default="1,2,4,8")
+    args = parser.parse_args()
+
+    print(f"{args.jobs} 个任务，每个 {args.job_ms:.0f} ms\n")
+    print(f"{'工作进程':>8} {'耗时(s)':>9} {'任务/秒':>9} {'加速比':>8}")
+    base = None
+    for workers in (int(w) for w in args.workers.split(",")):
+        elapsed = run(workers, args.jobs, args.job_ms / 1000)
+        base = base or elapsed
+        print(f"{workers:>8} {elapsed:>9.2f} {args.jobs / elapsed:>9.1f} {base / elapsed:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+项目记录的序列化开销：缩进JSON整表读写 vs ProjectRecord + NDJSON 流式读写
+
+    python -m benchmarks.records_io --records 100000
+
+内存一栏是把记录全部读进内存后每条占用的字节数（tracemalloc）。
+"""
+
+import argparse
+import gc
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from analyzer_core.records import ProjectRecord, iter_ndjson, write_ndjson
+
+
+def sample_projects(n: int):
+    industries = ("金融", "零售", "医疗", "制造", "咨询")
+    for i in range(n):
+        yield {
+            "项目编号": f"P-{i:06d}",
+            "项目名称": f"Demand forecasting {i}",
+            "公司名称": f"Company {i % 997}",
+            "所处行业": industries[i % len(industries)],
+            "适配星级": "★" * (1 + i % 5),
+            "建议bidding分数": i % 30,
+            "应用场景": "预测门店销量，优化补货",
+            "公司用心程度": "高",
+            "预期成果": "预测模型和看板",
+            "技能要求": "Python, SQL, 时间序列",
+            "项目描述摘要": "根据历史销量和促销数据建立需求预测模型。",
+            "适配得分": round((i % 100) / 10, 1),
+            "适配理由": "技能匹配",
+            "bidding理由": "高适配",
+            "源文件": f"project_{i:06d}.pdf",
+        }
+
+
+def timed(func):
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def per_record_bytes(load, n: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    data = load()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(data) == n
+    return current / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="项目记录序列化基准")
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.records
+    projects = list(sample_projects(n))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "projects.json"
+        ndjson_path = Path(tmp) / "projects.ndjson"
+
+        def write_json():
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(projects, f, ensure_ascii=False, indent=2)
+
+        def read_json():
+            with open(json_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        records = [ProjectRecord.from_dict(p) for p in projects]
+        rows = [
+            ("缩进JSON（字典）", write_json, read_json, json_path),
+            ("NDJSON（ProjectRecord）", lambda: write_ndjson(records, ndjson_path),
+             lambda: list(iter_ndjson(ndjson_path)), ndjson_path),
+        ]
+        print(f"{n} 条记录\n")
+        print(f"{'格式':<24} {'写入(s)':>8} {'读取(s)':>8} {'文件(MB)':>9} {'内存(B/条)':>11}")
+        for label, write, read, path in rows:
+            write_s, _ = timed(write)
+            read_s, loaded = timed(read)
+            assert len(loaded) == n
+            del loaded
+            size = path.stat().st_size / 1e6
+            memory = per_record_bytes(read, n)
+            print(f"{label:<24} {write_s:>8.2f} {read_s:>8.2f} {size:>9.1f} {memory:>11.0f}")
+
+        assert list(iter_ndjson(ndjson_path)) == records
+
+
+if __name__ == "__main__":
+    main()
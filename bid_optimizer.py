@@ -0,0 +1,260 @@
+"""
+Bidding分数分配 - 在 user_profile.json 的 bidding_strategy 约束下分配总分
+
+约束（来自 preferences.bidding_strategy）：
+- total_points      总分（默认 2000）
+- min_projects      至少 bid 的项目数（默认 20）
+- max_per_project   单个项目上限（默认 600）
+- preferred_range   重点项目的理想区间，如 "300-600"
+
+模型：项目 i 投 b 分的收益为 w_i · g(b)，g(b) = 1 - exp(-b / scale) 近似中标概率，
+w_i 由适配星级决定（每多一星权重翻倍），scale 取 preferred_range 的下限。
+"""
+
+import heapq
+import math
+from typing import Dict, List
+
+DEFAULT_STRATEGY = {
+    "total_points": 2000,
+    "min_projects": 20,
+    "max_per_project": 600,
+    "preferred_range": "300-600",
+}
+
+
+def parse_range(text: str) -> tuple:
+    """把 "300-600" 解析成 (300, 600)"""
+    low, _, high = str(text).partition('-')
+    low = int(low.strip())
+    return low, int(high.strip()) if high.strip() else low
+
+
+def stars_of(project: Dict) -> int:
+    """项目的适配星级（1-5），优先用适配得分，其次数星星"""
+    if "适配得分" in project:
+        return max(1, min(5, int(project["适配得分"]) + 1))
+    stars = str(project.get("适配星级", "")).count('⭐')
+    return max(1, min(5, stars or 1))
+
+
+def default_weight(project: Dict) -> float:
+    return float(2 ** (stars_of(project) - 1))
+
+
+class BidOptimizer:
+    """
+    精确求解分数分配
+
+    以 step 分为一个单位离散化。g 是凹函数，所以每个项目每多一个单位的边际收益
+    单调递减，可分离凹函数的背包问题按边际收益贪心取单位就是最优解。min_projects
+    约束：所有项目共用同一条 g，最优解里 bid 的项目一定是权重最高的若干个，
+    因此锁定权重前 min_projects 名各至少一个单位，再贪心分配剩余单位。
+
+    what-if：update_weight / update_project 只改一个项目的权重，然后在上一次
+    的分配上做"单位交换"（从边际收益最低处挪一个单位到最高处）直到无法改进，
+    只需 O(N + Δ log N)，Δ 是实际移动的单位数。
+
+    solve_dp 是对任意收益表都成立的分组背包 DP，用来校验。
+    """
+
+    def __init__(self, strategy: Dict = None, step: int = 10, scale: float = None):
+        strategy = {**DEFAULT_STRATEGY, **(strategy or {})}
+        self.step = step
+        self.total_units = int(strategy["total_points"]) // step
+        self.min_projects = int(strategy["min_projects"])
+        self.max_units = int(strategy["max_per_project"]) // step
+        self.preferred_range = parse_range(strategy["preferred_range"])
+        self.scale = float(scale or self.preferred_range[0] or 300)
+
+        # 第 u 个单位（从 0 开始）的边际收益系数，所有项目共用
+        self.unit_gain = [self._g((u + 1) * step) - self._g(u * step) for u in range(self.max_units)]
+
+        self.projects: List[Dict] = []
+        self.weights: List[float] = []
+        self.units: List[int] = []
+        self.floors: List[int] = []
+        self.free_units = 0
+
+    @classmethod
+    def from_profile(cls, profile: Dict, **kwargs) -> 'BidOptimizer':
+        strategy = profile.get("preferences", {}).get("bidding_strategy", {})
+        return cls(strategy, **kwargs)
+
+    def _g(self, points: float) -> float:
+        return 1.0 - math.exp(-points / self.scale)
+
+    # ------------------------------------------------------------------
+    # 求解
+    # ------------------------------------------------------------------
+
+    def solve(self, projects: List[Dict], weight_fn=default_weight) -> List[Dict]:
+        """从头求解，返回分配方案"""
+        self.projects = list(projects)
+        self.weights = [weight_fn(p) for p in self.projects]
+        n = len(self.projects)
+        required = min(self.min_projects, n)
+        if required > self.total_units:
+            raise ValueError(f"总分 {self.total_units * self.step} 不足以覆盖 {required} 个项目")
+
+        self.units = [0] * n
+        self.floors = [0] * n
+        self.free_units = self.total_units
+        self._relock()
+        self._rebalance()
+        return self.plan()
+
+    def update_weight(self, index: int, weight: float) -> List[Dict]:
+        """修改单个项目的权重并增量重算"""
+        self.weights[index] = weight
+        self._relock()
+        self._rebalance()
+        return self.plan()
+
+    def update_project(self, index: int, project: Dict, weight_fn=default_weight) -> List[Dict]:
+        """用新的项目信息（如重新评分后的适配得分）替换并增量重算"""
+        self.projects[index] = project
+        return self.update_weight(index, weight_fn(project))
+
+    def _relock(self):
+        """权重前 min_projects 名至少一个单位；新锁定且为 0 的项目先从空闲分数里拿"""
+        n = len(self.weights)
+        required = min(self.min_projects, n)
+        locked = set(heapq.nsmallest(required, range(n), key=lambda i: (-self.weights[i], i)))
+        for i in range(n):
+            self.floors[i] = 1 if i in locked else 0
+            if self.units[i] < self.floors[i]:
+                self.units[i] = 1
+                self.free_units -= 1
+        # 空闲不够时，从其他项目收回单位（_rebalance 会从边际收益最低处收）
+        while self.free_units < 0:
+            donor = min((i for i in range(n) if self.units[i] > self.floors[i]),
+                        key=self._last_gain)
+            self.units[donor] -= 1
+            self.free_units += 1
+
+    def _next_gain(self, i: int) -> float:
+        return self.weights[i] * self.unit_gain[self.units[i]]
+
+    def _last_gain(self, i: int) -> float:
+        return self.weights[i] * self.unit_gain[self.units[i] - 1]
+
+    def _rebalance(self):
+        """先分配空闲单位，再做单位交换直到边际收益最低的已分配单位不低于最高的未分配单位"""
+        n = len(self.weights)
+        takers = [(-self._next_gain(i), i, self.units[i])
+                  for i in range(n) if self.units[i] < self.max_units]
+        donors = [(self._last_gain(i), i, self.units[i])
+                  for i in range(n) if self.units[i] > self.floors[i]]
+        heapq.heapify(takers)
+        heapq.heapify(donors)
+
+        def push(i):
+            if self.units[i] < self.max_units:
+                heapq.heappush(takers, (-self._next_gain(i), i, self.units[i]))
+            if self.units[i] > self.floors[i]:
+                heapq.heappush(donors, (self._last_gain(i), i, self.units[i]))
+
+        def top(heap):
+            # 懒删除：单位数已变化的条目作废
+            while heap and heap[0][2] != self.units[heap[0][1]]:
+                heapq.heappop(heap)
+            return heap[0] if heap else None
+
+        while True:
+            taker = top(takers)
+            if taker is None:
+                break
+            t = taker[1]
+            if self.free_units > 0:
+                heapq.heappop(takers)
+                self.units[t] += 1
+                self.free_units -= 1
+                push(t)
+                continue
+
+            donor = top(donors)
+            # 凹性保证同一项目的下一单位不会比上一单位更值，t == d 时已是最优
+            if donor is None or donor[1] == t or -taker[0] <= donor[0] + 1e-12:
+                break
+            d = donor[1]
+            heapq.heappop(takers)
+            heapq.heappop(donors)
+            self.units[t] += 1
+            self.units[d] -= 1
+            push(t)
+            push(d)
+
+    # ------------------------------------------------------------------
+    # 结果
+    # ------------------------------------------------------------------
+
+    def utility(self) -> float:
+        return sum(w * self._g(u * self.step) for w, u in zip(self.weights, self.units))
+
+    def plan(self) -> List[Dict]:
+        """分配方案（按分配分数从高到低），可直接写入Excel"""
+        low, high = self.preferred_range
+        rows = []
+        for project, weight, units in zip(self.projects, self.weights, self.units):
+            points = units * self.step
+            rows.append({
+                "项目编号": project.get("项目编号", ""),
+                "项目名称": project.get("项目名称", ""),
+                "适配星级": project.get("适配星级", ""),
+                "分配分数": points,
+                "偏好区间": "是" if low <= points <= high else "",
+                "权重": weight,
+            })
+        rows.sort(key=lambda row: (-row["分配分数"], -row["权重"]))
+        return rows
+
+    def summary(self) -> Dict:
+        return {
+            "总分": self.total_units * self.step,
+            "已分配": sum(self.units) * self.step,
+            "bid项目数": sum(1 for u in self.units if u > 0),
+            "期望收益": round(self.utility(), 4),
+        }
+
+
+def solve_dp(weights: List[float], optimizer: BidOptimizer) -> tuple:
+    """
+    分组背包 DP 参考解：状态 (已 bid 项目数, 已用单位数)，每个项目选 0..max_units 个单位
+    复杂度 O(N · K · B · L)，只用于小规模校验
+    返回 (最优收益, 每个项目的单位数)
+    """
+    n = len(weights)
+    required = min(optimizer.min_projects, n)
+    budget = optimizer.total_units
+    value = [optimizer._g(u * optimizer.step) for u in range(optimizer.max_units + 1)]
+    neg = float('-inf')
+
+    # dp[k][c]：k 为已 bid 项目数（封顶 required），c 为已用单位
+    dp = [[neg] * (budget + 1) for _ in range(required + 1)]
+    dp[0][0] = 0.0
+    choices = []
+    for w in weights:
+        new = [[neg] * (budget + 1) for _ in range(required + 1)]
+        choice = [[None] * (budget + 1) for _ in range(required + 1)]
+        for k in range(required + 1):
+            for c in range(budget + 1):
+                base = dp[k][c]
+                if base == neg:
+                    continue
+                for u in range(min(optimizer.max_units, budget - c) + 1):
+                    nk = min(required, k + (1 if u else 0))
+                    cand = base + w * value[u]
+                    if cand > new[nk][c + u]:
+                        new[nk][c + u] = cand
+                        choice[nk][c + u] = (k, c, u)
+        dp = new
+        choices.append(choice)
+
+    best_c = max(range(budget + 1), key=lambda c: dp[required][c])
+    best = dp[required][best_c]
+    units = [0] * n
+    k, c = required, best_c
+    for i in range(n - 1, -1, -1):
+        k, c, units[i] = choices[i][k][c]
+    return best, units
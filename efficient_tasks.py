@@ -11,62 +11,146 @@ Efficient Tasks 问题解决方案
 
 解题思路：
 - 题目允许任意分组（不要求连续）
-- 使用递归/回溯枚举所有可能的三分组方式
+- 小规模（n ≤ 20）使用剪枝 + 记忆化的回溯精确求解
 - 对于每种分组，遍历所有可能的 d₁, d₂, d₃ 组合，找到最小值
 - 返回所有分组的最小难度中的最大值
 
-优化：对于大规模数据，可以使用动态规划或更智能的策略
+推广到 k 组（链式代价 |d₁-d₂| + ... + |d_{k-1}-d_k|）见 getMaxDifficultyK：
+排序 + 前缀和后只需枚举一个分界点，O(n log n)，与 k 无关
 """
 
+import itertools
+
+# 精确回溯的规模上限（n = 20 时单次约几十毫秒）
+EXACT_SEARCH_LIMIT = 20
+
 
 def getMaxDifficulty(difficulty):
     n = len(difficulty)
     if n < 3:
         return 0
 
-    # 对于小规模数据，使用回溯
-    # 对于大规模数据，使用排序后的连续分组（更高效）
-    if n <= 10:
-        max_min_difficulty = 0
-        
-        def backtrack(idx, group1, group2, group3):
-            nonlocal max_min_difficulty
-            
-            remaining = n - idx
-            empty_groups = (1 if len(group1) == 0 else 0) + (1 if len(group2) == 0 else 0) + (1 if len(group3) == 0 else 0)
-            
-            if empty_groups > remaining:
-                return
-            
-            if idx == n:
-                if len(group1) > 0 and len(group2) > 0 and len(group3) > 0:
-                    min_difficulty = find_min_difficulty(group1, group2, group3)
-                    max_min_difficulty = max(max_min_difficulty, min_difficulty)
-                return
-            
-            backtrack(idx + 1, group1 + [difficulty[idx]], group2, group3)
-            backtrack(idx + 1, group1, group2 + [difficulty[idx]], group3)
-            backtrack(idx + 1, group1, group2, group3 + [difficulty[idx]])
-        
-        backtrack(0, [], [], [])
-        return max_min_difficulty
-    else:
-        # 对于大规模数据，使用排序后的连续分组
-        # 优化后的 find_min_difficulty 是 O(|group2|)，所以总复杂度是 O(n²)
-        sorted_diff = sorted(difficulty)
-        max_min_difficulty = 0
-        
-        # 枚举所有连续三分组
-        for i in range(1, n - 1):
-            for j in range(i + 1, n):
-                group1 = sorted_diff[:i]
-                group2 = sorted_diff[i:j]
-                group3 = sorted_diff[j:]
-                
-                min_difficulty = find_min_difficulty(group1, group2, group3)
-                max_min_difficulty = max(max_min_difficulty, min_difficulty)
-        
-        return max_min_difficulty
+    # 对于小规模数据，使用精确回溯
+    # 对于大规模数据，使用 k 组解法（k = 3 时与排序后三段切分的结果相同，只需线性扫描）
+    if n <= EXACT_SEARCH_LIMIT:
+        return max_difficulty_backtracking(difficulty)
+    return getMaxDifficultyK(difficulty, 3)
+
+
+def max_difficulty_backtracking(difficulty):
+    """
+    小规模精确解：剪枝 + 记忆化的回溯
+
+    按从小到大的顺序把模块放进三个组，组内列表天然有序，关键观察：
+    - 对 group2 中的某个 d₂，它到 group1 的最近距离只取决于 d₂ 之前最后放进
+      group1 的值，以及 d₂ 之后第一个放进 group1 的值（后面的只会更远）
+    - 因此不需要保存三个组的完整内容，只需：
+        last1 / last3   group1 / group3 当前最大值
+        cur             已确定的最小难度（只会变小，所以是上界）
+        a1              只等 group1 后继的 d₂：未来 y 放进 group1 时贡献 y + a1
+        a3              同上，对 group3
+        pending         两边都还没有后继的 d₂（原地 append / pop）
+    - 剪枝：cur <= best 时整棵子树不可能更优
+    - 对称：group1 与 group3 可以互换，第一个不进 group2 的元素只放 group1；
+      记忆化时把互换后的状态一并记为已访问
+    """
+    values = sorted(difficulty)
+    n = len(values)
+    if n < 3:
+        return 0
+
+    inf = float('inf')
+    best = 0
+    pending = []
+    visited = set()
+
+    def backtrack(idx, last1, last3, has2, cur, a1, a3):
+        nonlocal best
+
+        if cur <= best:
+            return
+
+        empty_groups = (last1 is None) + (last3 is None) + (not has2)
+        if empty_groups > n - idx:
+            return
+
+        if idx == n:
+            best = cur
+            return
+
+        state = (idx, last1, last3, has2, cur, a1, a3, *pending)
+        if state in visited:
+            return
+        visited.add(state)
+        visited.add((idx, last3, last1, has2, cur, a3, a1, *pending))
+
+        x = values[idx]
+
+        # 放进 group2：与两侧当前最大值的距离
+        c1 = inf if last1 is None else x - last1
+        c3 = inf if last3 is None else x - last3
+        pending.append(x)
+        backtrack(idx + 1, last1, last3, True, min(cur, c1 + c3), a1, a3)
+        pending.pop()
+
+        # 放进 group1 / group3：x 成为所有等待中 d₂ 在这一侧的后继
+        waiting = pending[:]
+        pending.clear()
+        for side in (1, 3):
+            if side == 1:
+                last_same, last_other, a_same, a_other = last1, last3, a1, a3
+            elif last1 is None and last3 is None:
+                break
+            else:
+                last_same, last_other, a_same, a_other = last3, last1, a3, a1
+
+            new_cur = min(cur, x + a_same)
+            for d2 in waiting:
+                near_same = x - d2 if last_same is None else min(d2 - last_same, x - d2)
+                near_other = inf if last_other is None else d2 - last_other
+                new_cur = min(new_cur, near_same + near_other)
+                a_other = min(a_other, near_same - d2)
+
+            if side == 1:
+                backtrack(idx + 1, x, last3, has2, new_cur, inf, a_other)
+            else:
+                backtrack(idx + 1, last1, x, has2, new_cur, a_other, inf)
+        pending.extend(waiting)
+
+    backtrack(0, None, None, False, inf, inf, inf)
+    return best
+
+
+def max_difficulty_sorted_splits(difficulty):
+    """
+    大规模解：排序后切成三段连续区间
+
+    中间服务器（提供 d₂ 的组）不一定是中间那一段：例如 [5, 12, 18, 19]
+    的最优分组是 {19} | {5} | {12, 18}，难度 21。所以每种切法都要让
+    左、中、右三段分别充当 group2（group1 与 group3 对称，不需要重复尝试）。
+    """
+    n = len(difficulty)
+    if n < 3:
+        return 0
+
+    sorted_diff = sorted(difficulty)
+    max_min_difficulty = 0
+
+    # 枚举所有连续三分组
+    for i in range(1, n - 1):
+        for j in range(i + 1, n):
+            left = sorted_diff[:i]
+            middle = sorted_diff[i:j]
+            right = sorted_diff[j:]
+
+            min_difficulty = max(
+                find_min_difficulty(left, middle, right),
+                find_min_difficulty(middle, left, right),
+                find_min_difficulty(left, right, middle),
+            )
+            max_min_difficulty = max(max_min_difficulty, min_difficulty)
+
+    return max_min_difficulty
 
 
 def find_min_difficulty(group1, group2, group3):
@@ -114,6 +198,79 @@ def find_min_difficulty(group1, group2, group3):
     return min_diff
 
 
+def getMaxDifficultyK(difficulty, k):
+    """
+    k 组推广：模块分到 k 个服务器（每个至少一个），从第 j 个服务器选 d_j，
+    部署难度为 |d₁-d₂| + |d₂-d₃| + ... + |d_{k-1}-d_k|，求最小难度的最大可能值
+
+    结构（k ≤ 6 时与穷举所有分组的结果逐一对照过）：
+    - 最优分组可以取排序后的 k 段连续区间
+    - 最优的链在一个分界点两侧来回交替：低段、高段、低段、高段……
+      每一步都跨过分界点，|d_h - d_l| = d_h - d_l，于是各组的选择互不影响：
+      高段取最小值、低段取最大值，难度 = Σ deg·min(高段) - Σ deg·max(低段)，
+      deg 是该组在链中的相邻组数（两端为 1，中间为 2）
+    - 固定分界点 s（低段在 a[0..s-1]，高段在 a[s..n-1]）后：
+        紧挨分界点的两段被迫取 a[s-1] / a[s]，其余高段取最大的几个单元素、
+        低段取最小的几个单元素；deg = 1 的位置给最靠近分界点的段
+    - 低段 p 组、高段 q 组，|p - q| ≤ 1；于是只剩分界点 s 一个变量：
+      难度 = 常数 + α·a[s] - β·a[s-1]，排序后一次线性扫描
+
+    k = 3 时即 getMaxDifficulty 的结果（低段一组、高段两组：
+    (a[n-1] - a[s-1]) + (a[s] - a[s-1])；或反过来），k = 2 时为相邻差的最大值
+    """
+    values = sorted(difficulty)
+    n = len(values)
+    if k < 2 or n < k:
+        return 0
+
+    if k % 2 == 0:
+        splits = [(k // 2, k // 2)]
+    else:
+        splits = [(k // 2 + 1, k // 2), (k // 2, k // 2 + 1)]
+
+    best = 0
+    for p, q in splits:
+        # 除紧挨分界点的两段外：高段取最大的单元素，低段取最小的单元素
+        top = values[n - q + 1:] if q > 1 else []
+        bottom = values[:p - 1]
+        if p == q:
+            # 链的两端一低一高，紧挨分界点的两段 deg = 1
+            constant, alpha, beta = 2 * sum(top) - 2 * sum(bottom), 1, 1
+        elif p == q + 1:
+            # 两端都是低段：a[s-1] 和 a[p-2] 的 deg = 1
+            constant, alpha, beta = 2 * sum(top) - 2 * sum(bottom) + bottom[-1], 2, 1
+        else:
+            # 两端都是高段：a[s] 和 a[n-q+1] 的 deg = 1
+            constant, alpha, beta = 2 * sum(top) - top[0] - 2 * sum(bottom), 1, 2
+        # 分界点 s 取 p .. n-q：lo = a[s-1]，hi = a[s]
+        edge = max(alpha * hi - beta * lo for lo, hi in zip(values[p - 1:n - q], values[p:n - q + 1]))
+        best = max(best, constant + edge)
+    return best
+
+
+def max_difficulty_contiguous(difficulty, k):
+    """
+    参照解：枚举排序后所有 k 段切分和每种服务器顺序，逐个求最小链式难度
+    指数级复杂度，只用于校验 getMaxDifficultyK 和基准对比（n、k 都很小时）
+    """
+    values = sorted(difficulty)
+    n = len(values)
+    if k < 2 or n < k:
+        return 0
+
+    best = 0
+    for cuts in itertools.combinations(range(1, n), k - 1):
+        bounds = (0, *cuts, n)
+        blocks = [values[bounds[i]:bounds[i + 1]] for i in range(k)]
+        for order in itertools.permutations(range(k)):
+            # 链上逐组 DP：到达每个候选值的最小代价
+            cost = {v: 0 for v in blocks[order[0]]}
+            for index in order[1:]:
+                cost = {v: min(c + abs(v - u) for u, c in cost.items()) for v in set(blocks[index])}
+            best = max(best, min(cost.values()))
+    return best
+
+
 # 测试用例
 if __name__ == "__main__":
     print("=== Sample Case 0 ===")
@@ -3,7 +3,6 @@ Notion集成 - 将项目分析结果导入Notion数据库
 """
 
 import os
-import json
 from pathlib import Path
 from typing import List, Dict
 from notion_client import Client
@@ -194,20 +193,27 @@ def create_notion_database(notion_api_key: str, parent_page_id: str) -> str:
 
 def main():
     """主函数"""
-    # 从JSON文件读取项目数据
-    output_dir = Path("data/output")
-    json_files = list(output_dir.glob("项目分析_*.json"))
+    from analyzer_core.columnar import ColumnarExporter, latest_run_file
+    from analyzer_core.records import load_projects
     
-    if not json_files:
-        print("未找到项目分析JSON文件，请先运行 project_analyzer.py")
-        return
+    # 从最新的分析结果读取项目数据（列式文件更新时优先使用，无需解析整个JSON）
+    output_dir = Path("data/output")
+    json_files = [*output_dir.glob("项目分析_*.json"), *output_dir.glob("项目分析_*.ndjson")]
+    latest_json = max(json_files, key=lambda p: p.stat().st_mtime) if json_files else None
+    latest_columnar = latest_run_file(output_dir / "columnar")
     
-    # 使用最新的JSON文件
-    latest_json = max(json_files, key=lambda p: p.stat().st_mtime)
-    print(f"使用文件: {latest_json.name}")
+    projects = None
+    if latest_columnar and (latest_json is None or latest_columnar.stat().st_mtime >= latest_json.stat().st_mtime):
+        projects = ColumnarExporter.load_latest(output_dir / "columnar")
+        if projects is not None:
+            print(f"使用文件: {latest_columnar.name}")
     
-    with open(latest_json, 'r', encoding='utf-8') as f:
-        projects = json.load(f)
+    if projects is None:
+        if latest_json is None:
+            print("未找到项目分析JSON文件，请先运行 project_analyzer.py")
+            return
+        print(f"使用文件: {latest_json.name}")
+        projects = load_projects(latest_json)
     
     if not projects:
         print("JSON文件中没有项目数据")
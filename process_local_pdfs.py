@@ -6,7 +6,6 @@ import shutil
 from pathlib import Path
 from project_analyzer_local import PDFExtractor, ExcelExporter, OUTPUT_DIR, TEXTS_DIR
 import json
-import pandas as pd
 
 # 源目录和目标目录
 SOURCE_DIR = Path(r"E:\备份资料\IEOR 4524 Spring 2026-20251227T052940Z-3-001\IEOR 4524 Spring 2026")
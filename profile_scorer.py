@@ -0,0 +1,230 @@
+"""
+基于用户配置的本地规则评分 - 与 analyze_with_profile.js 的规则保持一致
+无需调用任何API，根据 user_profile.json 给项目打适配星级和建议bidding分数
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from bid_optimizer import BidOptimizer
+
+USER_PROFILE_FILE = Path("user_profile.json")
+TEXTS_DIR = Path("data/project_texts")
+
+# 与 analyze_with_profile.js 中 inferIndustry 的关键词表一致（顺序即优先级）
+INDUSTRY_KEYWORDS = {
+    '金融': ['finance', 'financial', 'investment', 'banking', 'capital', 'equity', 'trading', 'mortgage', 'fintech'],
+    '房地产': ['real estate', 'property', 'reit', 'housing', 'apartment'],
+    '医疗': ['healthcare', 'medical', 'hospital', 'clinical', 'pharmaceutical', 'health'],
+    '零售': ['retail', 'restaurant', 'merchant', 'pos'],
+    '科技': ['tech', 'software', 'ai', 'ml', 'data science'],
+    '咨询': ['consulting', 'advisory'],
+}
+
+FINANCE_KEYWORDS = ['finance', 'financial', 'investment', 'equity', 'trading', 'portfolio', 'risk']
+ADVANCED_ML_KEYWORDS = ['deep learning', 'neural network', 'computer vision']
+
+# 从 interests 中拆关键词时忽略的词
+INTEREST_STOPWORDS = {'project', 'projects', 'related', 'and', 'the', 'for', 'with'}
+
+STARS = ['⭐', '⭐⭐', '⭐⭐⭐', '⭐⭐⭐⭐', '⭐⭐⭐⭐⭐']
+
+# 星级 -> (建议分数区间, 理由)，与 calculateBiddingScore 一致
+BIDDING_BY_STARS = {
+    5: ('550-600分', '完美匹配！强烈建议最高分bid'),
+    4: ('300-450分', '高度匹配，建议高分bid'),
+    3: ('100-200分', '中等匹配，可以考虑'),
+}
+DEFAULT_BIDDING = ('50-80分', '如果必须bid 20个项目，可以作为备选')
+
+
+def load_user_profile(profile_path: Path = USER_PROFILE_FILE) -> Dict:
+    """加载用户配置文件，不存在时返回空字典"""
+    if profile_path.exists():
+        try:
+            with open(profile_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"警告: 用户配置读取失败 - {str(e)}")
+    return {}
+
+
+def _interest_keywords(interests: List[str]) -> List[str]:
+    words = []
+    for interest in interests:
+        for word in interest.lower().replace('-', ' ').split():
+            if len(word) >= 3 and word not in INTEREST_STOPWORDS:
+                words.append(word)
+    return words
+
+
+class ProfileScorer:
+    """
+    根据用户配置给项目文本打分
+
+    规则在构造时编译一次：所有规则用到的关键词去重后编号，每条规则记录
+    自己关心的关键词位掩码。评分时每篇文档只 lower() 一次，每个关键词
+    只查找一次，得到命中位掩码，之后所有规则都只做位运算。
+    （CPython 中逐个关键词做子串查找比把几十个关键词拼成一个正则更快，
+    且保持与 JS 版 text.includes(kw) 完全相同的子串语义）
+
+    默认只用与 analyze_with_profile.js 的 calculateSuitability 相同的四条规则，结果与 JS 版一致。
+    extra_rules=True 时再加两条 JS 版没有的规则：命中 avoid_industries 扣 2 分，
+    命中 interests 中的词加 1 分（"analysis"、"management" 这类泛泛的词会给大多数项目加分）。
+    """
+
+    def __init__(self, profile: Dict, extra_rules: bool = False):
+        self.profile = profile or {}
+        preferences = self.profile.get('preferences', {})
+        background = self.profile.get('background', {})
+
+        self._keywords: List[str] = []
+        self._index: Dict[str, int] = {}
+
+        # (位掩码, 分值, 理由)，按 JS 版理由的顺序排列
+        self._rules = []
+        preferred = [ind.lower() for ind in preferences.get('preferred_industries', [])]
+        self._add_rule(preferred, 2, '行业匹配你的兴趣')
+        self._add_rule(FINANCE_KEYWORDS, 2, '涉及金融/投资分析')
+        skills = [skill.lower() for skill in background.get('technical_skills', {}).get('programming', [])]
+        self._add_rule(skills, 1, '技能要求匹配')
+        if preferences.get('skill_level', {}).get('ml') == 'basic':
+            self._add_rule(ADVANCED_ML_KEYWORDS, -1, '需要高级ML技能，可能超出你的基础')
+        if extra_rules:
+            avoided = [ind.lower() for ind in preferences.get('avoid_industries', [])]
+            self._add_rule(avoided, -2, '行业属于你希望避开的方向')
+            self._add_rule(_interest_keywords(background.get('interests', [])), 1, '符合你的兴趣方向')
+
+        self._industries = [(industry, self._mask(keywords))
+                            for industry, keywords in INDUSTRY_KEYWORDS.items()]
+
+    @classmethod
+    def from_file(cls, profile_path: Path = USER_PROFILE_FILE,
+                  extra_rules: bool = False) -> Optional['ProfileScorer']:
+        """从 user_profile.json 创建，文件不存在时返回 None"""
+        profile = load_user_profile(profile_path)
+        return cls(profile, extra_rules) if profile else None
+
+    def _mask(self, keywords: List[str]) -> int:
+        mask = 0
+        for keyword in keywords:
+            if not keyword:
+                continue
+            if keyword not in self._index:
+                self._index[keyword] = len(self._keywords)
+                self._keywords.append(keyword)
+            mask |= 1 << self._index[keyword]
+        return mask
+
+    def _add_rule(self, keywords: List[str], points: int, reason: str):
+        mask = self._mask(keywords)
+        if mask:
+            self._rules.append((mask, points, reason))
+
+    def match(self, text: str) -> int:
+        """返回文本命中的关键词位掩码"""
+        text = text.lower()
+        hits = 0
+        for bit, keyword in enumerate(self._keywords):
+            if keyword in text:
+                hits |= 1 << bit
+        return hits
+
+    def infer_industry(self, text: str, hits: int = None) -> str:
+        """按关键词表推测行业"""
+        if hits is None:
+            hits = self.match(text)
+        for industry, mask in self._industries:
+            if hits & mask:
+                return industry
+        return '其他'
+
+    def score(self, text: str) -> Dict:
+        """给单篇文本打分，返回可直接合并进项目字典的字段"""
+        hits = self.match(text)
+        points = 0
+        reasons = []
+        for mask, rule_points, reason in self._rules:
+            if hits & mask:
+                points += rule_points
+                reasons.append(reason)
+
+        stars = max(1, min(5, points + 1))
+        bid_score, bid_reason = BIDDING_BY_STARS.get(stars, DEFAULT_BIDDING)
+        return {
+            "适配得分": points,
+            "适配星级": STARS[stars - 1],
+            "适配理由": '。'.join(reasons) if reasons else '一般匹配',
+            "建议bidding分数": bid_score,
+            "bidding理由": bid_reason,
+        }
+
+    def score_project(self, project: Dict) -> Dict:
+        """
+        给已提取的项目信息打分（没有原文时，用各字段拼接的文本）
+        已经有适配星级的项目原样返回
+        """
+        if "适配星级" in project:
+            return project
+        text = "\n".join(str(value) for value in project.values())
+        scored = dict(project)
+        scored.update(self.score(text))
+        return scored
+
+
+def score_extracted_texts(scorer: ProfileScorer, texts_dir: Path = TEXTS_DIR) -> List[Dict]:
+    """给 data/project_texts 下所有已提取的文本打分"""
+    results = []
+    for text_file in sorted(texts_dir.glob("*.txt")):
+        with open(text_file, 'r', encoding='utf-8') as f:
+            text = f.read()
+        hits = scorer.match(text)
+        row = {
+            "项目编号": text_file.stem,
+            "所处行业": scorer.infer_industry(text, hits),
+        }
+        row.update(scorer.score(text))
+        row["源文件"] = f"{text_file.stem}.pdf"
+        results.append(row)
+    return results
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("项目适配度评分 - 本地规则版本（无需API）")
+    print("=" * 60)
+
+    scorer = ProfileScorer.from_file()
+    if scorer is None:
+        print("\n错误: 找不到用户配置文件 user_profile.json")
+        print("请先复制 user_profile.example.json 为 user_profile.json 并填写你的信息")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    results = score_extracted_texts(scorer)
+    elapsed = time.perf_counter() - start
+
+    if not results:
+        print("\n未找到文本文件，请先运行: python project_analyzer_local.py --extract")
+        return
+
+    for row in results:
+        print(f"  {row['项目编号']}: {row['适配星级']} - {row['建议bidding分数']}")
+    print(f"\n✓ 共评分 {len(results)} 个项目，用时 {elapsed * 1000:.1f} ms")
+
+    optimizer = BidOptimizer.from_profile(scorer.profile)
+    bid_plan = optimizer.solve(results)
+    summary = optimizer.summary()
+    print(f"✓ Bidding方案: {summary['bid项目数']} 个项目，共 {summary['已分配']}/{summary['总分']} 分")
+
+    from analyzer_core import ExcelExporter, OUTPUT_DIR
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    ExcelExporter.export_to_excel(results, OUTPUT_DIR / f"项目适配评分_{timestamp}.xlsx", bid_plan=bid_plan)
+
+
+if __name__ == "__main__":
+    main()
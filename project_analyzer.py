@@ -3,299 +3,101 @@
 """
 
 import os
+import sys
 import json
-import re
-import requests
+import time
 from pathlib import Path
 from typing import List, Dict, Optional
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.utils import get_column_letter
-import pandas as pd
-import openai
-from dotenv import load_dotenv
+from analyzer_core import (
+    PROJECTS_DIR,
+    OUTPUT_DIR,
+    GoogleDriveDownloader,
+    PDFExtractor,
+    ExcelExporter,
+)
 
-load_dotenv()
 
-# 配置
-PROJECTS_DIR = Path("data/projects")
-PROJECTS_DIR.mkdir(parents=True, exist_ok=True)
-OUTPUT_DIR = Path("data/output")
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
-# OpenAI配置
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    print("警告: 未找到OPENAI_API_KEY环境变量，请设置后使用AI提取功能")
-
-class GoogleDriveDownloader:
-    """从Google Drive共享链接下载PDF文件"""
-    
-    @staticmethod
-    def extract_file_id(share_link: str) -> Optional[str]:
-        """从Google Drive共享链接中提取文件ID"""
-        patterns = [
-            r'/file/d/([a-zA-Z0-9_-]+)',
-            r'id=([a-zA-Z0-9_-]+)',
-            r'/([a-zA-Z0-9_-]{25,})',  # Google Drive文件ID通常是25+字符
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, share_link)
-            if match:
-                return match.group(1)
-        return None
-    
-    @staticmethod
-    def download_file(file_id: str, output_path: Path, filename: str = None) -> bool:
-        """下载Google Drive文件"""
-        # 使用export格式下载（适用于PDF）
-        download_url = f"https://drive.google.com/uc?export=download&id={file_id}"
-        
-        try:
-            # 首先获取确认页面（大文件需要确认）
-            session = requests.Session()
-            response = session.get(f"https://drive.google.com/uc?id={file_id}", stream=True)
-            
-            # 检查是否需要确认
-            if 'download_warning' in response.url or 'confirm' in response.url:
-                # 提取确认token
-                confirm_match = re.search(r'confirm=([^&]+)', response.url)
-                if confirm_match:
-                    confirm_token = confirm_match.group(1)
-                    download_url = f"https://drive.google.com/uc?export=download&id={file_id}&confirm={confirm_token}"
-                    response = session.get(download_url, stream=True)
-            
-            # 如果响应是HTML（错误页面），尝试直接下载
-            if response.headers.get('Content-Type', '').startswith('text/html'):
-                # 尝试使用不同的下载方式
-                download_url = f"https://drive.google.com/uc?export=download&id={file_id}"
-                response = requests.get(download_url, stream=True, allow_redirects=True)
-            
-            if response.status_code == 200:
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(output_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                print(f"✓ 下载成功: {output_path.name}")
-                return True
-            else:
-                print(f"✗ 下载失败: {response.status_code} - {output_path.name}")
-                return False
-                
-        except Exception as e:
-            print(f"✗ 下载错误: {output_path.name} - {str(e)}")
-            return False
-    
-    @staticmethod
-    def download_from_folder_link(folder_link: str, output_dir: Path) -> List[str]:
-        """从Google Drive文件夹链接下载所有PDF文件"""
-        # 注意：这需要Google Drive API，或者手动提供文件列表
-        # 这里提供一个简化的方法：从文件夹页面提取文件ID
-        print("提示: 文件夹批量下载需要Google Drive API或手动提供文件链接列表")
-        return []
-
-
-class PDFExtractor:
-    """提取PDF文本内容"""
-    
-    @staticmethod
-    def extract_text(pdf_path: Path) -> str:
-        """从PDF文件中提取文本"""
-        try:
-            # 使用PyPDF2或pdfplumber作为替代
-            # 这里先尝试使用PyPDF2
-            try:
-                import PyPDF2
-                with open(pdf_path, 'rb') as f:
-                    pdf_reader = PyPDF2.PdfReader(f)
-                    text = ""
-                    for page in pdf_reader.pages:
-                        text += page.extract_text() + "\n"
-                return text
-            except ImportError:
-                # 如果PyPDF2不可用，尝试pdfplumber
-                try:
-                    import pdfplumber
-                    text = ""
-                    with pdfplumber.open(pdf_path) as pdf:
-                        for page in pdf.pages:
-                            text += page.extract_text() + "\n"
-                    return text
-                except ImportError:
-                    print("错误: 需要安装 PyPDF2 或 pdfplumber")
-                    return ""
-        except Exception as e:
-            print(f"✗ PDF解析错误: {pdf_path.name} - {str(e)}")
-            return ""
+def _openai_api_key() -> Optional[str]:
+    """OpenAI配置：读取 OPENAI_API_KEY，.env 在第一次用到时才加载（不拖慢启动）"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+    return os.getenv("OPENAI_API_KEY")
 
 
 class AIInfoExtractor:
-    """使用AI提取项目关键信息"""
+    """使用AI提取项目关键信息（模型后端由配置中的 llm_backend 决定，默认 OpenAI）"""
     
-    def __init__(self, api_key: str = None):
-        self.api_key = api_key or OPENAI_API_KEY
-        if not self.api_key:
-            raise ValueError("需要设置OPENAI_API_KEY")
-        openai.api_key = self.api_key
+    def __init__(self, api_key: str = None, backend=None):
+        """backend: analyzer_core.backends.LLMBackend，默认按配置创建"""
+        from analyzer_core.ai import ProjectInfoExtractor
+        from analyzer_core.backends import create_backend
+        from analyzer_core.chunking import CHUNK_CACHE, ChunkCache
+        from analyzer_core.usage import UsageMeter
+        config = load_config()
+        if backend is None:
+            backend = create_backend(config, api_key or _openai_api_key())
+        self.backend = backend
+        # 长文档按章节分块提取，块结果跨运行缓存
+        self.chunk_cache = ChunkCache(CHUNK_CACHE)
+        # 按文件记录 token 用量，超出 max_tokens_per_run / max_requests_per_run 时停止
+        self.config = config
+        self.meter = UsageMeter.from_config(config)
+        self.extractor = ProjectInfoExtractor(backend, cache=self.chunk_cache,
+                                              long_document_mode=config.get("long_document_mode", "map_reduce"),
+                                              meter=self.meter)
     
     def extract_project_info(self, pdf_text: str, filename: str) -> Dict:
-        """使用AI提取项目信息"""
-        
-        # 限制文本长度
-        max_length = 8000
-        if len(pdf_text) > max_length:
-            pdf_text = pdf_text[:max_length] + "...[文本已截断]"
-        
-        prompt = f"""请从以下项目文档中提取关键信息。文档内容：
-
-{pdf_text}
-
-请提取以下信息，并以JSON格式返回：
-{{
-  "项目名称": "项目标题或名称",
-  "所处行业": "如：金融、医疗、教育、科技、零售等",
-  "应用场景": "项目的具体应用场景和用途，详细描述",
-  "公司用心程度": "根据文档的详细程度、完整性、专业性评分，1-10分，并说明理由",
-  "预期成果": "项目预期交付的成果或产出",
-  "项目编号": "如果有项目编号或ID",
-  "公司名称": "合作公司或组织名称",
-  "技能要求": "所需技能和技术栈",
-  "项目描述摘要": "项目简要描述（100字以内）"
-}}
-
-只返回JSON，不要其他文字。"""
-        
+        """
+        使用AI提取项目信息
+        项目编号、名称等能从标签行可靠取到的字段先在本地提取，只让模型提取其余字段；
+        回复中有噪声或被截断时尽量修复；仍缺字段时只补问缺失的字段（更短的提示词）
+        超长文档按章节分块提取再合并，不再截断
+        """
+        return self.extract_batch([(pdf_text, filename)])[0]
+    
+    def extract_batch(self, documents: List[tuple]) -> List[Dict]:
+        """一批 (文本, 文件名) 一起提取，后端可以并发或合批处理"""
         try:
-            # 使用OpenAI API
-            response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",  # 或使用 "gpt-4" 获得更好效果
-                messages=[
-                    {"role": "system", "content": "你是一个专业的项目分析助手，擅长从项目文档中提取结构化信息。请只返回JSON格式，不要添加任何解释文字。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=1000
-            )
-            
-            result_text = response.choices[0].message.content.strip()
-            
-            # 尝试解析JSON
-            # 移除可能的markdown代码块标记
-            if result_text.startswith("```json"):
-                result_text = result_text[7:]
-            if result_text.startswith("```"):
-                result_text = result_text[3:]
-            if result_text.endswith("```"):
-                result_text = result_text[:-3]
-            result_text = result_text.strip()
-            
-            info = json.loads(result_text)
-            info["源文件"] = filename
-            return info
-            
-        except json.JSONDecodeError as e:
-            print(f"✗ JSON解析错误: {filename}")
-            print(f"AI返回内容: {result_text[:200]}")
-            return {
-                "项目名称": "解析失败",
-                "所处行业": "未知",
-                "应用场景": "无法提取",
-                "公司用心程度": "0 - JSON解析失败",
-                "预期成果": "无法提取",
-                "源文件": filename
-            }
-        except Exception as e:
-            print(f"✗ AI提取错误: {filename} - {str(e)}")
-            return {
-                "项目名称": "提取失败",
-                "所处行业": "未知",
-                "应用场景": "无法提取",
-                "公司用心程度": "0 - 提取失败",
-                "预期成果": "无法提取",
-                "源文件": filename
-            }
-
-
-class ExcelExporter:
-    """导出数据到Excel"""
+            return self.extractor.extract_batch(documents)
+        finally:
+            self.chunk_cache.save()
     
-    @staticmethod
-    def export_to_excel(projects: List[Dict], output_path: Path):
-        """导出项目数据到Excel文件"""
-        df = pd.DataFrame(projects)
-        
-        # 重新排列列的顺序，重要信息在前
-        column_order = [
-            "项目编号", "项目名称", "公司名称", "所处行业", 
-            "应用场景", "公司用心程度", "预期成果", 
-            "技能要求", "项目描述摘要", "源文件"
-        ]
-        
-        # 只保留存在的列
-        existing_columns = [col for col in column_order if col in df.columns]
-        other_columns = [col for col in df.columns if col not in column_order]
-        df = df[existing_columns + other_columns]
-        
-        # 使用openpyxl创建格式化的Excel
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='项目分析')
-            
-            # 获取工作表
-            worksheet = writer.sheets['项目分析']
-            
-            # 设置标题行样式
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_font = Font(bold=True, color="FFFFFF", size=11)
-            
-            for cell in worksheet[1]:
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-            
-            # 自动调整列宽
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = get_column_letter(column[0].column)
-                
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                
-                # 设置列宽，但不超过50
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-            
-            # 设置行高
-            worksheet.row_dimensions[1].height = 25
-            for row in range(2, len(df) + 2):
-                worksheet.row_dimensions[row].height = 20
-            
-            # 设置文本换行
-            for row in worksheet.iter_rows(min_row=2, max_row=len(df) + 1):
-                for cell in row:
-                    cell.alignment = Alignment(vertical="top", wrap_text=True)
-        
-        print(f"✓ Excel文件已导出: {output_path}")
-        return df
+    def save_usage(self) -> Optional[Path]:
+        """打印并保存本次运行的 token 用量（按文件明细）"""
+        if not self.meter.requests:
+            return None
+        summary = self.meter.summary(self.config)
+        output_path = OUTPUT_DIR / f"token用量_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        self.meter.save(output_path, self.config)
+        estimated = "（部分为估算值）" if summary["estimated_requests"] else ""
+        print(f"✓ token用量: {summary['requests']} 次请求，输入 {summary['prompt_tokens']:,}，"
+              f"输出 {summary['completion_tokens']:,}，约 ${summary['cost_usd']:.2f}{estimated} -> {output_path}")
+        return output_path
 
 
 class ProjectAnalyzer:
     """项目分析主程序"""
     
     def __init__(self):
+        from profile_scorer import ProfileScorer
         self.downloader = GoogleDriveDownloader()
         self.extractor = PDFExtractor()
         self.ai_extractor = None
-        if OPENAI_API_KEY:
+        api_key = _openai_api_key()
+        if not api_key:
+            print("警告: 未找到OPENAI_API_KEY环境变量，请设置后使用AI提取功能（或在配置中改用本地模型后端）")
+        # 本地模型后端不需要API密钥
+        if api_key or load_config().get("llm_backend", "openai") != "openai":
             try:
-                self.ai_extractor = AIInfoExtractor()
+                self.ai_extractor = AIInfoExtractor(api_key)
             except Exception as e:
                 print(f"警告: AI提取器初始化失败 - {str(e)}")
         self.exporter = ExcelExporter()
+        # 有 user_profile.json 时用本地规则评估适配度，不再额外调用AI
+        self.scorer = ProfileScorer.from_file()
     
     def download_pdfs_from_links(self, drive_links: List[str]) -> List[Path]:
         """从Google Drive链接列表下载PDF"""
@@ -320,6 +122,7 @@ class ProjectAnalyzer:
     
     def analyze_projects(self, pdf_files: List[Path] = None) -> List[Dict]:
         """分析所有PDF项目"""
+        from analyzer_core.usage import BudgetExceeded
         if pdf_files is None:
             # 从目录中读取所有PDF
             pdf_files = list(PROJECTS_DIR.glob("*.pdf"))
@@ -329,6 +132,36 @@ class ProjectAnalyzer:
             return []
         
         projects = []
+        # 攒够一批再交给模型后端（并发请求或本地模型连续推理）
+        batch_size = int(load_config().get("llm_batch_size", 8))
+        pending = []
+        
+        budget_left = True
+        
+        def flush():
+            nonlocal budget_left
+            try:
+                infos = self.ai_extractor.extract_batch(pending)
+            except BudgetExceeded as e:
+                # 整批放不下时保留已完成（已计费）的结果，没有运行的逐个提取，用完剩余额度
+                infos = e.results or [None] * len(pending)
+                for i, document in enumerate(pending):
+                    if infos[i] is not None:
+                        continue
+                    try:
+                        infos[i] = self.ai_extractor.extract_batch([document])[0]
+                    except BudgetExceeded as e:
+                        done = len(projects) + sum(info is not None for info in infos)
+                        print(f"\n✗ {str(e)}，停止分析（已完成的 {done} 个项目照常导出）")
+                        budget_left = False
+                        break
+            done = [(document, info) for document, info in zip(pending, infos) if info is not None]
+            for (text, filename), info in done:
+                if self.scorer:
+                    info.update(self.scorer.score(text))
+                projects.append(info)
+                print(f"✓ 提取完成: {info.get('项目名称', '未知')}")
+            pending.clear()
         
         for i, pdf_file in enumerate(pdf_files, 1):
             print(f"\n[{i}/{len(pdf_files)}] 分析: {pdf_file.name}")
@@ -341,27 +174,77 @@ class ProjectAnalyzer:
             
             # AI提取信息
             if self.ai_extractor:
-                info = self.ai_extractor.extract_project_info(text, pdf_file.name)
-                projects.append(info)
-                print(f"✓ 提取完成: {info.get('项目名称', '未知')}")
+                pending.append((text, pdf_file.name))
+                if len(pending) >= batch_size:
+                    flush()
+                    if not budget_left:
+                        break
             else:
                 print("✗ AI提取器未初始化，跳过")
         
+        if pending and budget_left:
+            flush()
+        if self.ai_extractor:
+            self.ai_extractor.save_usage()
         return projects
     
+    def estimate_usage(self, pdf_files: List[Path] = None) -> Optional[Dict]:
+        """不调用API，预估分析这些PDF需要的 token、请求数、费用和耗时"""
+        from analyzer_core.usage import estimate_corpus, format_estimate
+        if pdf_files is None:
+            pdf_files = list(PROJECTS_DIR.glob("*.pdf"))
+        documents = []
+        for pdf_file in pdf_files:
+            text = self.extractor.extract_text(pdf_file)
+            if text:
+                documents.append((text, pdf_file.name))
+        if not documents:
+            print("未找到可估算的PDF文件")
+            return None
+        estimate = estimate_corpus(documents, load_config())
+        print(f"\n预估: {format_estimate(estimate)}")
+        return estimate
+    
+    def plan_bids(self, projects: List[Dict]) -> Optional[List[Dict]]:
+        """按 bidding_strategy 计算分数分配方案（需要 user_profile.json）"""
+        if not self.scorer:
+            return None
+        from bid_optimizer import BidOptimizer
+        try:
+            return BidOptimizer.from_profile(self.scorer.profile).solve(projects)
+        except ValueError as e:
+            print(f"警告: Bidding分配失败 - {str(e)}")
+            return None
+    
     def export_results(self, projects: List[Dict], format: str = "excel"):
         """导出结果"""
         if format == "excel":
-            timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
             output_path = OUTPUT_DIR / f"项目分析_{timestamp}.xlsx"
-            df = self.exporter.export_to_excel(projects, output_path)
+            df = self.exporter.export_to_excel(projects, output_path, bid_plan=self.plan_bids(projects))
             return df
         elif format == "json":
-            output_path = OUTPUT_DIR / f"项目分析_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.json"
+            run_id = time.strftime('%Y%m%d_%H%M%S')
+            output_path = OUTPUT_DIR / f"项目分析_{run_id}.json"
             with open(output_path, 'w', encoding='utf-8') as f:
                 json.dump(projects, f, ensure_ascii=False, indent=2)
             print(f"✓ JSON文件已导出: {output_path}")
+            # 同时写入历史结果库，便于跨运行查询
+            from analyzer_core import ResultsStore
+            with ResultsStore() as store:
+                store.record_run(projects, run_id, source=output_path.name)
             return projects
+        elif format == "ndjson":
+            # 每行一条记录，逐条写出，大批量结果比缩进JSON快得多
+            from analyzer_core.records import write_ndjson
+            output_path = OUTPUT_DIR / f"项目分析_{time.strftime('%Y%m%d_%H%M%S')}.ndjson"
+            write_ndjson(projects, output_path)
+            print(f"✓ NDJSON文件已导出: {output_path}")
+            return projects
+        elif format in ("parquet", "arrow"):
+            # 按运行日期分区的列式文件，供跨学期分析按列读取
+            from analyzer_core import ColumnarExporter
+            return ColumnarExporter.export(projects, format=format)
 
 
 def load_config() -> Dict:
@@ -378,6 +261,11 @@ def load_config() -> Dict:
 
 def main():
     """主函数"""
+    # 批处理子命令（download / extract / analyze / export / all）走无交互命令行
+    from analyzer_core.cli import COMMANDS, main as cli_main
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(cli_main(sys.argv[1:]))
+    
     analyzer = ProjectAnalyzer()
     config = load_config()
     
@@ -390,8 +278,9 @@ def main():
     print("1. 从Google Drive链接列表下载并分析")
     print("2. 从配置文件读取链接并分析")
     print("3. 分析本地已有的PDF文件")
+    print("4. 预估本地PDF的token用量和耗时（不调用API）")
     
-    choice = input("\n请输入选择 (1/2/3): ").strip()
+    choice = input("\n请输入选择 (1/2/3/4): ").strip()
     
     links = []
     
@@ -421,6 +310,9 @@ def main():
             return
     elif choice == "3":
         projects = analyzer.analyze_projects()
+    elif choice == "4":
+        analyzer.estimate_usage()
+        return
     else:
         print("未提供链接或选择无效")
         return
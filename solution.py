@@ -2,56 +2,211 @@
 数据重组问题 - Python 简洁解决方案
 """
 
+import random
+import sys
+import time
+from functools import lru_cache
+from operator import sub
+
+
 def getMinimumValue(data, maxOperations):
     """
     主函数：在 maxOperations 次操作后，返回数组最小元素可能的最小值
     每次操作：选择两个元素 i, j (i < j)，计算 |data[i] - data[j]|，添加到数组末尾
-    
-    关键思路：我们需要找到在恰好 maxOperations 次操作后，数组中可能达到的最小值。
-    使用 BFS 方法，每一步都考虑所有可能的操作，并追踪最小值。
+
+    关键思路：操作只会往数组里加元素，最小值不会变大，所以"恰好 k 次"等价于"至多 k 次"。
+    - 0 次操作：答案就是 min(data)
+    - 1 次操作：最小的差值一定出现在排序后的相邻元素之间
+    - 2 次操作：第二次操作要么再取一对原始元素（不比 1 次更好），
+      要么用新加入的差值 d 和某个原始元素 x 相减，得到 |d - x|；
+      对每个差值 d 在排序数组上找最接近的 x 即可（固定 i 时 d 递增，用指针扫描）
+    - 3 次及以上：任选一对 (a, b) 做两次得到两个 |a - b|，第三次相减得到 0（有负数时答案是 min(data)）
+
+    复杂度：O(n²) 时间，O(n) 额外空间
+    同一个 data 要问多个 maxOperations 时用 MinimumValueQuery，只预处理一次
     """
-    # 使用集合存储所有可能得到的值（包括原始值和新产生的差值）
-    current_set = set(data)
-    # 追踪每一步后可能达到的最小值
-    min_value = min(data)
-    
-    # 如果已经是0，直接返回
-    if min_value == 0:
-        return 0
-    
-    # 执行恰好 maxOperations 次操作
-    for op in range(maxOperations):
-        new_values = set()
-        # 将集合转为排序列表，便于计算差值
-        values = sorted(list(current_set))
-        
-        # 尝试所有可能的差值组合
-        for i in range(len(values)):
-            for j in range(i + 1, len(values)):
-                diff = abs(values[i] - values[j])
-                if diff >= 0:  # 包括0
-                    new_values.add(diff)
-                    # 更新最小值
-                    if diff < min_value:
-                        min_value = diff
-        
-        # 如果没有新值产生，无法继续优化
-        if len(new_values) == 0:
-            break
-        
-        # 合并新值到当前集合，用于下一轮操作
-        current_set.update(new_values)
-        
-        # 如果找到了0，可以提前返回
-        if min_value == 0:
-            return 0
-    
-    # 返回在恰好 maxOperations 次操作后可能达到的最小值
-    return min_value
+    return MinimumValueQuery(data).query(maxOperations)
+
+
+class MinimumValueQuery:
+    """
+    同一个 data 的多次询问：排序、相邻差最小值在构造时算好，
+    2 次操作的答案第一次用到时计算并缓存，之后任意 maxOperations 都是 O(1)
+
+        query = MinimumValueQuery(data)
+        [query.query(k) for k in (0, 1, 2, 5)]
+    """
+
+    def __init__(self, data):
+        self.values = sorted(data)
+        values = self.values
+        self.minimum = values[0]
+        # 1 次操作的答案：排序后相邻元素之差的最小值（与 min(data) 取小）
+        self.one = min(self.minimum, min(map(sub, values[1:], values[:-1]))) if len(values) > 1 else self.minimum
+        self._two = None
+
+    def query(self, maxOperations):
+        if maxOperations <= 0 or len(self.values) < 2 or self.minimum == 0:
+            return self.minimum
+        if maxOperations >= 3:
+            # 最小值不会变大：有负数时仍是 min(data)
+            return min(self.minimum, 0)
+        if maxOperations == 1 or self.one == 0:
+            return self.one
+        if self._two is None:
+            self._two = self._two_operations()
+        return self._two
+
+    __call__ = query
+
+    def answers(self):
+        """0、1、2、3 次及以上操作的答案"""
+        return tuple(self.query(k) for k in range(4))
+
+    def _two_operations(self):
+        """
+        2 次操作：对每个差值 d = v_j - v_i，找最接近的原始元素 x，取 |d - x| 的最小值
+        固定 i 时 d 随 j 递增，最接近 d 的位置 k 只会右移，用指针代替二分查找，O(n²)
+        """
+        values = self.values
+        padded = values + [float('inf')]
+        best = self.one
+        for i in range(len(values) - 1):
+            vi = values[i]
+            k = 0
+            for vj in values[i + 1:]:
+                d = vj - vi
+                while padded[k] < d:
+                    k += 1
+                if padded[k] - d < best:
+                    best = padded[k] - d
+                if k and d - padded[k - 1] < best:
+                    best = d - padded[k - 1]
+            if best == 0:
+                return 0
+        return best
+
+
+def minimum_values(datasets, maxOperations):
+    """
+    多组数据一起计算同一个 maxOperations，返回答案列表
+    0 次和 3 次以上不需要排序，整批用 map 在 C 里算完；1、2 次每组预处理一次
+    """
+    if maxOperations <= 0:
+        return list(map(min, datasets))
+    if maxOperations >= 3:
+        return [0 if len(data) > 1 else data[0] for data in datasets]
+    return [MinimumValueQuery(data).query(maxOperations) for data in datasets]
+
+
+def brute_force_minimum_value(data, maxOperations):
+    """
+    暴力参考实现：枚举所有操作序列（按多重集去重），仅用于小规模数据的交叉验证
+    """
+    @lru_cache(maxsize=None)
+    def search(state, remaining):
+        best = state[0]
+        if remaining == 0 or best == 0:
+            return best
+        for i in range(len(state)):
+            for j in range(i + 1, len(state)):
+                diff = abs(state[i] - state[j])
+                next_state = tuple(sorted(state + (diff,)))
+                best = min(best, search(next_state, remaining - 1))
+                if best == 0:
+                    return 0
+        return best
+
+    return search(tuple(sorted(data)), maxOperations)
+
+
+def cross_check(trials=2000, seed=0, max_n=6, max_value=50, max_ops=4):
+    """
+    随机生成小规模用例，比较 getMinimumValue 与暴力实现，返回不一致的用例列表
+    """
+    rng = random.Random(seed)
+    mismatches = []
+    for _ in range(trials):
+        n = rng.randint(2, max_n)
+        data = [rng.randint(1, max_value) for _ in range(n)]
+        ops = rng.randint(0, max_ops)
+        # 暴力搜索的状态数随操作次数爆炸，3 次以上只在很小的 n 上验证
+        if ops >= 3 and n > 4:
+            data = data[:4]
+        expected = brute_force_minimum_value(data, ops)
+        actual = getMinimumValue(data, ops)
+        if expected != actual:
+            mismatches.append((data, ops, expected, actual))
+    return mismatches
+
+
+def benchmark(sizes=(250, 500, 1000, 2000), max_ops=2, seed=0):
+    """
+    规模基准：对不同 n 计时，返回 [(n, 秒数), ...]
+    """
+    rng = random.Random(seed)
+    results = []
+    for n in sizes:
+        data = [rng.randint(1, 10 ** 9) for _ in range(n)]
+        start = time.perf_counter()
+        getMinimumValue(data, max_ops)
+        results.append((n, time.perf_counter() - start))
+    return results
+
+
+def batch_benchmark(n=500, queries=200, datasets=500, dataset_size=40, per_dataset=10, seed=0):
+    """
+    批量询问基准：逐次调用 getMinimumValue vs 预处理一次后询问
+    - 同一个 data（长度 n）问 queries 次随机的 maxOperations
+    - datasets 组小数据，每组问 per_dataset 次随机的 maxOperations
+    返回 [(场景, 逐次调用秒数, 预处理后秒数), ...]
+    """
+    rng = random.Random(seed)
+    data = [rng.randint(1, 10 ** 9) for _ in range(n)]
+    operations = [rng.randint(0, 4) for _ in range(queries)]
+    many = [([rng.randint(1, 10 ** 6) for _ in range(dataset_size)], [rng.randint(0, 4) for _ in range(per_dataset)])
+            for _ in range(datasets)]
+    results = []
+
+    start = time.perf_counter()
+    repeated = [getMinimumValue(data, ops) for ops in operations]
+    middle = time.perf_counter()
+    query = MinimumValueQuery(data)
+    shared = [query.query(ops) for ops in operations]
+    end = time.perf_counter()
+    assert repeated == shared
+    results.append((f"同一数据 n={n}，{queries} 次询问", middle - start, end - middle))
+
+    start = time.perf_counter()
+    repeated = [[getMinimumValue(d, ops) for ops in asked] for d, asked in many]
+    middle = time.perf_counter()
+    shared = [list(map(MinimumValueQuery(d).query, asked)) for d, asked in many]
+    end = time.perf_counter()
+    assert repeated == shared
+    results.append((f"{datasets} 组数据 n={dataset_size}，每组 {per_dataset} 次询问", middle - start, end - middle))
+    return results
 
 
 # 测试用例
 if __name__ == "__main__":
+    if "--check" in sys.argv:
+        mismatches = cross_check()
+        print(f"交叉验证: {len(mismatches)} 个不一致")
+        for data, ops, expected, actual in mismatches[:10]:
+            print(f"  data={data}, ops={ops}: 暴力={expected}, 快速={actual}")
+        sys.exit(1 if mismatches else 0)
+
+    if "--bench-batch" in sys.argv:
+        for label, repeated, shared in batch_benchmark():
+            print(f"{label}: 逐次调用 {repeated * 1000:8.1f} ms，预处理后 {shared * 1000:8.1f} ms "
+                  f"({repeated / shared:.1f}x)")
+        sys.exit(0)
+
+    if "--bench" in sys.argv:
+        for n, seconds in benchmark():
+            print(f"n={n:5d}  maxOperations=2  {seconds * 1000:8.1f} ms")
+        sys.exit(0)
+
     # Sample Case 0
     data0 = [4, 2, 5, 9, 3]
     max_ops0 = 1
@@ -0,0 +1,324 @@
+"""
+算法模块随机压力测试
+
+对 efficient_tasks.py 与 solution.py 中的快速实现，随机生成大量小规模用例，
+与暴力参考实现逐一比对：
+- 用进程池并行跑用例（每个任务只传 seed，用例在子进程里生成）
+- 发现不一致时，把用例收缩成最小反例
+- 汇总每个实现的耗时分布（均值 / p50 / p90 / p99 / 最大值）
+
+用法：
+    python stress_test.py                       # 默认每个目标 2000 个用例
+    python stress_test.py --cases 10000 --workers 8
+    python stress_test.py --targets getMinimumValue find_min_difficulty
+"""
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from efficient_tasks import (
+    EXACT_SEARCH_LIMIT,
+    getMaxDifficulty,
+    getMaxDifficultyK,
+    find_min_difficulty,
+    max_difficulty_backtracking,
+    max_difficulty_sorted_splits,
+)
+from solution import getMinimumValue, brute_force_minimum_value
+
+
+# ---------------------------------------------------------------------------
+# 暴力参考实现
+# ---------------------------------------------------------------------------
+
+def brute_min_difficulty(group1, group2, group3):
+    """三重循环，直接枚举 d₁, d₂, d₃"""
+    return min(abs(d1 - d2) + abs(d2 - d3)
+               for d1 in group1 for d2 in group2 for d3 in group3)
+
+
+def brute_max_difficulty(difficulty):
+    """枚举全部 3^n 种分组，内层用三重循环求最小难度"""
+    if len(difficulty) < 3:
+        return 0
+    best = 0
+    for labels in itertools.product(range(3), repeat=len(difficulty)):
+        groups = ([], [], [])
+        for value, label in zip(difficulty, labels):
+            groups[label].append(value)
+        if groups[0] and groups[1] and groups[2]:
+            best = max(best, brute_min_difficulty(*groups))
+    return best
+
+
+def brute_max_difficulty_k(difficulty, k):
+    """k 组推广：枚举全部 k^n 种分组，内层枚举每组选哪个值"""
+    if k < 2 or len(difficulty) < k:
+        return 0
+    best = 0
+    for labels in itertools.product(range(k), repeat=len(difficulty)):
+        groups = [[] for _ in range(k)]
+        for value, label in zip(difficulty, labels):
+            groups[label].append(value)
+        if all(groups):
+            best = max(best, min(sum(abs(a - b) for a, b in zip(picks, picks[1:]))
+                                 for picks in itertools.product(*groups)))
+    return best
+
+
+def max_difficulty_k3(difficulty):
+    return getMaxDifficultyK(difficulty, 3)
+
+
+# ---------------------------------------------------------------------------
+# 用例生成与收缩
+# ---------------------------------------------------------------------------
+
+def _gen_difficulty(rng):
+    n = rng.randint(3, 8)
+    return ([rng.randint(1, 30) for _ in range(n)],)
+
+
+def _gen_difficulty_large(rng):
+    # 超出 3^n 暴力的范围，用精确回溯作参考
+    n = rng.randint(9, EXACT_SEARCH_LIMIT)
+    return ([rng.randint(1, rng.choice((20, 1000))) for _ in range(n)],)
+
+
+def _gen_difficulty_k(rng):
+    # k^n 暴力，k = 4 时只用很小的 n
+    k = rng.randint(2, 4)
+    n = rng.randint(k, 6 if k == 4 else 7)
+    return ([rng.randint(1, 30) for _ in range(n)], k)
+
+
+def _gen_groups(rng):
+    # 组大小上限 15，乘积能越过 find_min_difficulty 的 1000 阈值，覆盖两条路径
+    return tuple([rng.randint(1, 60) for _ in range(rng.randint(1, 15))]
+                 for _ in range(3))
+
+
+def _gen_minimum_value(rng):
+    ops = rng.randint(0, 4)
+    # 暴力搜索的状态数随操作次数爆炸，3 次以上只用很小的 n
+    n = rng.randint(2, 4 if ops >= 3 else 6)
+    return ([rng.randint(1, 50) for _ in range(n)], ops)
+
+
+def _shrink_list(values, min_len):
+    """候选：删掉一个元素，或把一个元素变小"""
+    if len(values) > min_len:
+        for i in range(len(values)):
+            yield values[:i] + values[i + 1:]
+    for i, v in enumerate(values):
+        for smaller in (0, v // 2, v - 1):
+            if 0 <= smaller < v:
+                yield values[:i] + [smaller] + values[i + 1:]
+
+
+def _shrink_difficulty(case):
+    for values in _shrink_list(case[0], 3):
+        yield (values,)
+
+
+def _shrink_difficulty_k(case):
+    values, k = case
+    if k > 2:
+        yield (values, k - 1)
+    for smaller in _shrink_list(values, k):
+        yield (smaller, k)
+
+
+def _shrink_groups(case):
+    for k in range(3):
+        for values in _shrink_list(case[k], 1):
+            yield case[:k] + (values,) + case[k + 1:]
+
+
+def _shrink_minimum_value(case):
+    data, ops = case
+    if ops > 0:
+        yield (data, ops - 1)
+    for values in _shrink_list(data, 2):
+        yield (values, ops)
+
+
+# 目标名 -> (快速实现, 参考实现, 用例生成, 收缩候选)
+TARGETS = {
+    "getMaxDifficulty": (getMaxDifficulty, brute_max_difficulty,
+                         _gen_difficulty, _shrink_difficulty),
+    "max_difficulty_sorted_splits": (max_difficulty_sorted_splits, brute_max_difficulty,
+                                     _gen_difficulty, _shrink_difficulty),
+    "sorted_splits_vs_exact": (max_difficulty_sorted_splits, max_difficulty_backtracking,
+                               _gen_difficulty_large, _shrink_difficulty),
+    "getMaxDifficultyK": (getMaxDifficultyK, brute_max_difficulty_k,
+                          _gen_difficulty_k, _shrink_difficulty_k),
+    "getMaxDifficultyK_k3_vs_exact": (max_difficulty_k3, max_difficulty_backtracking,
+                                      _gen_difficulty_large, _shrink_difficulty),
+    "find_min_difficulty": (find_min_difficulty, brute_min_difficulty,
+                            _gen_groups, _shrink_groups),
+    "getMinimumValue": (getMinimumValue, brute_force_minimum_value,
+                        _gen_minimum_value, _shrink_minimum_value),
+}
+
+
+def _copy_case(case):
+    # 被测函数可能原地修改列表，每次调用都传副本
+    return tuple(list(arg) if isinstance(arg, list) else arg for arg in case)
+
+
+def check_case(fast, reference, case):
+    """返回 (是否一致, 参考结果, 快速结果, 快速耗时, 参考耗时)"""
+    start = time.perf_counter()
+    actual = fast(*_copy_case(case))
+    fast_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = reference(*_copy_case(case))
+    ref_time = time.perf_counter() - start
+
+    return actual == expected, expected, actual, fast_time, ref_time
+
+
+def shrink_case(fast, reference, shrink, case):
+    """贪心收缩：只要某个候选仍然失败就接受它，直到没有候选还能失败"""
+    progress = True
+    while progress:
+        progress = False
+        for candidate in shrink(case):
+            if not check_case(fast, reference, candidate)[0]:
+                case = candidate
+                progress = True
+                break
+    return case
+
+
+def run_batch(target_name, seed, count):
+    """
+    子进程入口：用 seed 生成 count 个用例并逐个比对
+    只回传失败用例和耗时列表，避免在进程间搬运大量用例
+    """
+    fast, reference, generate, _ = TARGETS[target_name]
+    rng = random.Random(seed)
+    failures = []
+    fast_times = []
+    ref_times = []
+    for _ in range(count):
+        case = generate(rng)
+        ok, expected, actual, fast_time, ref_time = check_case(fast, reference, case)
+        fast_times.append(fast_time)
+        ref_times.append(ref_time)
+        if not ok:
+            failures.append(case)
+    return target_name, failures, fast_times, ref_times
+
+
+# ---------------------------------------------------------------------------
+# 调度与报告
+# ---------------------------------------------------------------------------
+
+def timing_summary(times):
+    """耗时分布（微秒）"""
+    ordered = sorted(times)
+    if not ordered:
+        return {}
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1e6
+
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered) * 1e6,
+        "p50": pct(0.50),
+        "p90": pct(0.90),
+        "p99": pct(0.99),
+        "max": ordered[-1] * 1e6,
+    }
+
+
+def run_stress(targets=None, cases=2000, workers=None, seed=0, batch_size=100):
+    """
+    运行压力测试，返回 {目标名: {"failures": [...], "fast": {...}, "reference": {...}}}
+    failures 中是已收缩的最小反例 (case, 参考结果, 快速结果)
+    workers=1 时在当前进程串行执行
+    """
+    targets = list(targets or TARGETS)
+    tasks = []
+    for t_index, name in enumerate(targets):
+        for b_index, start in enumerate(range(0, cases, batch_size)):
+            count = min(batch_size, cases - start)
+            tasks.append((name, seed * 1_000_003 + t_index * 10_007 + b_index, count))
+
+    if workers == 1:
+        batches = [run_batch(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batches = list(pool.map(run_batch, *zip(*tasks)))
+
+    report = {name: {"raw_failures": [], "fast": [], "reference": []} for name in targets}
+    for name, failures, fast_times, ref_times in batches:
+        report[name]["raw_failures"].extend(failures)
+        report[name]["fast"].extend(fast_times)
+        report[name]["reference"].extend(ref_times)
+
+    results = {}
+    for name, data in report.items():
+        fast, reference, _, shrink = TARGETS[name]
+        minimal = []
+        seen = set()
+        for case in data["raw_failures"]:
+            small = shrink_case(fast, reference, shrink, case)
+            key = repr(small)
+            if key in seen:
+                continue
+            seen.add(key)
+            _, expected, actual, _, _ = check_case(fast, reference, small)
+            minimal.append((small, expected, actual))
+        minimal.sort(key=lambda item: len(repr(item[0])))
+        results[name] = {
+            "failures": minimal,
+            "failed_cases": len(data["raw_failures"]),
+            "fast": timing_summary(data["fast"]),
+            "reference": timing_summary(data["reference"]),
+        }
+    return results
+
+
+def print_report(results):
+    for name, result in results.items():
+        print("=" * 60)
+        print(f"{name}: {result['fast'].get('count', 0)} 个用例, {result['failed_cases']} 个失败")
+        for label in ("fast", "reference"):
+            s = result[label]
+            if s:
+                print(f"  {label:9s} mean={s['mean']:9.1f}µs  p50={s['p50']:9.1f}µs  "
+                      f"p90={s['p90']:9.1f}µs  p99={s['p99']:9.1f}µs  max={s['max']:9.1f}µs")
+        for case, expected, actual in result["failures"][:5]:
+            print(f"  ✗ 最小反例: {case}  参考={expected}  快速={actual}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="算法模块随机压力测试")
+    parser.add_argument("--cases", type=int, default=2000, help="每个目标的用例数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="进程数，1 表示串行")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--targets", nargs="+", choices=sorted(TARGETS), default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_stress(args.targets, args.cases, args.workers, args.seed)
+    print_report(results)
+    print("=" * 60)
+    print(f"总耗时: {time.perf_counter() - start:.2f}s")
+
+    if any(result["failures"] for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+测试 模型后端与批量提取流程
+"""
+import pytest
+
+from analyzer_core.ai import ProjectInfoExtractor
+from analyzer_core import backends
+from analyzer_core.backends import LLMBackend, LlamaCppBackend, LocalServerBackend, create_backend
+from analyzer_core.prompts import PROJECT_FIELDS
+from benchmarks.llm_stub_server import StubLLMServer
+from benchmarks.llm_throughput import sample_documents
+
+
+class ScriptedBackend(LLMBackend):
+    """按顺序返回预设回复，记录收到的提示词"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    def complete(self, prompt, max_tokens):
+        self.calls.append((prompt, max_tokens))
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+def test_local_server_batch_reuses_connections():
+    documents = sample_documents(12)
+    with StubLLMServer(slots=4) as server:
+        backend = LocalServerBackend(server.base_url, workers=4)
+        extractor = ProjectInfoExtractor(backend)
+        results = extractor.extract_batch(documents[:6]) + extractor.extract_batch(documents[6:])
+        backend.close()
+        assert server.requests == 12
+        assert server.connections <= 4
+
+    assert [r["源文件"] for r in results] == [name for _, name in documents]
+    assert all(field in results[0] for field in PROJECT_FIELDS)
+    # 有标签行的文档：本地预提取的值
+    assert results[0]["公司名称"] == "Acme Capital Partners"
+    assert results[0]["项目编号"] == "2026-F-000"
+
+
+def test_one_failure_does_not_affect_the_batch():
+    full = '{' + ", ".join(f'"{f}": "v"' for f in PROJECT_FIELDS) + '}'
+    backend = ScriptedBackend([full, RuntimeError("timeout"), full])
+    results = ProjectInfoExtractor(backend).extract_batch([("a", "a.pdf"), ("b", "b.pdf"), ("c", "c.pdf")])
+    assert [r["项目名称"] for r in results] == ["v", "提取失败", "v"]
+
+
+def test_followup_asks_only_missing_fields():
+    first = '{' + ", ".join(f'"{f}": "v"' for f in PROJECT_FIELDS if f != "公司名称") + ',}'
+    backend = ScriptedBackend([first, '说明：{"公司名称": "Acme"}'])
+    info = ProjectInfoExtractor(backend).extract("没有标签的文档", "x.pdf")
+    assert info["公司名称"] == "Acme"
+    followup, tokens = backend.calls[1]
+    assert '"公司名称"' in followup and '"项目名称"' not in followup
+    assert tokens < backend.calls[0][1]
+
+
+def test_create_backend_from_config():
+    assert isinstance(create_backend({"llm_backend": "local_server"}), LocalServerBackend)
+    with pytest.raises(ValueError):
+        create_backend({"llm_backend": "openai"}, api_key=None)
+    with pytest.raises(ValueError):
+        create_backend({"llm_backend": "llama_cpp"})
+    with pytest.raises(ValueError):
+        create_backend({"llm_backend": "nope"})
+
+
+def test_llama_backends_share_model_and_lock(monkeypatch):
+    """同一模型的多个后端实例共用一把推理锁"""
+    monkeypatch.setitem(backends._LLAMA_MODELS, ("model.gguf", 4096), (object(), backends.threading.Lock()))
+    first, second = LlamaCppBackend("model.gguf", 4096), LlamaCppBackend("model.gguf", 4096)
+    assert first.model is second.model and first._lock is second._lock
@@ -0,0 +1,51 @@
+"""
+测试 Bidding分数分配
+"""
+import random
+
+from bid_optimizer import BidOptimizer, solve_dp
+
+
+def _projects(scores):
+    return [{"项目编号": f"P{i:03d}", "适配得分": s} for i, s in enumerate(scores)]
+
+
+def test_default_strategy_constraints():
+    """总分、最少项目数、单项目上限都满足，5星项目落在偏好区间"""
+    optimizer = BidOptimizer()
+    plan = optimizer.solve(_projects([4] * 3 + [3] * 6 + [2] * 10 + [0] * 21))
+    points = [row["分配分数"] for row in plan]
+    assert sum(points) == 2000
+    assert sum(1 for p in points if p > 0) >= 20
+    assert max(points) <= 600
+    assert all(row["偏好区间"] == "是" for row in plan if row["权重"] == 16.0)
+
+
+def test_matches_dp_on_small_instances():
+    """贪心 + 锁定与分组背包 DP 的最优值一致"""
+    rng = random.Random(1)
+    for _ in range(100):
+        strategy = {
+            "total_points": rng.choice([100, 200]),
+            "min_projects": rng.randint(0, 5),
+            "max_per_project": rng.choice([30, 60]),
+            "preferred_range": "30-60",
+        }
+        optimizer = BidOptimizer(strategy, step=10, scale=rng.choice([20, 50]))
+        optimizer.solve(_projects([rng.randint(-2, 5) for _ in range(rng.randint(1, 7))]))
+        best, _ = solve_dp(optimizer.weights, optimizer)
+        assert abs(best - optimizer.utility()) < 1e-9
+
+
+def test_incremental_update_matches_full_solve():
+    """修改单个项目评分后的增量结果与从头求解一致"""
+    rng = random.Random(2)
+    optimizer = BidOptimizer()
+    optimizer.solve(_projects([rng.randint(-2, 5) for _ in range(60)]))
+    for _ in range(20):
+        index = rng.randrange(60)
+        optimizer.update_project(index, {"项目编号": f"P{index:03d}", "适配得分": rng.randint(-2, 5)})
+        reference = BidOptimizer()
+        reference.solve(optimizer.projects)
+        assert abs(reference.utility() - optimizer.utility()) < 1e-9
+        assert sum(optimizer.units) == optimizer.total_units
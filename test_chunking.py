@@ -0,0 +1,93 @@
+"""
+测试 长文档分块与 map-reduce 提取
+"""
+import json
+
+from analyzer_core.ai import ProjectInfoExtractor
+from analyzer_core.chunking import ChunkCache, chunk_text, is_heading, merge_chunk_results, split_sections
+from analyzer_core.prompts import MAX_TEXT_LENGTH
+from benchmarks.llm_stub_server import answer
+from test_backends import ScriptedBackend
+
+BOILERPLATE = "Course Information\n" + "\n".join(
+    f"MSBA capstone guideline {i}: teams meet the sponsor every week." for i in range(120))
+
+
+def long_proposal(name: str, skills: str) -> str:
+    body = "\n".join(f"Sentence {i} about the analytics problem of {name}." for i in range(120))
+    return (f"Project Title: {name}\nCompany: Acme Capital Partners\n\n"
+            f"Background\n{body}\n\n{BOILERPLATE}\n\n"
+            f"Deliverables\nA churn dashboard for {name}.\n\nRequired Skills\n{skills}\n")
+
+
+class StubBackend(ScriptedBackend):
+    """用基准替身服务的回答逻辑，记录提示词"""
+
+    def __init__(self):
+        super().__init__([])
+
+    def complete(self, prompt, max_tokens):
+        self.calls.append((prompt, max_tokens))
+        return answer(prompt)
+
+
+def test_heading_detection():
+    assert is_heading("Deliverables")
+    assert is_heading("3.2 Data Sources")
+    assert is_heading("一、项目背景")
+    assert is_heading("I. Introduction")
+    assert not is_heading("2024 revenue grew 5% year over year")
+    assert not is_heading("The team will build a model for the sponsor.")
+    titles = [s.title for s in split_sections("intro line\nBackground\ntext\nRequired Skills:\nPython")]
+    assert titles == ["", "Background", "Required Skills"]
+
+
+def test_chunks_respect_size_and_keep_content():
+    text = long_proposal("Churn", "Python, SQL")
+    chunks = chunk_text(text, 1500)
+    assert len(chunks) > 1
+    assert all(len(c.text) <= 1500 for c in chunks)
+    joined = "".join(c.text for c in chunks)
+    assert "".join(text.split()) == "".join(joined.split())
+    assert chunks[-1].title in ("Deliverables", "Required Skills")
+
+
+def test_merge_rules():
+    merged = merge_chunk_results([
+        {"项目名称": "Churn", "技能要求": "Python", "公司用心程度": "8 - 描述详细"},
+        {"项目名称": "Other", "技能要求": "SQL", "公司用心程度": "6"},
+        {"项目名称": "Churn", "技能要求": "Python"},
+    ])
+    assert merged == {"项目名称": "Churn", "技能要求": "Python；SQL", "公司用心程度": "7 - 描述详细"}
+
+
+def test_long_document_reads_late_sections():
+    text = long_proposal("Churn", "Python, SQL, Tableau")
+    assert len(text) > MAX_TEXT_LENGTH
+    backend = ScriptedBackend([])
+    backend.complete = lambda prompt, max_tokens: json.dumps(
+        {"技能要求": "Python, SQL, Tableau"} if "Tableau" in prompt else {"项目名称": "Churn"})
+    info = ProjectInfoExtractor(backend).extract(text, "p.pdf")
+    assert info["技能要求"] == "Python, SQL, Tableau"
+    assert info["公司名称"] == "Acme Capital Partners"
+
+    truncated = ProjectInfoExtractor(backend, long_document_mode="truncate").extract(text, "p.pdf")
+    assert "技能要求" not in truncated
+
+
+def test_shared_boilerplate_is_extracted_once(tmp_path):
+    documents = [(long_proposal("Churn", "Python"), "a.pdf"), (long_proposal("Pricing", "R"), "b.pdf")]
+    backend = StubBackend()
+    cache = ChunkCache(tmp_path / "chunk_cache.json")
+    results = ProjectInfoExtractor(backend, cache=cache).extract_batch(documents)
+    prompts = [prompt for prompt, _ in backend.calls]
+    assert sum("guideline 0:" in p for p in prompts) == 1
+    assert [r["源文件"] for r in results] == ["a.pdf", "b.pdf"]
+    cache.save()
+    assert [p.name for p in tmp_path.iterdir()] == ["chunk_cache.json"]
+
+    # 第二次运行：全部块命中缓存，不再调用模型
+    again = StubBackend()
+    cache = ChunkCache(tmp_path / "chunk_cache.json")
+    assert ProjectInfoExtractor(again, cache=cache).extract_batch(documents) == results
+    assert again.calls == [] and cache.hits > 0
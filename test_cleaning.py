@@ -0,0 +1,60 @@
+"""
+测试 页眉页脚、页码和模板文字的清理
+"""
+from analyzer_core.cleaning import clean_corpus, clean_pages, dehyphenate, is_page_number
+
+HEADER = "Acme Capital Partners | Confidential"
+NOTICE = "This document is confidential and intended for MSBA students only."
+
+
+def page(number: int, body: str) -> str:
+    lines = [f"Paragraph {k} of the analysis on page {number}." for k in range(3)]
+    return "\n".join([HEADER, "Spring 2026 Capstone", *lines, body, NOTICE, *lines,
+                      "Footer line", f"Page {number} of 4"])
+
+
+def test_page_numbers_and_hyphenation():
+    assert is_page_number("Page 3 of 10") and is_page_number("- 7 -") and is_page_number("第 2 页")
+    assert not is_page_number("2026 revenue grew 5%")
+    assert dehyphenate("time-series analy-\nsis") == "time-series analysis"
+
+
+def test_repeated_page_lines_are_removed():
+    pages = [page(i, f"Unique body text for page {i} about risk mod-\nels.") for i in range(1, 5)]
+    text, stats = clean_pages(pages)
+    assert HEADER not in text and NOTICE not in text and "Page 2 of 4" not in text
+    assert "Unique body text for page 3 about risk models." in text
+    assert stats["bytes_after"] < stats["bytes_before"] and stats["lines_removed"] >= 4 * 5
+    # 只有一两行的页面不会被当成页眉页脚删光
+    assert clean_pages(["Scanned page one", "Scanned page two"])[0] == "Scanned page one\n\nScanned page two\n"
+
+
+def test_corpus_boilerplate_keeps_headings_and_labels(tmp_path):
+    template = "All capstone teams meet their sponsor every week during the term."
+    skills = "Required Skills: Python, SQL and Tableau dashboards"
+    names = []
+    for i in range(6):
+        names.append(f"p{i}")
+        (tmp_path / f"p{i}.txt").write_text(
+            f"Project Title: Project number {i} on topic {chr(65 + i)}\n{template}\nDeliverables\n{skills}\n",
+            encoding="utf-8")
+    report = clean_corpus(tmp_path, names, tmp_path / "boilerplate.json")
+    text = (tmp_path / "p3.txt").read_text(encoding="utf-8")
+    assert template not in text
+    assert "Deliverables" in text and skills in text and "Project number 3" in text
+    assert all(r["lines_removed"] == 1 for r in report.values())
+
+    # 以后新提取的文档按已有统计清理
+    (tmp_path / "new.txt").write_text(f"New project\n{template}\n", encoding="utf-8")
+    assert clean_corpus(tmp_path, ["new"], tmp_path / "boilerplate.json")["new"]["lines_removed"] == 1
+
+
+def test_numbers_in_body_are_kept():
+    body = "Team size\n4\nBudget (USD)\n5000\nTimeline\n2024\nDuration in weeks\n12"
+    pages = [page(i, body) for i in range(1, 5)]
+    text, _ = clean_pages(pages)
+    assert "Team size\n4\nBudget (USD)\n5000\nTimeline\n2024\nDuration in weeks\n12" in text
+    assert "Page 2 of 4" not in text
+    # 页面首尾单独成行的数字仍按页码删除
+    text, _ = clean_pages(["1\nIntro\nTeam size\n4\nmore\nend", "Summary\nBudget\n5000\nx\ny\n2"])
+    assert "\n4\n" in text and "5000" in text and not text.startswith("1") and not text.rstrip().endswith("2")
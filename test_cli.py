@@ -0,0 +1,77 @@
+"""
+测试 批处理命令行
+"""
+import json
+import os
+import time
+
+from analyzer_core import cli
+from analyzer_core.pdf import PDFExtractor
+
+
+def _dirs(tmp_path):
+    dirs = {name: tmp_path / name for name in ("projects", "texts", "output")}
+    for d in dirs.values():
+        d.mkdir()
+    return ["--projects-dir", str(dirs["projects"]), "--texts-dir", str(dirs["texts"]),
+            "--output-dir", str(dirs["output"])], dirs
+
+
+def _events(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.strip()]
+
+
+def test_select_files_only_and_since(tmp_path):
+    """--only 按文件名通配，--since 按修改时间"""
+    for name in ("P1_a.pdf", "P2_b.pdf", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    old = time.time() - 3 * 86400
+    os.utime(tmp_path / "P2_b.pdf", (old, old))
+
+    assert [p.name for p in cli.select_files(tmp_path, "*.pdf")] == ["P1_a.pdf", "P2_b.pdf"]
+    assert [p.name for p in cli.select_files(tmp_path, "*.pdf", only=["P2*"])] == ["P2_b.pdf"]
+    assert [p.name for p in cli.select_files(tmp_path, "*.pdf", since=cli.parse_since("1d"))] == ["P1_a.pdf"]
+    assert cli.parse_since("2026-01-15") < cli.parse_since("1h")
+
+
+def test_extract_reports_partial_failure(tmp_path, capsys, monkeypatch):
+    """部分PDF提取失败时退出码为1，进度为每行一个JSON事件，成功的写入 index.json"""
+    args, dirs = _dirs(tmp_path)
+    (dirs["projects"] / "good.pdf").write_bytes(b"%PDF")
+    (dirs["projects"] / "bad.pdf").write_bytes(b"%PDF")
+    monkeypatch.setattr(PDFExtractor, "extract_pages",
+                        staticmethod(lambda path: [] if path.stem == "bad" else ["project text"]))
+
+    status = cli.main(["extract", "--workers", "1", "--progress", "json"] + args)
+
+    assert status == cli.EXIT_PARTIAL
+    events = _events(capsys)
+    assert events[0] == {**events[0], "event": "start", "stage": "extract", "total": 2}
+    items = {e["item"]: e["status"] for e in events if e["event"] == "item"}
+    assert items == {"bad.pdf": "error", "good.pdf": "ok"}
+    assert [e["failed"] for e in events if e["event"] == "end"] == [1]
+
+    index = json.loads((dirs["texts"] / "index.json").read_text(encoding="utf-8"))
+    assert [item["pdf_file"] for item in index] == ["good.pdf"]
+    assert (dirs["texts"] / "good.txt").read_text(encoding="utf-8") == "project text\n"
+
+
+def test_export_json_from_latest_results(tmp_path, capsys):
+    """export 读取最新的分析结果，--only 过滤源文件"""
+    args, dirs = _dirs(tmp_path)
+    projects = [{"项目名称": "A", "源文件": "P1.pdf"}, {"项目名称": "B", "源文件": "P2.pdf"}]
+    source = dirs["output"] / "项目分析_20260101_000000.json"
+    source.write_text(json.dumps(projects, ensure_ascii=False), encoding="utf-8")
+
+    status = cli.main(["export", "--output-format", "json", "--only", "P2*", "--progress", "json"] + args)
+
+    assert status == cli.EXIT_OK
+    outputs = [p for p in dirs["output"].glob("项目分析_*.json") if p != source]
+    assert len(outputs) == 1
+    assert json.loads(outputs[0].read_text(encoding="utf-8")) == [projects[1]]
+
+
+def test_export_without_results_is_usage_error(tmp_path, capsys):
+    args, _ = _dirs(tmp_path)
+    assert cli.main(["export", "--progress", "json"] + args) == cli.EXIT_USAGE
+    assert _events(capsys)[0]["event"] == "error"
@@ -0,0 +1,47 @@
+"""
+测试 列式导出
+"""
+import pytest
+
+from analyzer_core.columnar import ColumnarExporter, latest_run_file, partition_dir, run_files
+
+PROJECTS = [
+    {"项目名称": "A", "所处行业": "金融", "公司名称": "Acme", "适配得分": 3, "技能要求": ["Python", "SQL"]},
+    {"项目名称": "B", "所处行业": "金融", "公司名称": "Beta", "适配得分": "n/a"},
+    {"项目名称": "C", "所处行业": "医疗", "公司名称": "Acme", "源文件": "P3.pdf"},
+]
+
+
+def test_latest_run_follows_partition_and_run_id(tmp_path):
+    """按 (运行日期, 运行ID) 排序，而不是文件修改时间"""
+    for run_date, run_id in [("2026-01-15", "20260115_100000"), ("2025-09-01", "20250901_080000"),
+                             ("2026-01-15", "20260115_090000")]:
+        directory = partition_dir(tmp_path, run_date)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"项目分析_{run_id}.parquet").write_bytes(b"")
+    (tmp_path / "run_date=2026-01-15" / "notes.txt").write_text("ignored")
+
+    assert [p.stem for p in run_files(tmp_path)] == [
+        "项目分析_20250901_080000", "项目分析_20260115_090000", "项目分析_20260115_100000"]
+    assert latest_run_file(tmp_path).stem == "项目分析_20260115_100000"
+    assert latest_run_file(tmp_path / "missing") is None
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_round_trip_with_dictionary_columns(tmp_path, fmt):
+    pa = pytest.importorskip("pyarrow")
+    path = ColumnarExporter.export(PROJECTS, tmp_path, format=fmt, run_id="20260115_093000")
+    assert path.parent.name == "run_date=2026-01-15"
+
+    table = ColumnarExporter.read_table(path)
+    assert pa.types.is_dictionary(table.schema.field("所处行业").type)
+    assert pa.types.is_dictionary(table.schema.field("公司名称").type)
+
+    rows = ColumnarExporter.load_latest(tmp_path, columns=["项目名称", "所处行业", "适配得分"])
+    assert rows == [
+        {"项目名称": "A", "所处行业": "金融", "适配得分": 3},
+        {"项目名称": "B", "所处行业": "金融"},
+        {"项目名称": "C", "所处行业": "医疗"},
+    ]
+    full = ColumnarExporter.load_latest(tmp_path)
+    assert full[0]["技能要求"] == '["Python", "SQL"]'
@@ -0,0 +1,113 @@
+"""
+测试 Google Drive 文件夹爬取与增量同步（本地替身服务）
+"""
+import json
+import socket
+
+import pytest
+
+from analyzer_core import cli
+from analyzer_core.drive import DriveClient, DriveError, DriveFolderCrawler, GoogleDriveDownloader
+from benchmarks.drive_stub_server import DriveStubServer
+
+
+def build_tree(server):
+    root = server.add_folder("Projects")
+    sub = server.add_folder("Spring", root)
+    server.add_file(root, "P1.pdf", b"%PDF one")
+    server.add_file(root, "notes.txt", b"not a pdf", mime="text/plain")
+    server.add_file(root, "Brief", b"%PDF exported", mime="application/vnd.google-apps.document")
+    server.add_file(sub, "P2.pdf", b"%PDF two")
+    server.add_file(sub, "P1.pdf", b"%PDF other one")
+    return root
+
+
+def test_crawl_recurses_pages_and_only_fetches_changes(tmp_path):
+    with DriveStubServer(page_size=2) as server:
+        root = build_tree(server)
+        client = DriveClient(api_key="test", api_base=server.api_base)
+        crawler = DriveFolderCrawler(client, tmp_path / "projects", tmp_path / "listing.json", workers=3)
+        result = crawler.sync(root)
+        assert result["listed"] == 4 and result["failed"] == []
+        files = sorted(p.name for p in (tmp_path / "projects").iterdir())
+        assert len(files) == 4 and "Brief.pdf" in files and "P2.pdf" in files
+        # 同名文件不覆盖
+        assert (tmp_path / "projects" / "P1.pdf").read_bytes() == b"%PDF one"
+        assert server.list_requests == 3  # 根目录两页 + 子文件夹一页
+
+        # 再次同步：只下载修改过的文件
+        p2 = next(i for i, item in server.items.items() if item["name"] == "P2.pdf")
+        server.update_file(p2, b"%PDF two v2", "2026-02-01T00:00:00.000Z")
+        server.downloads.clear()
+        crawler = DriveFolderCrawler(client, tmp_path / "projects", tmp_path / "listing.json")
+        result = crawler.sync(root)
+        assert result["downloaded"] == ["P2.pdf"] and result["unchanged"] == 3
+        assert server.downloads == ["P2.pdf"]
+        assert (tmp_path / "projects" / "P2.pdf").read_bytes() == b"%PDF two v2"
+        # 下载线程各自打开的连接也一起关闭
+        connections = list(client._connections)
+        assert len(connections) > 1
+        client.close()
+        assert all(conn.sock is None for conn in connections)
+
+
+def test_interrupted_download_starts_over(tmp_path):
+    """传输中断后从头重新下载，不会把两次的内容拼在一起；导出的文档没有 MD5 可校验"""
+    with DriveStubServer() as server:
+        root = server.add_folder("Projects")
+        brief = server.add_file(root, "Brief", b"%PDF exported " * 1000, mime="application/vnd.google-apps.document")
+        client = DriveClient(api_key="test", api_base=server.api_base)
+        server.broken_downloads = 1
+        output = tmp_path / "Brief.pdf"
+        client.download(server.items[brief], output)
+        assert output.read_bytes() == b"%PDF exported " * 1000
+        assert server.downloads == ["Brief", "Brief"]
+
+        server.broken_downloads = 10
+        with pytest.raises(Exception):
+            client.download(server.items[brief], tmp_path / "again.pdf")
+        assert list(tmp_path.iterdir()) == [output]
+        client.close()
+
+
+def test_missing_credentials_and_bad_key(tmp_path, monkeypatch):
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    monkeypatch.delenv("GOOGLE_ACCESS_TOKEN", raising=False)
+    with pytest.raises(DriveError):
+        DriveClient.from_config({})
+    with DriveStubServer() as server:
+        client = DriveClient(api_key="wrong", api_base=server.api_base)
+        with pytest.raises(DriveError, match="403"):
+            list(client.list_children("root"))
+
+
+def test_menu_survives_unreachable_drive(tmp_path, monkeypatch, capsys):
+    """重试后仍连不上 Drive 时交互菜单打印说明，不崩溃"""
+    import project_analyzer_local
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "project_analyzer_config.json").write_text(
+        json.dumps({"google_api_key": "test", "drive_api_base": f"http://127.0.0.1:{port}/drive/v3"}))
+    assert project_analyzer_local.download_from_folder_link("https://drive.google.com/drive/folders/abc") == []
+    assert "文件夹下载失败" in capsys.readouterr().out
+
+
+def test_cli_download_crawls_folder_links(tmp_path, capsys):
+    with DriveStubServer() as server:
+        root = build_tree(server)
+        link = f"https://drive.google.com/drive/folders/{root}?usp=sharing"
+        assert GoogleDriveDownloader.is_folder_link(link)
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({"google_drive_links": [link], "google_api_key": "test",
+                                      "drive_api_base": server.api_base}))
+        projects = tmp_path / "projects"
+        status = cli.main(["download", "--progress", "json", "--config", str(config),
+                           "--projects-dir", str(projects), "--texts-dir", str(tmp_path / "texts"),
+                           "--output-dir", str(tmp_path / "output")])
+    assert status == cli.EXIT_OK
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+    assert sum(e["event"] == "item" and e["status"] == "ok" for e in events) == 4
+    assert len(list(projects.glob("*.pdf"))) == 4
+    assert (tmp_path / "output" / "drive_listing.json").exists()
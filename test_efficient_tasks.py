@@ -1,7 +1,7 @@
 """
 测试 Efficient Tasks 解决方案
 """
-from efficient_tasks import getMaxDifficulty, find_min_difficulty
+from efficient_tasks import getMaxDifficulty, getMaxDifficultyK, find_min_difficulty, max_difficulty_contiguous
 
 def test_case_0():
     """测试 Sample Case 0"""
@@ -43,6 +43,16 @@ def test_case_1():
     print()
     return result == expected
 
+def test_k_groups():
+    """k 组推广：k = 3 与原题一致，k = 2 为相邻差的最大值，其余与枚举参照解一致"""
+    assert getMaxDifficultyK([1, 2, 5, 3, 5], 3) == 6
+    assert getMaxDifficultyK([5, 6, 4, 1, 5, 5], 3) == 8
+    assert getMaxDifficultyK([1, 10, 5, 9], 2) == 4
+    assert getMaxDifficultyK([4, 7], 3) == 0
+    for difficulty in ([3, 9, 1, 14, 6, 2, 11], [5, 5, 5, 1, 8, 2]):
+        for k in (4, 5):
+            assert getMaxDifficultyK(difficulty, k) == max_difficulty_contiguous(difficulty, k)
+
 if __name__ == "__main__":
     success1 = test_case_0()
     success2 = test_case_1()
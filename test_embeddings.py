@@ -0,0 +1,72 @@
+"""
+测试 项目文本向量索引
+"""
+from array import array
+
+from analyzer_core import embeddings
+from analyzer_core.embeddings import EmbeddingIndex, tokenize
+
+FINANCE = "Portfolio risk model for an investment fund. Build equity trading signals in Python and SQL."
+HEALTH = "Hospital patient readmission analysis. Clinical data from the healthcare system and medical records."
+RETAIL = "Retail store demand forecasting for a restaurant chain, merchant sales and inventory planning."
+
+
+def write_texts(directory, texts):
+    for name, text in texts.items():
+        (directory / f"{name}.txt").write_text(text, encoding="utf-8")
+
+
+def test_tokenize_mixed_language():
+    assert tokenize("Python 金融风险 the SQL") == ["python", "金融", "融风", "风险", "sql"]
+
+
+def test_similar_and_profile_fit(tmp_path):
+    texts = tmp_path / "texts"
+    texts.mkdir()
+    write_texts(texts, {
+        "fin_a": FINANCE, "fin_b": FINANCE.replace("fund", "bank") + " Credit risk.",
+        "health": HEALTH, "retail": RETAIL,
+    })
+    with EmbeddingIndex(tmp_path / "index") as index:
+        assert index.update(texts)["rebuilt"]
+        assert index.similar(["fin_a"], k=1)[0][0] == "fin_b"
+        assert index.search("hospital clinical records", k=1)[0][0] == "health"
+
+        profile = {"background": {"interests": ["Investment analysis", "Risk management"]},
+                   "preferences": {"preferred_industries": ["Finance"], "avoid_industries": ["Healthcare"]}}
+        ranking = [name for name, _ in index.profile_fit(profile)]
+        assert set(ranking[:2]) == {"fin_a", "fin_b"} and ranking[-1] == "health"
+
+
+def test_incremental_update_keeps_existing_rows(tmp_path):
+    texts = tmp_path / "texts"
+    texts.mkdir()
+    write_texts(texts, {"a": FINANCE, "b": HEALTH})
+    with EmbeddingIndex(tmp_path / "index") as index:
+        index.update(texts)
+        before = bytes(index.row(0))
+
+    write_texts(texts, {"c": RETAIL})
+    with EmbeddingIndex(tmp_path / "index") as index:
+        assert index.update(texts) == {"added": 1, "updated": 0, "removed": 0, "rebuilt": False}
+        assert bytes(index.row(0)) == before
+        assert index.search(RETAIL, k=1)[0][0] == "c"
+        assert index.update(texts)["added"] == 0
+
+    (texts / "b.txt").unlink()
+    with EmbeddingIndex(tmp_path / "index") as index:
+        assert index.update(texts)["rebuilt"]
+        assert [doc["name"] for doc in index.docs] == ["a", "c"]
+
+
+def test_ivf_finds_each_row(tmp_path, monkeypatch):
+    monkeypatch.setattr(embeddings, "IVF_MIN_ROWS", 16)
+    texts = tmp_path / "texts"
+    texts.mkdir()
+    topics = [FINANCE, HEALTH, RETAIL]
+    write_texts(texts, {f"p{i:02d}": f"{topics[i % 3]} Variant {i} keyword{i}" for i in range(40)})
+    with EmbeddingIndex(tmp_path / "index") as index:
+        index.update(texts)
+        assert len(index.centroids) == 6
+        for i, doc in enumerate(index.docs):
+            assert index.query(array("f", index.row(i)), k=1)[0][0] == doc["name"]
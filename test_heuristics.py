@@ -0,0 +1,53 @@
+"""
+测试 本地规则预提取
+"""
+from analyzer_core.heuristics import CONFIDENCE_THRESHOLD, HeuristicExtractor
+from analyzer_core.prompts import MAX_TOKENS, PROJECT_FIELDS, build_prompt, max_tokens_for
+from benchmarks.prompt_size import SAMPLE, compare
+
+
+def test_labeled_fields_are_confident():
+    result = HeuristicExtractor().extract(SAMPLE, "P014_acme.pdf")
+    assert result["项目名称"] == ("Portfolio Risk Early Warning System", 0.9)
+    assert result["公司名称"] == ("Acme Capital Partners", 0.9)
+    assert result["项目编号"] == ("2026-F-014", 0.9)
+    assert result["技能要求"][0] == "Python, SQL; Tableau or Power BI"
+
+
+def test_label_on_its_own_line():
+    text = "Sponsor\nBeta Health Group\nProject Name\nReadmission prediction\n\nSkills: R, statistics"
+    confident = HeuristicExtractor().confident(text, "project_003.pdf")
+    assert confident == {"项目名称": "Readmission prediction", "公司名称": "Beta Health Group",
+                         "技能要求": "R, statistics"}
+
+
+def test_skills_section_stops_at_next_heading():
+    text = ("Required Skills\nPython\nSQL\nPower BI\nDeliverables\nA churn model and a dashboard\n"
+            "Timeline\nTwelve weeks")
+    assert HeuristicExtractor().confident(text)["技能要求"] == "Python; SQL; Power BI"
+
+    # 找不到节的结尾、被截断的技能一节交给模型
+    long = "Required Skills:\n" + "\n".join(f"Candidates should be comfortable with topic {i}" for i in range(20))
+    value, confidence = HeuristicExtractor().extract(long)["技能要求"]
+    assert len(value) == 400 and confidence < CONFIDENCE_THRESHOLD
+
+
+def test_guesses_stay_below_threshold():
+    """没有标签时只能推测，置信度低，这些字段仍交给模型"""
+    extractor = HeuristicExtractor()
+    text = "We are Gamma Analytics LLC. The team will use Python and SQL."
+    result = extractor.extract(text)
+    assert result["公司名称"] == ("Gamma Analytics LLC", 0.5)
+    assert result["技能要求"] == ("Python、SQL", 0.5)
+    assert extractor.confident(text) == {}
+
+
+def test_reduced_prompt_is_smaller():
+    assert max_tokens_for(list(PROJECT_FIELDS)) == MAX_TOKENS
+    known = HeuristicExtractor().confident(SAMPLE, "P014.pdf")
+    fields = [f for f in PROJECT_FIELDS if f not in known]
+    prompt = build_prompt(SAMPLE, fields)
+    assert '"公司名称"' not in prompt and '"应用场景"' in prompt
+    result = compare([("P014.pdf", SAMPLE)])
+    assert result["max_tokens"][1] < result["max_tokens"][0]
+    assert result["提示词字符"][1] < result["提示词字符"][0]
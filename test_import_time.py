@@ -0,0 +1,27 @@
+"""
+测试 入口脚本不在导入阶段加载重量级依赖，导入耗时不超过启动预算
+"""
+import pytest
+
+from benchmarks.import_time import ENTRY_MODULES, STARTUP_BUDGET_MS, heavy_modules_loaded, measure
+
+# 测试机负载带来的抖动余量（measure 已取多次运行的中位数）
+BUDGET_SLACK = 1.2
+
+
+@pytest.mark.parametrize("module", ENTRY_MODULES)
+def test_no_heavy_imports_at_startup(module):
+    try:
+        loaded = heavy_modules_loaded(module)
+    except ImportError as e:
+        pytest.skip(f"{module} 的依赖未安装: {e}")
+    assert loaded == []
+
+
+@pytest.mark.parametrize("module", ENTRY_MODULES)
+def test_import_time_within_budget(module):
+    try:
+        elapsed_ms = measure(module, runs=7) * 1000
+    except ImportError as e:
+        pytest.skip(f"{module} 的依赖未安装: {e}")
+    assert elapsed_ms <= STARTUP_BUDGET_MS * BUDGET_SLACK, f"{module} 导入耗时 {elapsed_ms:.1f} ms"
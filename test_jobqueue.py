@@ -0,0 +1,103 @@
+"""
+测试 共享任务表（租约、过期重领、结果只提交一次）和多工作进程的命令行流程
+"""
+import json
+import threading
+
+from analyzer_core import cli
+from analyzer_core.jobqueue import JobQueue
+from analyzer_core.pdf import PDFExtractor
+from benchmarks.llm_stub_server import StubLLMServer
+from benchmarks.llm_throughput import sample_documents
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_expired_lease_is_taken_over(tmp_path):
+    clock = FakeClock()
+    queue = JobQueue(tmp_path / "jobs.db", lease_s=60, clock=clock)
+    assert queue.enqueue([("a.pdf", "1"), ("b.pdf", "1"), ("c.pdf", "1")])["added"] == 3
+    first = queue.lease("host1", 2)
+    second = queue.lease("host2", 2)
+    assert [name for name, _ in first] == ["a.pdf", "b.pdf"] and [name for name, _ in second] == ["c.pdf"]
+    assert queue.lease("host2", 1) == []
+
+    # b.pdf、c.pdf 续约，a.pdf 没有续约，过期后被 host2 接手
+    clock.now += 40
+    assert queue.heartbeat([first[1], second[0]]) == 2
+    clock.now += 30
+    (name, token), = queue.lease("host2", 2)
+    assert name == "a.pdf"
+    assert not queue.complete("a.pdf", first[0][1], {"by": "host1"})
+    assert queue.complete("a.pdf", token, {"by": "host2"})
+    assert queue.complete("b.pdf", first[1][1], {"by": "host1"})
+    assert queue.results() == [{"by": "host2"}, {"by": "host1"}]
+    assert queue.counts()["leased"] == 1 and queue.lease("host3", 1) == []
+
+    # 内容变化的PDF重新排队，未变化的不动
+    assert queue.enqueue([("a.pdf", "2"), ("b.pdf", "1")]) == {"added": 0, "requeued": 1, "unchanged": 1}
+
+
+def test_failed_jobs_are_retried_then_marked_failed(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.db", max_attempts=2)
+    queue.enqueue([("bad.pdf", "1")])
+    for _ in range(2):
+        (name, token), = queue.lease("w", 1)
+        assert queue.fail(name, token, "无法提取文本")
+    assert queue.lease("w", 1) == [] and queue.failures() == [("bad.pdf", "无法提取文本")]
+
+
+def test_job_that_keeps_crashing_workers_is_marked_failed(tmp_path):
+    clock = FakeClock()
+    queue = JobQueue(tmp_path / "jobs.db", lease_s=60, max_attempts=3, clock=clock)
+    queue.enqueue([("oom.pdf", "1")])
+    for _ in range(3):
+        assert [name for name, _ in queue.lease("w", 1)] == ["oom.pdf"]
+        clock.now += 61  # 工作进程崩溃，没有续约也没有提交
+    assert queue.lease("w", 1) == []
+    assert queue.counts()["failed"] == 1 and queue.unfinished() == 0
+    assert "租约过期" in queue.failures()[0][1]
+
+
+def test_enqueue_workers_and_merge(tmp_path, capsys, monkeypatch):
+    dirs = {name: tmp_path / name for name in ("projects", "texts", "output")}
+    for d in dirs.values():
+        d.mkdir()
+    for text, name in sample_documents(4):
+        (dirs["projects"] / name).write_text(text, encoding="utf-8")
+    monkeypatch.setattr(PDFExtractor, "extract_pages", staticmethod(lambda path: [path.read_text("utf-8")]))
+
+    with StubLLMServer() as server:
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({"llm_backend": "local_server", "local_server_url": server.base_url}))
+        common = ["--config", str(config), "--progress", "json", "--projects-dir", str(dirs["projects"]),
+                  "--texts-dir", str(dirs["texts"]), "--output-dir", str(dirs["output"])]
+        assert cli.main(["enqueue"] + common) == cli.EXIT_OK
+        # 两个工作进程同时领取（这里用线程代替两台机器）
+        statuses = []
+        # 工作进程的 --texts-dir 是各自本机的目录，文本由 merge 写到协调者的目录
+        argv = ["worker", "--workers", "2", "--lease", "2", "--no-ocr"] + common + ["--texts-dir", str(tmp_path / "local")]
+        workers = [threading.Thread(target=lambda: statuses.append(cli.main(argv))) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert statuses == [cli.EXIT_OK, cli.EXIT_OK]
+        assert cli.main(["merge", "--output-format", "json"] + common) == cli.EXIT_OK
+
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+    done = [e["item"] for e in events if e["event"] == "item" and e["stage"] == "worker"]
+    assert sorted(done) == [name for _, name in sample_documents(4)]
+    merged = next(e["path"] for e in events if e["event"] == "output" and e["stage"] == "merge")
+    projects = json.loads(open(merged, encoding="utf-8").read())
+    assert [p["源文件"] for p in projects] == [name for _, name in sample_documents(4)]
+    index = json.loads((dirs["texts"] / "index.json").read_text(encoding="utf-8"))
+    assert len(index) == 4 and all((dirs["texts"] / entry["text_file"]).exists() for entry in index)
+    assert not list((tmp_path / "local").glob("*.txt"))
+    assert any(e["event"] == "clean" and e["stage"] == "merge" for e in events)
@@ -0,0 +1,66 @@
+"""
+测试 AI回复的JSON解析与修复
+"""
+import sys
+import types
+
+import pytest
+
+from analyzer_core.jsonparse import JSONObjectScanner, parse_json_reply, validate_project
+from analyzer_core.prompts import PROJECT_FIELDS
+
+
+@pytest.mark.parametrize("reply, expected", [
+    ('```json\n{"项目名称": "A", "所处行业": "金融",}\n```', {"项目名称": "A", "所处行业": "金融"}),
+    ('结果如下：{"项目名称": "A"} 以上。{"项目名称": "B"}', {"项目名称": "A"}),
+    ('{"项目名称": "He said "hi" there", "公司名称": "X"}', {"项目名称": 'He said "hi" there', "公司名称": "X"}),
+    ('{"应用场景": "第一行\n第二行"}', {"应用场景": "第一行\n第二行"}),
+    ('{"项目名称": "A", "应用场景": "被截', {"项目名称": "A", "应用场景": "被截"}),
+    ('{"项目名称": "A", "所处行业": "金融", "应用', {"项目名称": "A", "所处行业": "金融"}),
+    ('{"a": {"b": [1, 2,], }, }', {"a": {"b": [1, 2]}}),
+    ("抱歉，我无法处理", None),
+])
+def test_parse_noisy_replies(reply, expected):
+    assert parse_json_reply(reply) == expected
+
+
+def test_scanner_stops_at_first_balanced_object_across_chunks():
+    scanner = JSONObjectScanner()
+    results = [scanner.feed(chunk) for chunk in ['说明 {"a": "}', '", "b": {"c": 1}', '} 后面的文字 {']]
+    assert results[:2] == [None, None]
+    assert results[2] == '{"a": "}", "b": {"c": 1}}'
+
+
+def test_validate_project_reports_missing_fields():
+    info, missing = validate_project({"项目名称": " X ", "公司用心程度": 8, "技能要求": ["Python", "SQL"],
+                                      "预期成果": "", "备注": "保留"})
+    assert info == {"项目名称": "X", "公司用心程度": "8", "技能要求": "Python、SQL", "备注": "保留"}
+    assert missing == [f for f in PROJECT_FIELDS if f not in ("项目名称", "公司用心程度", "技能要求")]
+
+
+def test_followup_only_asks_for_missing_fields(monkeypatch, tmp_path):
+    """第一次回复缺字段时，第二次只补问缺失的字段，max_tokens 也更小"""
+    pytest.importorskip("dotenv")
+    calls = []
+    replies = iter([
+        '{"项目名称": "A", "所处行业": "金融", "应用场景": "s", "公司用心程度": "8", '
+        '"预期成果": "r", "项目编号": "P1", "技能要求": "Python", "项目描述摘要": "d",}',
+        '{"公司名称": "Acme"}',
+    ])
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        message = types.SimpleNamespace(content=next(replies))
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+    fake_openai = types.SimpleNamespace(ChatCompletion=types.SimpleNamespace(create=create))
+    monkeypatch.setitem(sys.modules, "openai", fake_openai)
+    # 块缓存写到临时目录，不写进工作区的 data/output
+    monkeypatch.setattr("analyzer_core.chunking.CHUNK_CACHE", tmp_path / "chunk_cache.json")
+    from project_analyzer import AIInfoExtractor
+
+    info = AIInfoExtractor(api_key="test").extract_project_info("文档内容", "P1.pdf")
+    assert info["公司名称"] == "Acme" and info["源文件"] == "P1.pdf"
+    followup = calls[1]["messages"][-1]["content"]
+    assert '"公司名称"' in followup and '"项目名称"' not in followup
+    assert calls[1]["max_tokens"] < calls[0]["max_tokens"]
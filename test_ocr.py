@@ -0,0 +1,72 @@
+"""
+测试 扫描件的 OCR 兜底（渲染和识别用替身，不需要安装 tesseract）
+"""
+import json
+
+import pytest
+
+from analyzer_core import cli, ocr
+from analyzer_core.ocr import OCRFallback, needs_ocr, parse_dpi
+from analyzer_core.pdf import PDFExtractor
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """页面图片由 (页码, DPI) 决定；记录实际识别的图片"""
+    calls = []
+    monkeypatch.setattr(ocr, "render_page", lambda path, page, dpi: f"page {page} @ {dpi}".encode())
+
+    def recognize(image, lang):
+        calls.append(image)
+        return f"OCR text of {image.decode()} in {lang}"
+
+    monkeypatch.setattr(ocr, "recognize", recognize)
+    return calls
+
+
+def test_page_detection_and_dpi():
+    assert needs_ocr("") and needs_ocr(" \n 12 ")
+    assert not needs_ocr("Project Title: Churn prediction for a retailer")
+    assert parse_dpi("fast") == 150 and parse_dpi(240) == 240
+    with pytest.raises(ValueError):
+        parse_dpi(20)
+
+
+def test_only_empty_pages_are_recognized_and_cached(tmp_path, engine):
+    fallback = OCRFallback(dpi="fast", lang="eng", workers=1, cache_dir=tmp_path)
+    text_page = "This page already has a proper text layer."
+    pages = fallback.fill(tmp_path / "a.pdf", [text_page, "", "  "])
+    assert pages == [text_page, "OCR text of page 2 @ 150 in eng", "OCR text of page 3 @ 150 in eng"]
+    assert len(engine) == 2
+
+    # 另一个PDF里相同的页面图片直接用缓存
+    again = OCRFallback(dpi="fast", lang="eng", workers=1, cache_dir=tmp_path)
+    assert again.fill(tmp_path / "b.pdf", ["", text_page])[0] == "OCR text of page 1 @ 150 in eng"
+    assert again.fill(tmp_path / "c.pdf", [text_page, ""])[1] == pages[1]
+    assert len(engine) == 3
+    assert again.stats == {"recognized": 1, "cached": 1}
+
+
+def test_cli_extract_runs_ocr_stage(tmp_path, capsys, monkeypatch, engine):
+    dirs = {name: tmp_path / name for name in ("projects", "texts", "output")}
+    for d in dirs.values():
+        d.mkdir()
+    for name in ("scan.pdf", "text.pdf"):
+        (dirs["projects"] / name).write_bytes(b"%PDF")
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"ocr_workers": 1, "ocr_lang": "eng"}), encoding="utf-8")
+    monkeypatch.setattr(OCRFallback, "available", staticmethod(lambda: True))
+    monkeypatch.setattr(PDFExtractor, "extract_pages", staticmethod(
+        lambda path: ["", ""] if path.stem == "scan" else ["A normal page with a text layer."]))
+
+    status = cli.main(["extract", "--workers", "1", "--progress", "json", "--config", str(config),
+                       "--projects-dir", str(dirs["projects"]), "--texts-dir", str(dirs["texts"]),
+                       "--output-dir", str(dirs["output"])])
+
+    assert status == cli.EXIT_OK
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.strip()]
+    assert [e["item"] for e in events if e["event"] == "item" and e["stage"] == "ocr"] == ["scan.pdf"]
+    assert "OCR text of page 2 @ 200 in eng" in (dirs["texts"] / "scan.txt").read_text(encoding="utf-8")
+    index = json.loads((dirs["texts"] / "index.json").read_text(encoding="utf-8"))
+    assert [item["pdf_file"] for item in index] == ["scan.pdf", "text.pdf"]
+    assert len(list((dirs["output"] / "ocr_cache").glob("*.txt"))) == 2
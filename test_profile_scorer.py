@@ -0,0 +1,90 @@
+"""
+测试 本地规则评分
+"""
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from profile_scorer import ProfileScorer
+
+with open(Path(__file__).parent / "user_profile.example.json", encoding="utf-8") as f:
+    EXAMPLE_PROFILE = json.load(f)
+
+
+def test_finance_project_gets_top_stars():
+    """金融行业 + 金融关键词 + Python 技能"""
+    scorer = ProfileScorer(EXAMPLE_PROFILE)
+    result = scorer.score("Portfolio risk dashboard for a FinTech lender. Required skills: Python, SQL.")
+    assert result["适配星级"] == "⭐⭐⭐⭐⭐"
+    assert result["建议bidding分数"] == "550-600分"
+    assert result["适配理由"].startswith("行业匹配你的兴趣。涉及金融/投资分析。技能要求匹配")
+
+
+def test_avoided_industry_and_advanced_ml_lower_the_score():
+    """高级ML要求扣分；extra_rules 时避开的行业也扣分"""
+    text = "Computer vision for healthcare imaging using deep learning."
+    assert ProfileScorer(EXAMPLE_PROFILE).score(text)["适配得分"] == -1
+    result = ProfileScorer(EXAMPLE_PROFILE, extra_rules=True).score(text)
+    assert result["适配得分"] == -3
+    assert result["适配星级"] == "⭐"
+    assert result["建议bidding分数"] == "50-80分"
+
+
+def _js_function(source: str, name: str) -> str:
+    start = source.index(f"function {name}(")
+    depth = 0
+    for i in range(source.index("{", start), len(source)):
+        depth += {"{": 1, "}": -1}.get(source[i], 0)
+        if depth == 0:
+            return source[start:i + 1]
+    raise ValueError(name)
+
+
+def test_default_rules_match_js_calculate_suitability():
+    """默认规则与 analyze_with_profile.js 逐条一致（需要 node）"""
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("需要 node")
+    texts = [
+        "Sales data analysis and management dashboard in Python",
+        "Portfolio risk dashboard for a FinTech lender. Required skills: Python, SQL.",
+        "Computer vision for healthcare imaging using deep learning.",
+        "Real estate pricing with neural network models",
+        "Investment analysis of retail merchants",
+        "nothing relevant here",
+    ]
+    source = (Path(__file__).parent / "analyze_with_profile.js").read_text(encoding="utf-8")
+    script = "\n".join([
+        _js_function(source, "inferIndustry"), _js_function(source, "calculateSuitability"),
+        _js_function(source, "calculateBiddingScore"),
+        f"const profile = {json.dumps(EXAMPLE_PROFILE)};",
+        f"const texts = {json.dumps(texts)};",
+        "console.log(JSON.stringify(texts.map(t => { const s = calculateSuitability(t.toLowerCase(), profile);"
+        " return [s.stars, s.reason, calculateBiddingScore(s, profile).score]; })));",
+    ])
+    expected = json.loads(subprocess.run([node, "-e", script], capture_output=True, text=True, check=True).stdout)
+    scorer = ProfileScorer(EXAMPLE_PROFILE)
+    actual = [[r["适配星级"], r["适配理由"], r["建议bidding分数"]] for r in map(scorer.score, texts)]
+    assert actual == expected
+    assert actual[0] == ["⭐⭐", "技能要求匹配", "50-80分"]
+
+
+def test_substring_semantics_match_js_includes():
+    """与 JS 的 text.includes(kw) 一样按子串匹配，不区分大小写"""
+    scorer = ProfileScorer(EXAMPLE_PROFILE)
+    assert scorer.infer_industry("We build POS terminals") == "零售"
+    assert scorer.infer_industry("Mortgage pricing") == "金融"
+    assert scorer.infer_industry("nothing relevant here") == "其他"
+
+
+def test_score_project_uses_extracted_fields():
+    """没有原文时，用已提取的字段评分；已有星级的项目不重复评分"""
+    scorer = ProfileScorer(EXAMPLE_PROFILE)
+    project = {"项目名称": "Equity trading signals", "技能要求": "Python"}
+    scored = scorer.score_project(project)
+    assert scored["适配星级"] == "⭐⭐⭐⭐"
+    assert "适配星级" not in project
+    assert scorer.score_project(scored) is scored
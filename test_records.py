@@ -0,0 +1,69 @@
+"""
+测试 ProjectRecord 与 NDJSON 读写（字段顺序、额外字段、旧格式兼容、命令行导出）
+"""
+import io
+import json
+import os
+
+from analyzer_core import cli
+from analyzer_core.excel import COLUMN_ORDER
+from analyzer_core.records import (FIELDS, ProjectRecord, dump_ndjson, load_projects, parse_ndjson,
+                                   read_ndjson, write_ndjson)
+
+
+def project(i, **extra):
+    return {"源文件": f"p{i}.pdf", "项目名称": f"Project {i}", "所处行业": "金融", "适配得分": 7.5,
+            "技能要求": ["Python", "SQL"], **extra}
+
+
+def test_round_trip_keeps_schema_order_and_extra_fields(tmp_path):
+    projects = [project(1), project(2, 备注="加急"), project(3, 项目编号=None)]
+    path = tmp_path / "projects.ndjson"
+    assert write_ndjson(projects, path) == 3
+
+    header, first = path.read_text(encoding="utf-8").splitlines()[:2]
+    assert json.loads(header)["fields"] == COLUMN_ORDER
+    assert len(json.loads(first)) == len(FIELDS) + 1
+
+    records = read_ndjson(path)
+    assert records[1].name == "Project 2" and records[1].get("备注") == "加急"
+    assert records[0].get("公司名称", "未知") == "未知"
+    assert records[0].industry == "金融" and records[0].fit_score == 7.5
+    loaded = load_projects(path)
+    assert loaded[1] == project(2, 备注="加急")
+    assert list(loaded[0]) == [key for key in FIELDS if key in loaded[0]]
+    assert loaded[2] == project(3)
+    # 读出的记录可以直接再写出
+    assert write_ndjson(records, tmp_path / "copy.ndjson") == 3
+    assert read_ndjson(tmp_path / "copy.ndjson") == records
+
+
+def test_reads_object_lines_and_files_with_other_field_order():
+    plain = "\n".join(json.dumps(project(i), ensure_ascii=False) for i in range(3)) + "\n\n"
+    assert [r.source for r in parse_ndjson(io.StringIO(plain))] == ["p0.pdf", "p1.pdf", "p2.pdf"]
+
+    older = io.StringIO(
+        json.dumps({"format": "project-records", "version": 1, "fields": ["源文件", "项目名称"]}) + "\n"
+        + json.dumps(["a.pdf", "A"]) + "\n" + json.dumps(["b.pdf", "B", {"备注": "x"}]) + "\n")
+    records = list(parse_ndjson(older))
+    assert [r.to_dict() for r in records] == [{"项目名称": "A", "源文件": "a.pdf"},
+                                              {"项目名称": "B", "源文件": "b.pdf", "备注": "x"}]
+
+    buffer = io.StringIO()
+    assert dump_ndjson([ProjectRecord(name="only")], buffer) == 1
+    buffer.seek(0)
+    assert list(parse_ndjson(buffer)) == [ProjectRecord(name="only")]
+
+
+def test_cli_exports_ndjson_and_picks_it_as_latest(tmp_path, capsys):
+    output = tmp_path / "output"
+    output.mkdir()
+    source = output / "项目分析_20260101_000000.json"
+    source.write_text(json.dumps([project(1), project(2)], ensure_ascii=False), encoding="utf-8")
+    os.utime(source, (1_700_000_000, 1_700_000_000))
+    common = ["--progress", "json", "--output-dir", str(output), "--config", str(tmp_path / "none.json")]
+    assert cli.main(["export", "--output-format", "ndjson"] + common) == cli.EXIT_OK
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+    written = next(e["item"] for e in events if e["event"] == "item")
+    assert written.endswith(".ndjson") and load_projects(written) == [project(1), project(2)]
+    assert cli.latest_results(output).suffix == ".ndjson"
@@ -0,0 +1,61 @@
+"""
+测试 提取调度器：开销预估、从大到小派发、内存预算、进程回收和异常退出
+"""
+import os
+import time
+
+from analyzer_core.scheduler import ExtractionScheduler, count_pages, estimate_cost, format_report
+
+SIZES = {"huge1": 900, "huge2": 800, "a": 100, "b": 90, "c": 80, "d": 70}
+
+
+def fake_cost(name):
+    return {"work": SIZES[name], "memory_mb": SIZES[name]}
+
+
+def slow_task(name):
+    start = time.time()
+    time.sleep(0.15)
+    if name == "crash":
+        os._exit(3)
+    return {"name": name, "pid": os.getpid(), "start": start, "end": time.time()}
+
+
+def test_count_pages_and_estimate(tmp_path):
+    pdf = tmp_path / "deck.pdf"
+    pdf.write_bytes(b"%PDF-1.4\n1 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 12 >>\nendobj\n" + b"x" * 1000)
+    assert count_pages(pdf) == 12
+    cost = estimate_cost(pdf)
+    assert cost["pages"] == 12 and not cost["pages_estimated"]
+
+    packed = tmp_path / "packed.pdf"
+    packed.write_bytes(b"%PDF-1.5\n" + b"\0" * 300 * 1024)
+    cost = estimate_cost(packed)
+    assert cost["pages_estimated"] and cost["pages"] == 3
+    assert estimate_cost(pdf)["work"] > cost["work"]
+
+
+def test_largest_first_within_budget_and_recycled():
+    scheduler = ExtractionScheduler(workers=2, memory_budget_mb=1000, max_files_per_worker=2, cost=fake_cost)
+    names = ["d", "a", "huge2", "c", "huge1", "b"]
+    results = {task: result for task, result in scheduler.run(slow_task, names)}
+    assert sorted(results) == sorted(names)
+
+    # 两个大文件合计超预算，不会同时处理；第一个派发的是最大的
+    huge1, huge2 = results["huge1"], results["huge2"]
+    assert huge1["end"] <= huge2["start"] + 0.01 or huge2["end"] <= huge1["start"] + 0.01
+    assert min(results.values(), key=lambda r: r["start"])["name"] == "huge1"
+
+    report = scheduler.report
+    assert sum(w["files"] for w in report["workers"]) == 6
+    assert len({r["pid"] for r in results.values()}) >= 3  # 每个进程最多处理 2 个文件
+    assert report["admitted_peak_mb"] <= 1000 and 0 < report["utilisation"] <= 1
+    assert "利用率" in format_report(report)
+
+
+def test_crashed_worker_is_replaced():
+    sizes = {"crash": 50, "x": 40, "y": 30}
+    scheduler = ExtractionScheduler(workers=2, memory_budget_mb=None, cost=lambda n: {"work": sizes[n], "memory_mb": 1})
+    results = dict(scheduler.run(slow_task, list(sizes)))
+    assert "异常退出" in results["crash"]["error"]
+    assert results["x"]["name"] == "x" and results["y"]["name"] == "y"
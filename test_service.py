@@ -0,0 +1,76 @@
+"""
+测试 本地HTTP分析服务
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+
+from analyzer_core.pdf import PDFExtractor
+from analyzer_core.service import AnalysisService, ServiceThread
+
+
+class FakeSession:
+    """只记录调用次数的分析会话"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def analyze_text(self, text, filename):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls.append(filename)
+        return {"project": {"项目名称": text.strip(), "源文件": filename}}
+
+    def checkpoint(self):
+        pass
+
+
+def request(url, method="GET", data=None):
+    try:
+        with urlopen(Request(url, data=data, method=method), timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_identical_submissions_are_coalesced(tmp_path, monkeypatch):
+    monkeypatch.setattr(PDFExtractor, "extract_pages", staticmethod(lambda path: [path.read_text("utf-8")]))
+    session = FakeSession(delay=0.2)
+    with ServiceThread(AnalysisService(session, tmp_path, workers=1)) as server:
+        jobs = f"{server.base_url}/jobs"
+        with ThreadPoolExecutor(4) as pool:
+            replies = list(pool.map(lambda _: request(f"{jobs}?filename=P1.pdf", "POST", b"Risk model"), range(4)))
+        ids = {body["id"] for _, body in replies}
+        assert len(ids) == 1 and sum(not body["coalesced"] for _, body in replies) == 1
+        id = ids.pop()
+
+        assert request(f"{jobs}/{id}/result")[0] in (200, 202)
+        status, body = request(f"{jobs}/{id}/result?wait=10")
+        assert status == 200 and body["result"] == {"项目名称": "Risk model", "源文件": "P1.pdf"}
+
+        # 已完成的文件再次提交直接返回结果
+        assert request(f"{jobs}?filename=copy.pdf", "POST", b"Risk model") == \
+            (200, {"id": id, "status": "done", "coalesced": True})
+        assert request(f"{jobs}/missing")[0] == 404
+        assert request(f"{server.base_url}/health")[1]["jobs"]["done"] == 1
+    assert session.calls == ["P1.pdf"]
+
+    # 重启后结果仍可查询
+    with ServiceThread(AnalysisService(FakeSession(), tmp_path, workers=1)) as server:
+        status, body = request(f"{server.base_url}/jobs/{id}/result")
+        assert status == 200 and body["result"]["项目名称"] == "Risk model"
+
+
+def test_failed_job_reports_error_and_can_be_resubmitted(tmp_path, monkeypatch):
+    monkeypatch.setattr(PDFExtractor, "extract_pages", staticmethod(lambda path: []))
+    with ServiceThread(AnalysisService(FakeSession(), tmp_path, workers=1)) as server:
+        _, body = request(f"{server.base_url}/jobs?filename=scan.pdf", "POST", b"%PDF")
+        status, result = request(f"{server.base_url}/jobs/{body['id']}/result?wait=10")
+        assert status == 500 and result["status"] == "failed" and result["error"] == "无法提取文本"
+        _, again = request(f"{server.base_url}/jobs?filename=scan.pdf", "POST", b"%PDF")
+        assert again["coalesced"] is False
@@ -0,0 +1,50 @@
+"""
+测试 数据重组问题 解决方案
+"""
+import random
+
+from solution import MinimumValueQuery, getMinimumValue, brute_force_minimum_value, cross_check, minimum_values
+
+
+def test_samples():
+    """题目给出的样例"""
+    assert getMinimumValue([4, 2, 5, 9, 3], 1) == 1
+    assert getMinimumValue([5, 18, 3, 12, 11], 2) == 1
+    assert getMinimumValue([42, 47, 50, 54, 62, 79], 2) == 3
+    assert getMinimumValue([4, 2, 5, 9, 3, 57, 68], 5) == 0
+
+
+def test_edge_cases():
+    """0 次操作、单元素、3 次以上操作"""
+    assert getMinimumValue([7, 3, 9], 0) == 3
+    assert getMinimumValue([7], 5) == 7
+    assert getMinimumValue([100, 250], 3) == 0
+    assert brute_force_minimum_value([100, 250], 3) == 0
+
+def test_negative_values():
+    """有负数时最小值不会因为操作变大"""
+    assert getMinimumValue([-5, 3], 3) == -5
+    assert MinimumValueQuery([-2, 7, 4]).answers() == (-2, -2, -2, -2)
+    rng = random.Random(11)
+    for _ in range(200):
+        data = [rng.randint(-50, 50) for _ in range(rng.randint(1, 5))]
+        for k in range(4):
+            assert getMinimumValue(data, k) == brute_force_minimum_value(data, k)
+
+
+def test_cross_check_against_brute_force():
+    """随机用例与暴力实现一致"""
+    assert cross_check(trials=500, seed=42) == []
+
+
+def test_query_object_matches_single_calls():
+    """预处理一次后的任意次数询问与逐次调用一致，2 次操作的答案只在需要时计算"""
+    rng = random.Random(5)
+    datasets = [[rng.randint(0, 200) for _ in range(rng.randint(1, 30))] for _ in range(200)]
+    for data in datasets:
+        query = MinimumValueQuery(data)
+        assert query.query(1) == getMinimumValue(data, 1) and query._two is None
+        assert query.answers() == tuple(getMinimumValue(data, k) for k in range(4))
+        assert query(7) == getMinimumValue(data, 7)
+    for ops in range(5):
+        assert minimum_values(datasets, ops) == [getMinimumValue(d, ops) for d in datasets]
@@ -0,0 +1,59 @@
+"""
+测试 历史结果库
+"""
+import json
+import os
+
+from analyzer_core.store import ResultsStore, file_sha256
+
+
+def _write_run(output_dir, run_id, projects):
+    path = output_dir / f"项目分析_{run_id}.json"
+    path.write_text(json.dumps(projects, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def test_company_history_across_runs(tmp_path):
+    projects_dir = tmp_path / "projects"
+    projects_dir.mkdir()
+    (projects_dir / "P1.pdf").write_bytes(b"%PDF acme proposal")
+
+    with ResultsStore(tmp_path / "results.db", projects_dir) as store:
+        store.record_run([{"项目名称": "Old", "公司名称": "Acme", "所处行业": "金融", "源文件": "P1.pdf"}],
+                         run_id="20250901_080000")
+        store.record_run([{"项目名称": "New", "公司名称": "Acme", "所处行业": "金融", "源文件": "P1.pdf"},
+                          {"项目名称": "Other", "公司名称": "Beta", "所处行业": "医疗"}],
+                         run_id="20260115_093000")
+
+        history = store.company_history("Acme")
+        assert [(p["run_id"], p["项目名称"]) for p in history] == [
+            ("20250901_080000", "Old"), ("20260115_093000", "New")]
+        assert [p["项目名称"] for p in store.company_history("Acme", since="2026-01-01")] == ["New"]
+
+        digest = file_sha256(projects_dir / "P1.pdf")
+        assert len(store.source_history(digest)) == 2
+        assert store.latest_run_id() == "20260115_093000"
+        assert store.industry_counts() == {"金融": 1, "医疗": 1}
+
+        # 同一 run_id 重新写入时替换
+        store.record_run([{"项目名称": "Only", "公司名称": "Acme"}], run_id="20260115_093000")
+        assert [p["项目名称"] for p in store.projects(run_id="20260115_093000")] == ["Only"]
+
+
+def test_import_json_backlog_is_incremental(tmp_path):
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    _write_run(output_dir, "20250901_080000", [{"项目名称": "A", "公司名称": "Acme"}])
+    second = _write_run(output_dir, "20260115_093000", [{"项目名称": "B", "公司名称": "Beta"}])
+    (output_dir / "项目分析_20260116_000000.json").write_text("{not json", encoding="utf-8")
+
+    with ResultsStore(output_dir / "results.db", tmp_path) as store:
+        assert store.import_json_backlog(output_dir) == ["20250901_080000", "20260115_093000"]
+        assert store.import_json_backlog(output_dir) == []
+
+        _write_run(output_dir, "20260115_093000", [{"项目名称": "B2", "公司名称": "Beta"}])
+        stat = second.stat()
+        os.utime(second, (stat.st_atime, stat.st_mtime + 5))
+        assert store.import_json_backlog(output_dir) == ["20260115_093000"]
+        assert [p["项目名称"] for p in store.projects(company="Beta")] == ["B2"]
+        assert [r["project_count"] for r in store.runs()] == [1, 1]
@@ -0,0 +1,37 @@
+"""
+测试 随机压力测试工具
+"""
+from efficient_tasks import find_min_difficulty
+from stress_test import (
+    brute_max_difficulty,
+    check_case,
+    run_stress,
+    shrink_case,
+    _shrink_difficulty,
+)
+
+
+def _middle_only_splits(difficulty):
+    """旧版大规模路径：只让中间一段充当 group2"""
+    s = sorted(difficulty)
+    best = 0
+    for i in range(1, len(s) - 1):
+        for j in range(i + 1, len(s)):
+            best = max(best, find_min_difficulty(s[:i], s[i:j], s[j:]))
+    return best
+
+
+def test_fast_paths_agree_with_reference():
+    """所有目标在少量随机用例上与暴力实现一致"""
+    results = run_stress(cases=150, workers=1, seed=7)
+    for name, result in results.items():
+        assert result["failures"] == [], name
+
+
+def test_shrink_finds_minimal_counterexample():
+    """旧版连续分组的反例能被收缩到 3 个元素：{0} | {1} | {0} 难度为 2"""
+    case = ([19, 30, 18, 5, 12, 7, 25],)
+    assert not check_case(_middle_only_splits, brute_max_difficulty, case)[0]
+    small = shrink_case(_middle_only_splits, brute_max_difficulty, _shrink_difficulty, case)
+    assert small == ([0, 0, 1],)
+    assert check_case(_middle_only_splits, brute_max_difficulty, small)[1:3] == (2, 1)
@@ -0,0 +1,84 @@
+"""
+测试 token 估算、用量记账和预算上限
+"""
+import json
+
+import pytest
+
+from analyzer_core import cli
+from analyzer_core.ai import ProjectInfoExtractor
+from analyzer_core.backends import LocalServerBackend
+from analyzer_core.prompts import PROJECT_FIELDS
+from analyzer_core.usage import BudgetExceeded, UsageMeter, estimate_corpus, heuristic_tokens
+from benchmarks.llm_stub_server import StubLLMServer
+from benchmarks.llm_throughput import sample_documents
+from test_backends import ScriptedBackend
+
+FULL = '{' + ", ".join(f'"{f}": "v"' for f in PROJECT_FIELDS) + '}'
+
+
+def test_heuristic_tokens_mixed_text():
+    assert heuristic_tokens("hello world") == 4
+    assert heuristic_tokens("金融风险") == 4
+    assert heuristic_tokens("2026 年 Python 项目!") == 2 + 1 + 2 + 2 + 1
+
+
+def test_estimate_counts_chunks_for_long_documents():
+    short = sample_documents(2)
+    estimate = estimate_corpus(short)
+    assert estimate["requests"] == 2 and estimate["prompt_tokens"] > 0
+    long_text = short[0][0] + "\n\nBackground\n" + "Detailed analysis of the market. " * 600
+    assert estimate_corpus([(long_text, "long.pdf")])["files"]["long.pdf"]["requests"] > 1
+
+
+def test_budget_stops_before_exceeding_requests():
+    meter = UsageMeter(max_requests=2)
+    extractor = ProjectInfoExtractor(ScriptedBackend([FULL] * 3), meter=meter)
+    extractor.extract("a", "a.pdf")
+    extractor.extract("b", "b.pdf")
+    with pytest.raises(BudgetExceeded):
+        extractor.extract("c", "c.pdf")
+    assert meter.requests == 2 and set(meter.files) == {"a.pdf", "b.pdf"}
+    assert meter.files["a.pdf"]["estimated"]
+
+
+def test_budget_error_keeps_completed_batch_results():
+    """短文档已经提取（已计费）后长文档超出预算，异常里带着已完成的结果"""
+    (short, _), = sample_documents(1)
+    long_text = short + "\n\nBackground\n" + "Detailed analysis of the market. " * 600
+    meter = UsageMeter(max_requests=2)
+    extractor = ProjectInfoExtractor(ScriptedBackend([FULL] * 5), meter=meter)
+    with pytest.raises(BudgetExceeded) as raised:
+        extractor.extract_batch([(long_text, "long.pdf"), (short, "short.pdf")])
+    assert raised.value.results[0] is None
+    assert raised.value.results[1]["源文件"] == "short.pdf"
+    assert meter.requests == 1
+
+
+def test_server_reported_usage_is_recorded():
+    meter = UsageMeter(max_tokens=10 ** 6)
+    with StubLLMServer() as server:
+        backend = LocalServerBackend(server.base_url, workers=2)
+        ProjectInfoExtractor(backend, meter=meter).extract_batch(sample_documents(2))
+        backend.close()
+    assert meter.requests >= 2 and meter.estimated_requests == 0
+    assert meter.prompt_tokens > meter.completion_tokens > 0
+
+
+def test_cli_dry_run_does_not_need_backend(tmp_path, capsys, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    dirs = {name: tmp_path / name for name in ("projects", "texts", "output")}
+    for d in dirs.values():
+        d.mkdir()
+    for text, name in sample_documents(3):
+        (dirs["texts"] / name.replace(".pdf", ".txt")).write_text(text, encoding="utf-8")
+
+    status = cli.main(["analyze", "--dry-run", "--progress", "json", "--config", str(tmp_path / "none.json"),
+                       "--projects-dir", str(dirs["projects"]), "--texts-dir", str(dirs["texts"]),
+                       "--output-dir", str(dirs["output"])])
+
+    assert status == cli.EXIT_OK
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.strip()]
+    estimate = next(e for e in events if e["event"] == "estimate")
+    assert estimate["documents"] == 3 and estimate["requests"] == 3
+    assert not list(dirs["output"].glob("项目分析_*.json"))
@@ -0,0 +1,77 @@
+"""
+测试 监视目录的增量处理
+"""
+import json
+import os
+
+from analyzer_core import cli
+from analyzer_core.pdf import PDFExtractor
+from analyzer_core.watch import DirectoryWatcher
+from benchmarks.llm_stub_server import StubLLMServer
+from benchmarks.llm_throughput import sample_documents
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_watcher_debounces_and_skips_unchanged_content(tmp_path):
+    clock = FakeClock()
+    watcher = DirectoryWatcher(tmp_path, state_path=tmp_path / "state.json", debounce=2, clock=clock)
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"part")
+    assert watcher.poll() == ([], [])
+    clock.now = 1.5
+    pdf.write_bytes(b"part two")  # 还在写入，重新计时
+    assert watcher.poll() == ([], [])
+    clock.now = 3.0
+    assert watcher.poll() == ([], [])
+    clock.now = 3.6
+    assert watcher.poll() == ([pdf], [])
+    watcher.commit(["a.pdf"])
+
+    # 只改了修改时间不重跑；重启后从状态文件继续
+    os.utime(pdf, ns=(1, 1))
+    watcher = DirectoryWatcher(tmp_path, state_path=tmp_path / "state.json", debounce=0, clock=clock)
+    assert watcher.poll() == ([], [])
+    pdf.write_bytes(b"new version")
+    assert watcher.poll() == ([pdf], [])
+    watcher.commit(["a.pdf"])
+    pdf.unlink()
+    assert watcher.poll() == ([], ["a.pdf"])
+
+
+def test_cli_watch_processes_only_new_pdfs(tmp_path, capsys, monkeypatch):
+    dirs = {name: tmp_path / name for name in ("projects", "texts", "output")}
+    for d in dirs.values():
+        d.mkdir()
+    (text, _), = sample_documents(1)
+    (dirs["projects"] / "old.pdf").write_bytes(b"old")
+    (dirs["projects"] / "new.pdf").write_bytes(text.encode("utf-8"))
+    previous = [{"项目名称": "Old", "源文件": "old.pdf"}]
+    (dirs["output"] / "项目分析_20260101_000000.json").write_text(json.dumps(previous), encoding="utf-8")
+    monkeypatch.setattr(PDFExtractor, "extract_pages", staticmethod(lambda path: [path.read_text("utf-8")]))
+
+    with StubLLMServer() as server:
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({"llm_backend": "local_server", "local_server_url": server.base_url}))
+        status = cli.main(["watch", "--once", "--debounce", "0", "--interval", "0", "--workers", "1",
+                           "--output-format", "json", "--progress", "json", "--config", str(config),
+                           "--no-ocr", "--projects-dir", str(dirs["projects"]),
+                           "--texts-dir", str(dirs["texts"]), "--output-dir", str(dirs["output"])])
+
+    assert status == cli.EXIT_OK
+    # 提取器自己的提示信息输出到 stderr，stdout 每行都是 JSON 事件
+    captured = capsys.readouterr()
+    events = [json.loads(line) for line in captured.out.splitlines()]
+    assert "本地预提取" in captured.err
+    assert [e["changed"] for e in events if e["event"] == "watch" and "changed" in e] == [["new.pdf"]]
+    results = json.loads((dirs["output"] / cli.WATCH_RESULTS).read_text(encoding="utf-8"))
+    assert [p["源文件"] for p in results] == ["new.pdf", "old.pdf"]
+    assert results[1] == previous[0]
+    state = json.loads((dirs["output"] / "watch_state.json").read_text(encoding="utf-8"))
+    assert set(state) == {"new.pdf", "old.pdf"}